@@ -0,0 +1,49 @@
+"""
+Helpers shared by the benchmark scripts.
+"""
+
+import importlib.util
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+def peak_rss_mb():
+    """Peak RSS proses ini dalam MB (0 jika tidak didukung OS)"""
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux melaporkan KB, macOS melaporkan bytes
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def load_tool(relative_path, module_name):
+    """
+    Import script tool (nama file pakai tanda hubung) sebagai module
+
+    Module didaftarkan di sys.modules supaya fungsi worker bisa di-pickle
+    oleh process pool.
+    """
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    path = os.path.join(REPO_ROOT, relative_path)
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def folder_size(path):
+    """Total ukuran file di dalam folder (bytes)"""
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(path)
+        for name in files
+    )
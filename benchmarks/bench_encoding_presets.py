@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark: preset encode fast / balanced / smallest
+===================================================
+
+Render korpus halaman sintetis (teks saja, hasil scan, campuran) lalu encode
+setiap halaman dengan semua kombinasi format x preset dari
+``common.encoding``. Hasilnya matriks waktu encode vs ukuran file.
+
+Usage:
+    python benchmarks/bench_encoding_presets.py
+    python benchmarks/bench_encoding_presets.py --dpi 200 --formats PNG JPEG --repeat 3
+"""
+
+import argparse
+import io
+import time
+
+from _util import REPO_ROOT  # noqa: F401  (menambahkan repo ke sys.path)
+from bench_page_raster import make_page_doc
+
+FORMATS = ("PNG", "JPEG", "WEBP", "TIFF")
+
+
+def make_corpus_pages():
+    """Dokumen sintetis: halaman teks, halaman scan, halaman campuran"""
+    import fitz
+    from PIL import Image, ImageFilter
+
+    doc = fitz.open()
+
+    text_page = doc.new_page(width=595, height=842)
+    for i in range(70):
+        text_page.insert_text((40, 40 + i * 11), f"Baris teks referensi nomor {i + 1} " * 4, fontsize=8)
+
+    # Halaman "scan": noise halus + blur seperti kertas yang di-scan
+    scan = Image.effect_noise((1240, 1754), 24).filter(ImageFilter.GaussianBlur(1)).convert("RGB")
+    buffer = io.BytesIO()
+    scan.save(buffer, format="JPEG", quality=85)
+    scan_page = doc.new_page(width=595, height=842)
+    scan_page.insert_image(scan_page.rect, stream=buffer.getvalue())
+
+    doc.insert_pdf(make_page_doc())
+    return doc, {0: "teks", 1: "scan", 2: "campuran"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark preset encode")
+    parser.add_argument("--dpi", type=int, default=150, help="DPI render korpus (default: 150)")
+    parser.add_argument("--formats", nargs="+", type=str.upper, choices=FORMATS, default=list(FORMATS),
+                        help="Format yang diuji (default: semua)")
+    parser.add_argument("-q", "--quality", type=int, default=85, help="Kualitas JPEG/WEBP (default: 85)")
+    parser.add_argument("--repeat", type=int, default=1, help="Ulangi encode per kombinasi (default: 1)")
+    args = parser.parse_args()
+
+    from common.encoding import ENCODING_PRESETS, encode_image
+    from common.page_raster import pixmap_to_image, render_page
+
+    doc, names = make_corpus_pages()
+    images = {names[i]: pixmap_to_image(render_page(doc[i], args.dpi)) for i in range(len(doc))}
+
+    print(f"📊 Preset encode @ {args.dpi} DPI, korpus: {', '.join(images)}")
+    print(f"{'Format':<6} {'Preset':<9} {'Halaman':<9} {'ms/halaman':>11} {'KB':>9} {'speedup':>8} {'ukuran':>7}")
+    for image_format in args.formats:
+        for page_name, image in images.items():
+            sizes = {}
+            for preset in ENCODING_PRESETS:
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    data = encode_image(image, image_format, preset, args.quality)
+                elapsed = (time.perf_counter() - start) / args.repeat
+                sizes[preset] = (elapsed, len(data))
+
+            base_seconds, base_bytes = sizes["balanced"]
+            for preset, (seconds, size) in sizes.items():
+                # Kecepatan dan ukuran relatif terhadap balanced (default semua tool)
+                speedup = base_seconds / seconds if seconds else 0.0
+                print(f"{image_format:<6} {preset:<9} {page_name:<9} {seconds * 1000:>11.1f} "
+                      f"{size / 1024:>9.1f} {speedup:>7.1f}x {size / base_bytes * 100:>6.0f}%")
+
+
+if __name__ == "__main__":
+    main()
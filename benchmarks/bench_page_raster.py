@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: PPM round-trip vs zero-copy Pixmap -> PIL handoff
+=============================================================
+
+Render halaman sintetis (default A3 @ 600 DPI) lalu ubah ke PIL Image dengan
+dua cara:
+
+- ``ppm``        : ``pix.tobytes("ppm")`` -> ``io.BytesIO`` -> ``Image.open``
+- ``frombuffer`` : ``common.page_raster.pixmap_to_image`` (tanpa PPM; L/RGBA/CMYK
+  dibaca langsung dari buffer pixmap, RGB tetap di-copy sekali oleh PIL)
+
+Setiap varian jalan di proses terpisah supaya peak RSS tidak saling ganggu.
+
+Usage:
+    python benchmarks/bench_page_raster.py
+    python benchmarks/bench_page_raster.py --dpi 300 --pages 5
+"""
+
+import argparse
+import io
+import os
+import subprocess
+import sys
+import time
+
+from _util import peak_rss_mb
+
+VARIANTS = ("ppm", "frombuffer")
+
+
+def make_page_doc():
+    """Buat dokumen satu halaman A3 dengan teks dan gambar"""
+    import fitz
+    from PIL import Image
+
+    doc = fitz.open()
+    page = doc.new_page(width=842, height=1191)  # A3 dalam point
+    for i in range(60):
+        page.insert_text((40, 40 + i * 18), f"Benchmark line {i + 1} " * 6, fontsize=10)
+    photo = Image.effect_mandelbrot((800, 600), (-2, -1.5, 1, 1.5), 64).convert("RGB")
+    buffer = io.BytesIO()
+    photo.save(buffer, format="PNG")
+    page.insert_image(fitz.Rect(80, 600, 760, 1110), stream=buffer.getvalue())
+    return doc
+
+
+def run_variant(variant, dpi, pages):
+    """Jalankan satu varian, print hasil dalam format key=value"""
+    import fitz
+    from PIL import Image
+    from common.page_raster import pixmap_to_image
+
+    doc = make_page_doc()
+    page = doc[0]
+    zoom = dpi / 72.0
+    mat = fitz.Matrix(zoom, zoom)
+    baseline_rss = peak_rss_mb()
+
+    elapsed = 0.0
+    for _ in range(pages):
+        pix = page.get_pixmap(matrix=mat)
+        start = time.perf_counter()
+        if variant == "ppm":
+            image = Image.open(io.BytesIO(pix.tobytes("ppm")))
+        else:
+            image = pixmap_to_image(pix)
+        # Paksa decode supaya kedua varian benar-benar punya data pixel
+        image.load()
+        elapsed += time.perf_counter() - start
+        del image, pix
+
+    print(f"seconds_per_page={elapsed / pages:.4f}")
+    print(f"peak_rss_mb={peak_rss_mb():.1f}")
+    print(f"baseline_rss_mb={baseline_rss:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PPM round-trip vs zero-copy handoff")
+    parser.add_argument("--dpi", type=int, default=600, help="DPI render (default: 600)")
+    parser.add_argument("--pages", type=int, default=3, help="Jumlah render per varian (default: 3)")
+    parser.add_argument("--variant", choices=VARIANTS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        run_variant(args.variant, args.dpi, args.pages)
+        return
+
+    print(f"📊 Page raster handoff @ {args.dpi} DPI, {args.pages} halaman per varian")
+    print(f"{'Varian':<12} {'s/halaman':>10} {'Peak RSS (MB)':>14}")
+    for variant in VARIANTS:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--variant", variant,
+             "--dpi", str(args.dpi), "--pages", str(args.pages)],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        result = dict(line.split("=", 1) for line in output.splitlines() if "=" in line)
+        print(f"{variant:<12} {float(result['seconds_per_page']):>10.4f} {float(result['peak_rss_mb']):>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
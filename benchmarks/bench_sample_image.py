@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: FaviconGenerator.create_sample_image
+================================================
+
+Bandingkan loop putpixel lama dengan versi NumPy dan fallback tanpa NumPy,
+sekaligus cek hasilnya identik pixel per pixel dengan versi lama.
+
+Usage:
+    python benchmarks/bench_sample_image.py
+    python benchmarks/bench_sample_image.py --sizes 512 2048 4096
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import time
+
+from _util import load_tool
+
+
+def reference_sample_image(path):
+    """Implementasi lama (nested loop + putpixel), hanya ukuran 512"""
+    from PIL import Image
+
+    img = Image.new('RGBA', (512, 512), (0, 0, 0, 0))
+    center_x, center_y = 256, 256
+    max_radius = 200
+    for x in range(512):
+        for y in range(512):
+            distance = ((x - center_x) ** 2 + (y - center_y) ** 2) ** 0.5
+            if distance <= max_radius:
+                ratio = 1 - (distance / max_radius)
+                red = int(255 * ratio * 0.8)
+                green = int(150 * ratio)
+                blue = int(255 * (1 - ratio * 0.3))
+                alpha = 255
+                if distance > max_radius * 0.8:
+                    edge_ratio = (distance - max_radius * 0.8) / (max_radius * 0.2)
+                    alpha = int(255 * (1 - edge_ratio))
+                img.putpixel((x, y), (red, green, blue, alpha))
+    img.save(path, format='PNG')
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        function(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark create_sample_image")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[512, 2048], help="Ukuran sample (default: 512 2048)")
+    args = parser.parse_args()
+
+    from PIL import Image
+
+    favicon = load_tool(os.path.join("favicon generator", "favicon-generator.py"), "favicon_generator")
+    generator = favicon.FaviconGenerator()
+    numpy_module = favicon.np
+    work_dir = tempfile.mkdtemp(prefix="bench_sample_")
+
+    try:
+        reference_path = os.path.join(work_dir, "reference.png")
+        reference_seconds = timed(reference_sample_image, reference_path)
+        reference_bytes = Image.open(reference_path).tobytes()
+        print(f"📊 Loop putpixel lama (512px): {reference_seconds:.3f}s")
+        print(f"{'Ukuran':>7} {'Varian':<10} {'Waktu (s)':>10} {'Speedup':>8}  Identik")
+
+        for size in args.sizes:
+            variants = [("numpy", numpy_module), ("python", None)] if numpy_module else [("python", None)]
+            for name, module in variants:
+                favicon.np = module
+                path = os.path.join(work_dir, f"{name}_{size}.png")
+                seconds = timed(generator.create_sample_image, path, size=size)
+                if size == 512:
+                    identical = "✅" if Image.open(path).tobytes() == reference_bytes else "❌"
+                    speedup = f"{reference_seconds / seconds:.0f}x"
+                else:
+                    identical, speedup = "-", "-"
+                print(f"{size:>7} {name:<10} {seconds:>10.3f} {speedup:>8}  {identical}")
+    finally:
+        favicon.np = numpy_module
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark: PDF splitter, loop pypdf lama vs engine PyMuPDF
+===========================================================
+
+Buat PDF sintetis dengan font ter-embed dan gambar yang dipakai bersama oleh
+semua halaman, lalu pecah per halaman dengan:
+
+- ``pypdf``        : loop PdfWriter per halaman (cara lama)
+- ``fitz``         : insert_pdf, sumber dibuka sekali
+- ``fitz+optimize``: fitz + --strip-unused + --subset-fonts
+
+Usage:
+    python benchmarks/bench_split.py
+    python benchmarks/bench_split.py --pages 500
+"""
+
+import argparse
+import io
+import os
+import shutil
+import tempfile
+import time
+
+from _util import folder_size, load_tool
+
+VARIANTS = {
+    "pypdf": {"engine": "pypdf"},
+    "fitz": {"engine": "fitz"},
+    "fitz+optimize": {"engine": "fitz", "strip_unused": True, "subset_fonts": True},
+}
+
+
+def make_source_pdf(path, pages):
+    """PDF dengan font CJK ter-embed dan satu gambar yang dipakai di semua halaman"""
+    import fitz
+    from PIL import Image
+
+    photo = Image.effect_noise((400, 400), 60).convert("RGB")
+    buffer = io.BytesIO()
+    photo.save(buffer, format="JPEG", quality=80)
+    font_buffer = fitz.Font("cjk").buffer
+
+    doc = fitz.open()
+    image_xref = 0
+    for page_num in range(pages):
+        page = doc.new_page()
+        page.insert_font(fontname="F0", fontbuffer=font_buffer)
+        page.insert_text((72, 72), f"Halaman {page_num + 1}", fontname="F0", fontsize=14)
+        image_xref = page.insert_image(fitz.Rect(72, 100, 472, 500), stream=buffer.getvalue(), xref=image_xref)
+    doc.save(path, garbage=4, deflate=True)
+    doc.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF splitter")
+    parser.add_argument("--pages", type=int, default=200, help="Jumlah halaman PDF sumber (default: 200)")
+    args = parser.parse_args()
+
+    splitter = load_tool(os.path.join("fragmentation pdf", "pecah-pdf.py"), "pecah_pdf")
+    work_dir = tempfile.mkdtemp(prefix="bench_split_")
+    try:
+        source = os.path.join(work_dir, "source.pdf")
+        make_source_pdf(source, args.pages)
+        print(f"📊 Split {args.pages} halaman, sumber {os.path.getsize(source)/1024/1024:.1f} MB")
+        print(f"{'Varian':<15} {'Waktu (s)':>10} {'Halaman/s':>10} {'Output (MB)':>12}")
+
+        for name, options in VARIANTS.items():
+            output_dir = os.path.join(work_dir, name)
+            start = time.perf_counter()
+            splitter.split_pdf(source, output_dir, **options)
+            elapsed = time.perf_counter() - start
+            size_mb = folder_size(output_dir) / 1024 / 1024
+            print(f"{name:<15} {elapsed:>10.2f} {args.pages / elapsed:>10.1f} {size_mb:>12.1f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
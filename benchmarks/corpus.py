@@ -0,0 +1,126 @@
+"""
+Korpus referensi sintetis untuk benchmark suite.
+
+Semua input dibuat offline dan deterministik (seed tetap), jadi hasil benchmark
+antar versi PyMuPDF/Pillow bisa dibandingkan:
+
+- ``text``  : PDF teks saja
+- ``scan``  : PDF hasil "scan", satu JPEG penuh per halaman
+- ``large`` : PDF dengan jumlah halaman sangat banyak
+- ``logo``  : logo PNG RGBA ukuran besar
+
+Korpus disimpan per skala dan hanya dibuat ulang kalau ``CORPUS_VERSION`` berubah.
+"""
+
+import io
+import json
+import os
+import random
+import tempfile
+
+CORPUS_VERSION = 2
+
+SCALES = {
+    "small": {"text_pages": 20, "scan_pages": 6, "large_pages": 300, "logo_size": 2048},
+    "full": {"text_pages": 100, "scan_pages": 30, "large_pages": 3000, "logo_size": 8192},
+}
+
+_WORDS = ("lorem ipsum dolor sit amet data laporan halaman tabel angka ringkasan "
+          "dokumen arsip kontrak faktur catatan rapat anggaran proyek").split()
+
+
+def default_corpus_dir(scale):
+    return os.path.join(tempfile.gettempdir(), "pdf-tools-bench-corpus", scale)
+
+
+def make_text_pdf(path, pages, seed=1):
+    """PDF teks saja, paragraf acak dengan font bawaan"""
+    import fitz
+
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page(width=595, height=842)
+        page.insert_text((50, 50), f"Dokumen referensi - halaman {page_num + 1}", fontsize=14)
+        # Baris per baris: insert_textbox tidak menulis apa pun kalau teksnya tidak muat
+        for line in range(60):
+            words = " ".join(rng.choice(_WORDS) for _ in range(12))
+            written = page.insert_text((50, 80 + line * 12), words, fontsize=9)
+            assert written == 1, f"baris {line + 1} halaman {page_num + 1} tidak tertulis"
+    doc.save(path, garbage=4, deflate=True)
+    doc.close()
+
+
+def make_scan_pdf(path, pages, dpi=200, seed=2):
+    """PDF "scan": tiap halaman satu JPEG A4 berisi noise kertas dan blok teks gelap"""
+    import fitz
+    from PIL import Image, ImageDraw, ImageFilter
+
+    rng = random.Random(seed)
+    width, height = round(8.27 * dpi), round(11.69 * dpi)
+    paper = Image.effect_noise((width, height), 18).point(lambda v: 200 + v // 5).filter(ImageFilter.GaussianBlur(1))
+
+    doc = fitz.open()
+    for _ in range(pages):
+        scan = paper.copy()
+        draw = ImageDraw.Draw(scan)
+        y = dpi // 2
+        while y < height - dpi // 2:
+            line_width = rng.randint(width // 2, width - dpi)
+            draw.rectangle((dpi // 2, y, line_width, y + dpi // 12), fill=rng.randint(20, 60))
+            y += dpi // 6
+        buffer = io.BytesIO()
+        scan.convert("RGB").save(buffer, format="JPEG", quality=85)
+        page = doc.new_page(width=595, height=842)
+        page.insert_image(page.rect, stream=buffer.getvalue())
+    doc.save(path, garbage=4, deflate=True)
+    doc.close()
+
+
+def make_logo(path, size):
+    """Logo RGBA besar: gradien, lingkaran dan transparansi"""
+    from PIL import Image, ImageDraw
+
+    gradient = Image.linear_gradient("L").resize((size, size))
+    radial = Image.radial_gradient("L").resize((size, size))
+    logo = Image.merge("RGBA", (gradient, radial, gradient.rotate(90), Image.new("L", (size, size), 0)))
+    mask = Image.new("L", (size, size), 0)
+    ImageDraw.Draw(mask).ellipse((size // 16, size // 16, size - size // 16, size - size // 16), fill=255)
+    logo.putalpha(mask)
+    logo.save(path, format="PNG")
+
+
+def ensure_corpus(scale="small", corpus_dir=None):
+    """
+    Buat korpus kalau belum ada
+
+    Returns:
+        dict: nama input -> {'path', 'pages'}
+    """
+    params = SCALES[scale]
+    corpus_dir = corpus_dir or default_corpus_dir(scale)
+    os.makedirs(corpus_dir, exist_ok=True)
+    manifest_path = os.path.join(corpus_dir, "corpus.json")
+
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == CORPUS_VERSION and manifest.get("params") == params \
+                and all(os.path.exists(entry["path"]) for entry in manifest["inputs"].values()):
+            return manifest["inputs"]
+
+    print(f"🏗️  Membuat korpus '{scale}' di {corpus_dir} ...")
+    inputs = {
+        "text": {"path": os.path.join(corpus_dir, "text.pdf"), "pages": params["text_pages"]},
+        "scan": {"path": os.path.join(corpus_dir, "scan.pdf"), "pages": params["scan_pages"]},
+        "large": {"path": os.path.join(corpus_dir, "large.pdf"), "pages": params["large_pages"]},
+        "logo": {"path": os.path.join(corpus_dir, "logo.png"), "pages": None},
+    }
+    make_text_pdf(inputs["text"]["path"], params["text_pages"])
+    make_scan_pdf(inputs["scan"]["path"], params["scan_pages"])
+    make_text_pdf(inputs["large"]["path"], params["large_pages"], seed=3)
+    make_logo(inputs["logo"]["path"], params["logo_size"])
+
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({"version": CORPUS_VERSION, "params": params, "inputs": inputs}, f, indent=2)
+    return inputs
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite untuk semua tool PDF/gambar
+===========================================
+
+Jalankan fungsi inti tiap tool (``compress_pdf``, ``convert_pdf_to_images``,
+``split_pdf``, ``create_web_favicons``) dengan pengaturan tetap di atas korpus
+sintetis (lihat ``corpus.py``), lalu simpan wall time, halaman/detik, peak RSS
+dan ukuran output ke JSON. Setiap case jalan di proses terpisah supaya peak
+RSS tidak saling ganggu.
+
+Mode ``compare`` membandingkan dua file hasil dan menandai regresi, exit code 1
+kalau ada regresi (bisa dipakai di CI setelah upgrade PyMuPDF/Pillow).
+
+Usage:
+    python benchmarks/suite.py run -o hasil_lama.json
+    python benchmarks/suite.py run -o hasil_baru.json --scale full --repeat 3
+    python benchmarks/suite.py run -o hasil.json --cases compress_raster_scan split_every_text
+    python benchmarks/suite.py compare hasil_lama.json hasil_baru.json --threshold 10
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from _util import folder_size, load_tool, peak_rss_mb
+from corpus import SCALES, default_corpus_dir, ensure_corpus
+
+SUITE_VERSION = 1
+_RESULT_PREFIX = "SUITE_RESULT="
+
+# nama case -> (tool, input korpus, pengaturan tetap)
+CASES = {
+    "compress_raster_scan": ("compress", "scan", {"engine": "raster", "quality": 60}),
+    "compress_images_scan": ("compress", "scan", {"engine": "images", "quality": 60}),
+    "compress_raster_text": ("compress", "text", {"engine": "raster", "quality": 60}),
+    "compress_adaptive_scan": ("compress", "scan", {"engine": "adaptive", "quality": 60}),
+    "compress_adaptive_text": ("compress", "text", {"engine": "adaptive", "quality": 60}),
+    "compress_bilevel_scan": ("compress", "scan", {"engine": "raster", "color_mode": "bilevel"}),
+    "to_image_png_text": ("to_image", "text", {"image_format": "PNG", "dpi": 150}),
+    "to_image_jpeg_scan": ("to_image", "scan", {"image_format": "JPEG", "dpi": 150, "quality": 85}),
+    "to_image_gray_scan": ("to_image", "scan", {"image_format": "PNG", "dpi": 150, "color_mode": "gray"}),
+    "to_image_tiff_g4_scan": ("to_image", "scan", {"image_format": "TIFF", "dpi": 300, "color_mode": "bilevel"}),
+    "split_every_text": ("split", "text", {"every": 1}),
+    "split_every10_large": ("split", "large", {"every": 10}),
+    "favicon_web_logo": ("favicon", "logo", {}),
+}
+
+
+def _run_compress(input_path, output_dir, options):
+    kompres = load_tool(os.path.join("pdf compression", "kompres-pdf-gambar.py"), "kompres_pdf_gambar")
+    kompres.compress_pdf(input_path, os.path.join(output_dir, "output.pdf"), **options)
+
+
+def _run_to_image(input_path, output_dir, options):
+    converter = load_tool(os.path.join("pdf to image", "pdf-to-image.py"), "pdf_to_image")
+    converter.convert_pdf_to_images(input_path, output_dir, **options)
+
+
+def _run_split(input_path, output_dir, options):
+    splitter = load_tool(os.path.join("fragmentation pdf", "pecah-pdf.py"), "pecah_pdf")
+    splitter.split_pdf(input_path, output_dir=output_dir, **options)
+
+
+def _run_favicon(input_path, output_dir, options):
+    favicon = load_tool(os.path.join("favicon generator", "favicon-generator.py"), "favicon_generator")
+    if not favicon.FaviconGenerator(**options).create_web_favicons(input_path, output_dir):
+        raise RuntimeError("create_web_favicons gagal")
+
+
+_RUNNERS = {
+    "compress": _run_compress,
+    "to_image": _run_to_image,
+    "split": _run_split,
+    "favicon": _run_favicon,
+}
+
+
+def run_case(name, corpus):
+    """Jalankan satu case di proses ini, print hasil sebagai satu baris JSON"""
+    tool, input_name, options = CASES[name]
+    entry = corpus[input_name]
+    output_dir = tempfile.mkdtemp(prefix=f"bench_{name}_")
+    try:
+        start = time.perf_counter()
+        # Output print tool dibuang supaya baris hasil gampang dibaca parent
+        with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+            _RUNNERS[tool](entry["path"], output_dir, options)
+        wall = time.perf_counter() - start
+        result = {
+            "wall_seconds": round(wall, 4),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "output_bytes": folder_size(output_dir),
+            "output_files": sum(len(files) for _, _, files in os.walk(output_dir)),
+        }
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+    print(_RESULT_PREFIX + json.dumps(result))
+
+
+def _environment():
+    versions = {}
+    for module_name in ("fitz", "PIL", "pypdf", "numpy"):
+        try:
+            module = __import__(module_name)
+            versions[module_name] = getattr(module, "VersionBind", None) or getattr(module, "__version__", "?")
+        except ImportError:
+            versions[module_name] = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "packages": versions,
+    }
+
+
+def run_suite(case_names, scale, corpus_dir, repeat):
+    # Korpus dibuat di proses lain: peak RSS proses ini ikut terbawa ke child yang di-fork
+    subprocess.run([sys.executable, os.path.abspath(__file__), "_corpus",
+                    "--scale", scale, "--corpus-dir", corpus_dir], check=True)
+    corpus = ensure_corpus(scale, corpus_dir)
+    results = {}
+    for name in case_names:
+        tool, input_name, options = CASES[name]
+        runs = []
+        error = None
+        for _ in range(max(1, repeat)):
+            completed = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "_case", name,
+                 "--scale", scale, "--corpus-dir", corpus_dir],
+                capture_output=True, text=True,
+            )
+            lines = [line for line in completed.stdout.splitlines() if line.startswith(_RESULT_PREFIX)]
+            if completed.returncode != 0 or not lines:
+                error = (completed.stderr.strip().splitlines() or ["unknown error"])[-1]
+                print(f"   ❌ {name}: {error}")
+                runs = []
+                break
+            runs.append(json.loads(lines[-1][len(_RESULT_PREFIX):]))
+        if not runs:
+            results[name] = {"tool": tool, "input": input_name, "error": error}
+            continue
+
+        # Median wall time, nilai terbesar untuk memori
+        wall = statistics.median(run["wall_seconds"] for run in runs)
+        pages = corpus[input_name]["pages"]
+        results[name] = {
+            "tool": tool,
+            "input": input_name,
+            "options": options,
+            "pages": pages,
+            "wall_seconds": round(wall, 4),
+            "runs": [run["wall_seconds"] for run in runs],
+            "pages_per_sec": round(pages / wall, 2) if pages and wall else None,
+            "peak_rss_mb": max(run["peak_rss_mb"] for run in runs),
+            "output_bytes": runs[-1]["output_bytes"],
+            "output_files": runs[-1]["output_files"],
+        }
+        speed = f"{results[name]['pages_per_sec']:.1f} hal/s" if results[name]["pages_per_sec"] else "-"
+        print(f"   ✅ {name:<22} {wall:>8.2f}s {speed:>12} {results[name]['peak_rss_mb']:>8.1f} MB "
+              f"{results[name]['output_bytes'] / 1024:>10.1f} KB")
+    return results
+
+
+def compare_results(old, new, threshold, rss_threshold, size_threshold, min_seconds):
+    """
+    Bandingkan dua hasil suite
+
+    Returns:
+        list: Pesan regresi (kosong kalau aman)
+    """
+    regressions = []
+    print(f"{'Case':<22} {'Waktu lama':>11} {'Waktu baru':>11} {'Δ waktu':>9} {'Δ RSS':>8} {'Δ ukuran':>9}")
+    for name in sorted(set(old["cases"]) | set(new["cases"])):
+        before, after = old["cases"].get(name), new["cases"].get(name)
+        if not before or not after or "error" in before or "error" in after:
+            status = "error" if (after and "error" in after) else "tidak ada di salah satu file"
+            print(f"{name:<22} ⚠️  {status}")
+            if after and "error" in after and before and "error" not in before:
+                regressions.append(f"{name}: gagal ({after['error']})")
+            continue
+
+        def delta(key):
+            return (after[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+
+        time_delta, rss_delta, size_delta = delta("wall_seconds"), delta("peak_rss_mb"), delta("output_bytes")
+        flags = []
+        # Selisih waktu yang sangat kecil dianggap noise
+        if time_delta > threshold and after["wall_seconds"] - before["wall_seconds"] > min_seconds:
+            flags.append(f"waktu +{time_delta:.0f}%")
+        if rss_delta > rss_threshold:
+            flags.append(f"RSS +{rss_delta:.0f}%")
+        if size_delta > size_threshold:
+            flags.append(f"ukuran output +{size_delta:.1f}%")
+
+        marker = "🔴" if flags else ("🟢" if time_delta < -threshold else "  ")
+        print(f"{name:<22} {before['wall_seconds']:>10.2f}s {after['wall_seconds']:>10.2f}s "
+              f"{time_delta:>+8.0f}% {rss_delta:>+7.0f}% {size_delta:>+8.1f}% {marker}")
+        regressions.extend(f"{name}: {flag}" for flag in flags)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite semua tool PDF/gambar")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Jalankan benchmark dan simpan hasil ke JSON")
+    run_parser.add_argument("-o", "--output", required=True, help="File JSON hasil")
+    run_parser.add_argument("--scale", choices=SCALES, default="small", help="Ukuran korpus (default: small)")
+    run_parser.add_argument("--corpus-dir", help="Folder korpus (default: folder temp sistem)")
+    run_parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES),
+                            help="Case yang dijalankan (default: semua)")
+    run_parser.add_argument("--repeat", type=int, default=1, help="Ulangi tiap case, ambil median (default: 1)")
+
+    compare_parser = commands.add_parser("compare", help="Bandingkan dua file hasil")
+    compare_parser.add_argument("old", help="Hasil lama (baseline)")
+    compare_parser.add_argument("new", help="Hasil baru")
+    compare_parser.add_argument("--threshold", type=float, default=10,
+                                help="Batas regresi wall time dalam persen (default: 10)")
+    compare_parser.add_argument("--rss-threshold", type=float, default=15,
+                                help="Batas regresi peak RSS dalam persen (default: 15)")
+    compare_parser.add_argument("--size-threshold", type=float, default=2,
+                                help="Batas regresi ukuran output dalam persen (default: 2)")
+    compare_parser.add_argument("--min-seconds", type=float, default=0.05,
+                                help="Selisih waktu di bawah ini dianggap noise (default: 0.05)")
+
+    corpus_parser = commands.add_parser("_corpus")
+    corpus_parser.add_argument("--scale", choices=SCALES, default="small")
+    corpus_parser.add_argument("--corpus-dir")
+
+    case_parser = commands.add_parser("_case")
+    case_parser.add_argument("name", choices=CASES)
+    case_parser.add_argument("--scale", choices=SCALES, default="small")
+    case_parser.add_argument("--corpus-dir")
+
+    args = parser.parse_args()
+
+    if args.command == "_corpus":
+        ensure_corpus(args.scale, args.corpus_dir)
+        return
+
+    if args.command == "_case":
+        run_case(args.name, ensure_corpus(args.scale, args.corpus_dir))
+        return
+
+    if args.command == "compare":
+        with open(args.old, "r", encoding="utf-8") as f:
+            old = json.load(f)
+        with open(args.new, "r", encoding="utf-8") as f:
+            new = json.load(f)
+        if old.get("scale") != new.get("scale"):
+            print(f"⚠️  Skala korpus beda: {old.get('scale')} vs {new.get('scale')}")
+        regressions = compare_results(old, new, args.threshold, args.rss_threshold,
+                                      args.size_threshold, args.min_seconds)
+        if regressions:
+            print(f"\n🔴 {len(regressions)} regresi:")
+            for message in regressions:
+                print(f"   - {message}")
+            sys.exit(1)
+        print("\n🟢 Tidak ada regresi")
+        return
+
+    corpus_dir = args.corpus_dir or default_corpus_dir(args.scale)
+    print(f"📊 Benchmark suite, korpus '{args.scale}', {len(args.cases)} case x{args.repeat}")
+    report = {
+        "suite_version": SUITE_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "scale": args.scale,
+        "environment": _environment(),
+        "cases": run_suite(args.cases, args.scale, corpus_dir, args.repeat),
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Hasil disimpan di: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
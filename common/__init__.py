@@ -0,0 +1,6 @@
+"""
+Shared helpers for the PDF & image tools.
+
+Each tool script adds the repository root to ``sys.path`` so this package
+can be imported no matter which folder the tool is started from.
+"""
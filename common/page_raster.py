@@ -0,0 +1,171 @@
+"""
+Page raster helpers shared by the PDF tools.
+
+Colour modes (``COLOR_MODES``) pick what a page is rendered and stored as:
+
+- ``rgb``     : full colour
+- ``gray``    : one 8-bit channel, rendered by MuPDF as gray directly
+- ``bilevel`` : 1-bit black and white from a gray render, with a fixed
+  threshold or Floyd-Steinberg dithering (``to_bilevel``)
+- ``auto``    : ``gray`` for pages without colour content, ``rgb`` otherwise,
+  decided from a small thumbnail (``is_grayscale_page``)
+"""
+
+import fitz  # PyMuPDF
+from PIL import Image, ImageChops
+
+from common.profiling import get_profiler
+
+RENDER_COLORSPACES = {
+    "rgb": fitz.csRGB,
+    "gray": fitz.csGRAY,
+}
+
+COLOR_MODES = ("rgb", "gray", "bilevel", "auto")
+DEFAULT_THRESHOLD = 128
+DETECT_DPI = 24       # thumbnail resolution for colour detection
+GRAY_MAX_CHROMA = 24  # max channel difference of a thumbnail that still counts as grayscale
+
+# (channels, alpha) -> PIL mode, matching MuPDF's sample layout
+_PIXMAP_MODES = {
+    (1, False): "L",
+    (2, True): "LA",
+    (3, False): "RGB",
+    (4, True): "RGBA",
+    (4, False): "CMYK",
+}
+
+
+def pixmap_to_image(pix):
+    """
+    Wrap a PyMuPDF pixmap as a PIL image without a PPM encode/decode.
+
+    For modes PIL can map directly (L, RGBA, CMYK) the image reads straight
+    from the pixmap buffer, so the pixmap is kept as an attribute of the
+    image to stay alive as long as the image does. RGB is unpacked once,
+    because PIL stores it as 32 bits per pixel internally; that image owns
+    its pixels and the pixmap can be freed right away.
+
+    Args:
+        pix: fitz.Pixmap to wrap
+
+    Returns:
+        PIL.Image.Image: Read-only image backed by the pixmap samples (L,
+        RGBA, CMYK) or an independent copy (RGB, LA)
+    """
+    mode = _PIXMAP_MODES.get((pix.n, bool(pix.alpha)))
+    if mode is None:
+        raise ValueError(f"Unsupported pixmap layout: n={pix.n}, alpha={pix.alpha}")
+
+    with get_profiler().stage("to_pil"):
+        image = Image.frombuffer(mode, (pix.width, pix.height), pix.samples_mv, "raw", mode, pix.stride, 1)
+    if image.readonly:
+        # Mapped buffer: samples_mv does not hold a reference to the pixmap itself
+        image._pixmap = pix
+    return image
+
+
+def render_page(page, dpi, colorspace="rgb", alpha=False, cache=None, file_hash=None):
+    """
+    Render a page at the given DPI, going through the render cache if given
+
+    Args:
+        page: fitz.Page to render
+        dpi: Output resolution (72 = 100%)
+        colorspace: Key of RENDER_COLORSPACES
+        alpha: Render with a transparent background
+        cache: Optional common.render_cache.RenderCache
+        file_hash: Content hash of the PDF, required to use the cache
+
+    Returns:
+        fitz.Pixmap: Rendered page
+    """
+    profiler = get_profiler()
+    use_cache = cache is not None and file_hash is not None
+    if use_cache:
+        with profiler.stage("cache_get", page=page.number):
+            pix = cache.get(file_hash, page.number, dpi, colorspace, alpha)
+        if pix is not None:
+            return pix
+
+    zoom = dpi / 72.0  # 72 is default DPI
+    with profiler.stage("get_pixmap", page=page.number) as span:
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=RENDER_COLORSPACES[colorspace], alpha=alpha)
+        span.bytes = len(pix.samples_mv)
+
+    if use_cache:
+        with profiler.stage("cache_put", page=page.number):
+            cache.put(file_hash, page.number, dpi, pix, colorspace, alpha)
+    return pix
+
+
+def render_colorspace(color_mode):
+    """Key of RENDER_COLORSPACES a colour mode renders with (bilevel starts from gray)"""
+    return "rgb" if color_mode == "rgb" else "gray"
+
+
+def image_chroma(image):
+    """Largest difference between the channels of an RGB image, 0 for pure gray"""
+    red, green, blue = image.convert("RGB").split()
+    return max(ImageChops.difference(red, green).getextrema()[1], ImageChops.difference(green, blue).getextrema()[1])
+
+
+def is_grayscale_page(page, dpi=DETECT_DPI, max_chroma=GRAY_MAX_CHROMA):
+    """
+    True when a small thumbnail of the page has no colour content
+
+    Anti-aliasing and JPEG noise in scans give gray pages a little chroma,
+    max_chroma is the tolerance for that.
+    """
+    zoom = dpi / 72.0
+    with get_profiler().stage("detect_color", page=page.number):
+        thumbnail = pixmap_to_image(page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csRGB))
+        return image_chroma(thumbnail) <= max_chroma
+
+
+def resolve_color_mode(page, color_mode):
+    """The concrete colour mode of a page ("auto" becomes "gray" or "rgb")"""
+    if color_mode not in COLOR_MODES:
+        raise ValueError(f"Mode warna tidak dikenal: {color_mode} (pilih {', '.join(COLOR_MODES)})")
+    if color_mode == "auto":
+        return "gray" if is_grayscale_page(page) else "rgb"
+    return color_mode
+
+
+def group_pages_by_color(doc, pages, color_mode):
+    """
+    Group page indexes by their concrete colour mode
+
+    Returns:
+        dict: colour mode -> page indexes (in the order of pages), only non-empty groups
+    """
+    groups = {}
+    for page_index in pages:
+        groups.setdefault(resolve_color_mode(doc[page_index], color_mode), []).append(page_index)
+    return groups
+
+
+def to_bilevel(image, threshold=DEFAULT_THRESHOLD, dither=False):
+    """
+    Convert an image to 1-bit (PIL mode "1")
+
+    Pixels at or above threshold become white, with dither=True PIL's
+    Floyd-Steinberg error diffusion is used instead of the threshold.
+    """
+    if image.mode != "L":
+        image = image.convert("L")
+    with get_profiler().stage("bilevel"):
+        if dither:
+            return image.convert("1", dither=Image.Dither.FLOYDSTEINBERG)
+        return image.point(lambda value: 255 if value >= threshold else 0, "1")
+
+
+def apply_color_mode(image, color_mode, threshold=DEFAULT_THRESHOLD, dither=False):
+    """
+    Bring a rendered page image into a concrete colour mode ("rgb", "gray" or "bilevel")
+    """
+    if color_mode == "bilevel":
+        return to_bilevel(image, threshold, dither)
+    if color_mode == "gray" and image.mode != "L":
+        return image.convert("L")
+    return image
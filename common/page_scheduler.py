@@ -0,0 +1,179 @@
+"""
+Page-level scheduler that converts many PDFs at once on one process pool.
+
+Every page of every file is a separate task (render -> encode -> write in
+the worker), so the pool stays busy until the very last page: workers pull
+the next task from a shared queue, and when only one big PDF is left all
+workers help with its remaining pages instead of idling. Tasks are handed
+out round-robin across files so every file makes progress from the start;
+with page costs (see common.prescan.page_pixels) the most expensive file
+starts first and each round hands out its biggest pages first.
+
+Only a bounded window of tasks is submitted at a time, which keeps memory
+flat for huge batches and lets a ``common.pipeline.JobControl`` pause or
+cancel the run between pages.
+"""
+
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import zip_longest
+
+import fitz  # PyMuPDF
+
+from common.encoding import encode_image
+from common.page_raster import (DEFAULT_THRESHOLD, apply_color_mode, pixmap_to_image, render_colorspace, render_page,
+                                resolve_color_mode)
+from common.pipeline import JobCancelled, write_bytes
+from common.profiling import enable_profiling, get_profiler
+from common.tiled_render import DEFAULT_PAGE_BUDGET_MB, page_raster_bytes, render_page_tiled
+
+# Documents a worker keeps open, pages of the same file usually follow each other
+_MAX_OPEN_DOCS = 4
+
+# Per-process state of the page workers
+_worker_docs = {}
+_worker_settings = None
+
+
+def default_workers():
+    """One worker per CPU"""
+    return os.cpu_count() or 1
+
+
+def _init_page_worker(settings, profile):
+    global _worker_settings
+    enable_profiling(profile)
+    _worker_settings = settings
+
+
+def _open_doc(path):
+    doc = _worker_docs.pop(path, None)
+    if doc is None:
+        if len(_worker_docs) >= _MAX_OPEN_DOCS:
+            # dicts keep insertion order, the first entry was used longest ago
+            oldest = next(iter(_worker_docs))
+            _worker_docs.pop(oldest).close()
+        doc = fitz.open(path)
+    _worker_docs[path] = doc
+    return doc
+
+
+def _convert_page_worker(job_index, path, file_hash, page_index, output_path):
+    """Render, encode and write one page in a worker process"""
+    settings = _worker_settings
+    start = time.perf_counter()
+    page = _open_doc(path)[page_index]
+    color_mode = resolve_color_mode(page, settings.get('color_mode', 'rgb'))
+    colorspace = render_colorspace(color_mode)
+    threshold = settings.get('threshold', DEFAULT_THRESHOLD)
+    dither = settings.get('dither', False)
+    budget_mb = settings.get('max_page_mb', DEFAULT_PAGE_BUDGET_MB)
+    if page_raster_bytes(page, settings['dpi'], colorspace) > budget_mb * 1024 * 1024:
+        render_page_tiled(page, settings['dpi'], output_path, settings['format'], settings['preset'],
+                          settings['quality'], color_mode, budget_mb, threshold, dither)
+        nbytes = os.path.getsize(output_path)
+        return job_index, page_index, output_path, nbytes, time.perf_counter() - start, get_profiler().drain()
+    pix = render_page(page, settings['dpi'], colorspace, cache=settings.get('cache'), file_hash=file_hash)
+    image = apply_color_mode(pixmap_to_image(pix), color_mode, threshold, dither)
+    data = encode_image(image, settings['format'], settings['preset'], settings['quality'])
+    with get_profiler().stage("write", page=page_index, nbytes=len(data)):
+        write_bytes(output_path, data)
+    return job_index, page_index, output_path, len(data), time.perf_counter() - start, get_profiler().drain()
+
+
+def convert_page_jobs(jobs, settings, workers=None, control=None, on_page=None, window=None, costs=None):
+    """
+    Convert the pages of many PDFs on one process pool
+
+    Args:
+        jobs: List of (pdf_path, [(page_index, output_path), ...])
+        settings: dpi, format, quality, preset, optional color_mode (common.page_raster.COLOR_MODES,
+            "auto" is decided per page in the worker), threshold, dither, cache (RenderCache)
+            and max_page_mb (pages above it are rendered in bands, see common.tiled_render)
+        workers: Worker processes (default: one per CPU)
+        control: Optional common.pipeline.JobControl for pause / cancel
+        on_page: callable(job_index, page_index, output_path, nbytes), called
+            on the calling thread as pages finish (not in page order)
+        window: Max tasks submitted ahead (default: 4 per worker)
+        costs: Optional per job list of page costs, in the order of its pages
+
+    Returns:
+        list: Per job {'files': output paths in page order, 'bytes': int, 'error': str or None}.
+        A failing page marks its job as failed and skips the job's remaining pages.
+
+    Raises:
+        JobCancelled: control was cancelled, pages already submitted are finished first
+    """
+    workers = max(1, workers or default_workers())
+    window = max(window or workers * 4, workers)
+    cache = settings.get('cache')
+    profiler = get_profiler()
+
+    results = [{'files': {}, 'bytes': 0, 'error': None} for _ in jobs]
+    file_hashes = [cache.file_hash(path) if cache else None for path, _ in jobs]
+    order = range(len(jobs))
+    if costs:
+        order = sorted(order, key=lambda job_index: -sum(costs[job_index]))
+    per_job = [
+        [(job_index, page_index, output_path, costs[job_index][position] if costs else 0)
+         for position, (page_index, output_path) in enumerate(jobs[job_index][1])]
+        for job_index in order
+    ]
+    # Round-robin across files: page 1 of every file, then page 2, ...
+    tasks = (
+        task[:3]
+        for row in zip_longest(*per_job)
+        for task in sorted((task for task in row if task is not None), key=lambda task: -task[3])
+    )
+
+    cancelled = False
+    pending = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_page_worker,
+                             initargs=(settings, profiler.enabled)) as executor:
+        try:
+            while True:
+                while len(pending) < window and not cancelled:
+                    if control is not None:
+                        cancelled = control.cancelled
+                        if cancelled or control.paused:
+                            break  # Only finish what is in flight
+                    task = next(tasks, None)
+                    if task is None:
+                        break
+                    job_index, page_index, output_path = task
+                    if results[job_index]['error']:
+                        continue
+                    future = executor.submit(_convert_page_worker, job_index, jobs[job_index][0],
+                                             file_hashes[job_index], page_index, output_path)
+                    pending[future] = task
+                if not pending:
+                    if cancelled or control is None or not control.paused:
+                        break
+                    cancelled = not control.wait_while_paused()
+                    continue
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job_index, page_index, output_path = pending.pop(future)
+                    try:
+                        _, _, output_path, nbytes, _, events = future.result()
+                    except Exception as e:
+                        if not results[job_index]['error']:
+                            results[job_index]['error'] = str(e)
+                        continue
+                    profiler.merge(events)
+                    results[job_index]['files'][page_index] = output_path
+                    results[job_index]['bytes'] += nbytes
+                    if on_page:
+                        on_page(job_index, page_index, output_path, nbytes)
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+
+    for result in results:
+        result['files'] = [result['files'][page_index] for page_index in sorted(result['files'])]
+    if cancelled:
+        raise JobCancelled()
+    return results
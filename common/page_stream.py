@@ -0,0 +1,140 @@
+"""
+Streaming API for PDF page rasters.
+
+``iter_page_rasters`` yields ``(page_index, raster, metadata)`` lazily, so
+rendered pages can be fed into OCR, uploads or encoders without touching
+disk. With ``workers`` > 0 pages are rendered ahead by background worker
+processes, but never more than ``prefetch`` pages beyond what the consumer
+has taken: a slow consumer simply stops new renders from being scheduled.
+
+Rendering runs in processes rather than threads because PyMuPDF is not
+thread-safe; each worker opens its own document handle.
+"""
+
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from common.page_raster import pixmap_to_image, render_page
+from common.profiling import enable_profiling, get_profiler
+
+_COLORSPACES = {1: fitz.csGRAY, 3: fitz.csRGB, 4: fitz.csCMYK}
+_IMAGE_MODES = {(1, 0): "L", (2, 1): "LA", (3, 0): "RGB", (4, 1): "RGBA", (4, 0): "CMYK"}
+
+# Per-process state of the render workers
+_worker_doc = None
+_worker_options = None
+
+
+def _init_render_worker(input_path, options, profile):
+    global _worker_doc, _worker_options
+    enable_profiling(profile)
+    _worker_doc = fitz.open(input_path)
+    _worker_options = options
+
+
+def _render_worker(page_index):
+    """Render one page in a worker process, returns the raw samples and profiling events"""
+    start = time.perf_counter()
+    pix = render_page(_worker_doc[page_index], **_worker_options)
+    seconds = time.perf_counter() - start
+    return page_index, pix.width, pix.height, pix.n, int(pix.alpha), pix.samples, seconds, get_profiler().drain()
+
+
+def _from_samples(width, height, channels, alpha, samples, as_image):
+    if as_image:
+        mode = _IMAGE_MODES[(channels, alpha)]
+        return Image.frombuffer(mode, (width, height), samples, "raw", mode, 0, 1)
+    return fitz.Pixmap(_COLORSPACES[channels - alpha], width, height, samples, alpha)
+
+
+def iter_page_rasters(input_path, dpi=150, pages=None, colorspace="rgb", alpha=False,
+                      as_image=False, workers=0, prefetch=None, cache=None):
+    """
+    Lazily render the pages of a PDF
+
+    Args:
+        input_path: Path to input PDF file
+        dpi: Render resolution
+        pages: Iterable of 0-based page indexes (default: all pages)
+        colorspace: Key of common.page_raster.RENDER_COLORSPACES
+        alpha: Render with a transparent background
+        as_image: Yield PIL images instead of fitz.Pixmap objects
+        workers: Background render processes (0 = render on demand in this thread)
+        prefetch: Max pages rendered ahead of the consumer (default: 2 per worker)
+        cache: Optional common.render_cache.RenderCache
+
+    Yields:
+        tuple: (page_index, pixmap or PIL image, metadata dict)
+    """
+    with fitz.open(input_path) as doc:
+        page_count = len(doc)
+    page_indexes = list(range(page_count) if pages is None else pages)
+
+    options = {
+        'dpi': dpi,
+        'colorspace': colorspace,
+        'alpha': alpha,
+        'cache': cache,
+        'file_hash': cache.file_hash(input_path) if cache else None,
+    }
+
+    def metadata(page_index, width, height, seconds):
+        return {
+            'source': input_path,
+            'page_number': page_index + 1,
+            'page_count': page_count,
+            'pages_in_stream': len(page_indexes),
+            'width': width,
+            'height': height,
+            'dpi': dpi,
+            'colorspace': colorspace,
+            'render_seconds': seconds,
+        }
+
+    if workers <= 0:
+        doc = fitz.open(input_path)
+        try:
+            for page_index in page_indexes:
+                start = time.perf_counter()
+                pix = render_page(doc[page_index], **options)
+                seconds = time.perf_counter() - start
+                raster = pixmap_to_image(pix) if as_image else pix
+                yield page_index, raster, metadata(page_index, pix.width, pix.height, seconds)
+        finally:
+            doc.close()
+        return
+
+    prefetch = max(prefetch or workers * 2, 1)
+    executor = ProcessPoolExecutor(
+        max_workers=min(workers, max(len(page_indexes), 1)),
+        initializer=_init_render_worker,
+        initargs=(os.path.abspath(input_path), options, get_profiler().enabled),
+    )
+    profiler = get_profiler()
+    pending = deque()
+    remaining = iter(page_indexes)
+    try:
+        for page_index in remaining:
+            pending.append(executor.submit(_render_worker, page_index))
+            if len(pending) >= prefetch:
+                break
+
+        while pending:
+            page_index, width, height, channels, has_alpha, samples, seconds, events = pending.popleft().result()
+            profiler.merge(events)
+            # Keep the window full before handing the page to the consumer
+            next_index = next(remaining, None)
+            if next_index is not None:
+                pending.append(executor.submit(_render_worker, next_index))
+            raster = _from_samples(width, height, channels, has_alpha, samples, as_image)
+            yield page_index, raster, metadata(page_index, width, height, seconds)
+    finally:
+        # Consumer stopped early or an error occurred: drop renders that were not started
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
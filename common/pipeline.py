@@ -0,0 +1,321 @@
+"""
+Pipelined render -> encode -> write executor for PDF pages.
+
+Each stage runs on its own workers with a bounded queue in between, so
+MuPDF can render the next page while PIL encodes the previous one and the
+one before that is being written to (network) disk. PIL's zlib/libjpeg/
+libwebp encoders release the GIL, so encode threads really run in parallel.
+
+PyMuPDF is not thread-safe, so the render stage is a single feeder thread
+reading from ``common.page_stream.iter_page_rasters`` (optionally backed by
+render processes). Encode and write callbacks only ever see PIL images and
+must not call fitz; common.encoding.encode_image is a safe encoder.
+
+A ``JobControl`` passed to ``PagePipeline.run`` lets another thread (a GUI)
+pause the render stage or cancel the run.
+"""
+
+import heapq
+import queue
+import threading
+import time
+
+from common.page_stream import iter_page_rasters
+from common.profiling import get_profiler
+
+_DONE = object()
+_POLL_SECONDS = 0.1
+
+
+def write_bytes(path, data):
+    """Write encoded page data to disk, returns the path"""
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+class JobCancelled(Exception):
+    """Raised by PagePipeline.run when its JobControl was cancelled"""
+
+
+class JobControl:
+    """
+    Cancel / pause switch shared between a UI thread and running pipelines
+
+    Pausing stops the render stage from starting new pages, pages already
+    rendered still go through encode and write. Cancelling also wakes up a
+    paused pipeline so it can stop.
+    """
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+        self._running.set()
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def wait_while_paused(self, stop=None):
+        """Block while paused (or until stop is set), returns False once cancelled"""
+        while not self._running.wait(_POLL_SECONDS):
+            if stop is not None and stop.is_set():
+                break
+        return not self.cancelled
+
+
+class StageTiming:
+    """
+    Counters for one pipeline stage
+
+    busy_seconds is time spent doing the stage's work, idle_seconds waiting
+    for input and blocked_seconds waiting for room in the next queue. A stage
+    that is mostly blocked is faster than the one after it.
+    """
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.idle_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, busy=0.0, idle=0.0, blocked=0.0, items=0):
+        with self._lock:
+            self.busy_seconds += busy
+            self.idle_seconds += idle
+            self.blocked_seconds += blocked
+            self.items += items
+
+    def as_dict(self):
+        return {
+            'workers': self.workers,
+            'items': self.items,
+            'busy_seconds': round(self.busy_seconds, 4),
+            'idle_seconds': round(self.idle_seconds, 4),
+            'blocked_seconds': round(self.blocked_seconds, 4),
+        }
+
+
+class PagePipeline:
+    """
+    Run render -> encode -> write over the pages of a PDF
+
+    Args:
+        encode: callable(page_index, image, info) -> payload, runs on encode threads
+        write: callable(page_index, payload, info) -> result, runs on write threads
+        render_workers: Render processes (0 = render on the feeder thread)
+        encode_workers: Encode threads
+        write_workers: Write threads
+        queue_size: Max items waiting between two stages
+    """
+
+    def __init__(self, encode, write, render_workers=0, encode_workers=2, write_workers=2, queue_size=4):
+        self.encode = encode
+        self.write = write
+        self.render_workers = render_workers
+        self.encode_workers = max(1, encode_workers)
+        self.write_workers = max(1, write_workers)
+        self.queue_size = max(1, queue_size)
+        self.timings = {}
+        self.wall_seconds = 0.0
+
+    def run(self, input_path, dpi=150, pages=None, colorspace="rgb", cache=None, on_page=None, control=None):
+        """
+        Process the pages, returns the write results in page order
+
+        on_page(page_index, result, info) is called on the calling thread, in
+        page order, as soon as a page and all pages before it are written.
+
+        With a JobControl the run can be paused and cancelled from another
+        thread, a cancelled run raises JobCancelled after its threads stopped.
+        """
+        pages = list(pages) if pages is not None else None
+        self.timings = {
+            'render': StageTiming('render', max(1, self.render_workers)),
+            'encode': StageTiming('encode', self.encode_workers),
+            'write': StageTiming('write', self.write_workers),
+        }
+        profiler = get_profiler()
+        rendered = queue.Queue(self.queue_size)
+        encoded = queue.Queue(self.queue_size)
+        finished = queue.Queue()
+        stop = threading.Event()
+        errors = []
+        cancelled = []
+        remaining_encoders = [self.encode_workers]
+        counter_lock = threading.Lock()
+
+        def put(target, item):
+            start = time.perf_counter()
+            while not stop.is_set():
+                try:
+                    target.put(item, timeout=_POLL_SECONDS)
+                    return time.perf_counter() - start
+                except queue.Full:
+                    continue
+            return time.perf_counter() - start
+
+        def get(source):
+            start = time.perf_counter()
+            while not stop.is_set():
+                try:
+                    return source.get(timeout=_POLL_SECONDS), time.perf_counter() - start
+                except queue.Empty:
+                    continue
+            return _DONE, time.perf_counter() - start
+
+        def fail(error):
+            errors.append(error)
+            stop.set()
+
+        def render_stage():
+            timing = self.timings['render']
+            stream = iter_page_rasters(input_path, dpi=dpi, pages=pages, colorspace=colorspace,
+                                       as_image=True, workers=self.render_workers, cache=cache)
+            try:
+                while not stop.is_set():
+                    if control is not None and not control.wait_while_paused(stop):
+                        cancelled.append(True)
+                        stop.set()  # Drop what is still queued
+                        break
+                    start = time.perf_counter()
+                    item = next(stream, None)
+                    waited = time.perf_counter() - start
+                    if item is None:
+                        break
+                    page_index, image, info = item
+                    if getattr(image, "_pixmap", None) is not None:
+                        # Only mapped layouts (gray, RGBA, CMYK) still reference a fitz pixmap.
+                        # Detach those so the pixmap is freed on this thread, not an encoder's
+                        # (PyMuPDF is not thread-safe); RGB images are already a copy
+                        image = image.copy()
+                    blocked = put(rendered, (page_index, image, info))
+                    timing.add(busy=info['render_seconds'], idle=max(waited - info['render_seconds'], 0.0),
+                               blocked=blocked, items=1)
+            except Exception as e:
+                fail(e)
+            finally:
+                stream.close()
+                for _ in range(self.encode_workers):
+                    put(rendered, _DONE)
+
+        def encode_stage():
+            timing = self.timings['encode']
+            try:
+                while True:
+                    item, idle = get(rendered)
+                    if item is _DONE:
+                        timing.add(idle=idle)
+                        break
+                    page_index, image, info = item
+                    start = time.perf_counter()
+                    with profiler.stage("encode", page=page_index) as span:
+                        payload = self.encode(page_index, image, info)
+                        if isinstance(payload, bytes):
+                            span.bytes = len(payload)
+                    busy = time.perf_counter() - start
+                    blocked = put(encoded, (page_index, payload, info))
+                    timing.add(busy=busy, idle=idle, blocked=blocked, items=1)
+            except Exception as e:
+                fail(e)
+            finally:
+                with counter_lock:
+                    remaining_encoders[0] -= 1
+                    last = remaining_encoders[0] == 0
+                if last:
+                    for _ in range(self.write_workers):
+                        put(encoded, _DONE)
+
+        def write_stage():
+            timing = self.timings['write']
+            try:
+                while True:
+                    item, idle = get(encoded)
+                    if item is _DONE:
+                        timing.add(idle=idle)
+                        break
+                    page_index, payload, info = item
+                    start = time.perf_counter()
+                    with profiler.stage("write", page=page_index) as span:
+                        result = self.write(page_index, payload, info)
+                        if isinstance(payload, bytes):
+                            span.bytes = len(payload)
+                    timing.add(busy=time.perf_counter() - start, idle=idle, items=1)
+                    finished.put((page_index, result, info))
+            except Exception as e:
+                fail(e)
+            finally:
+                finished.put(_DONE)
+
+        threads = [threading.Thread(target=render_stage, name="pipeline-render", daemon=True)]
+        threads += [threading.Thread(target=encode_stage, name=f"pipeline-encode-{i}", daemon=True)
+                    for i in range(self.encode_workers)]
+        threads += [threading.Thread(target=write_stage, name=f"pipeline-write-{i}", daemon=True)
+                    for i in range(self.write_workers)]
+
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+
+        # Release results in page order (stream order), writers may finish out of order
+        positions = {page_index: i for i, page_index in enumerate(pages)} if pages is not None else None
+        results = []
+        ready = []
+        next_position = 0
+        writers_left = self.write_workers
+        try:
+            while writers_left:
+                item = finished.get()
+                if item is _DONE:
+                    writers_left -= 1
+                    continue
+                page_index, result, info = item
+                position = positions[page_index] if positions is not None else page_index
+                heapq.heappush(ready, (position, page_index, result, info))
+                while ready and ready[0][0] == next_position:
+                    _, page_index, result, info = heapq.heappop(ready)
+                    results.append(result)
+                    next_position += 1
+                    if on_page:
+                        on_page(page_index, result, info)
+        except BaseException:
+            stop.set()
+            raise
+        finally:
+            for thread in threads:
+                thread.join()
+            self.wall_seconds = time.perf_counter() - start
+
+        if errors:
+            raise errors[0]
+        if cancelled:
+            raise JobCancelled()
+        return results
+
+    def summary(self):
+        """Stage timings as printable lines"""
+        lines = [f"⏱️  Pipeline {self.wall_seconds:.2f}s"]
+        for timing in self.timings.values():
+            lines.append(
+                f"   {timing.name:<7} x{timing.workers}: {timing.items} halaman, "
+                f"kerja {timing.busy_seconds:.2f}s, nunggu input {timing.idle_seconds:.2f}s, "
+                f"ketahan antrian {timing.blocked_seconds:.2f}s"
+            )
+        return lines
@@ -0,0 +1,79 @@
+"""
+Quick pre-scan of PDFs before any rendering starts.
+
+``scan_pdf`` opens a document lazily (MuPDF only reads the xref table and
+page tree) and collects the page count, page sizes and encryption / repair
+status. Tools use the result to plan work by pixel cost, to show progress
+and ETAs weighted by pages instead of files, and to reject broken or
+password-protected inputs up front.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz  # PyMuPDF
+
+
+def scan_pdf(path):
+    """
+    Returns:
+        dict: path, pages, page_sizes ([(width, height)] in points), encrypted,
+        repaired and error (None when the file can be converted)
+    """
+    info = {'path': path, 'pages': 0, 'page_sizes': [], 'encrypted': False, 'repaired': False, 'error': None}
+    try:
+        with fitz.open(path) as doc:
+            info['encrypted'] = bool(doc.is_encrypted)
+            if doc.needs_pass:
+                info['error'] = "PDF dilindungi password"
+                return info
+            info['repaired'] = bool(doc.is_repaired)
+            info['pages'] = doc.page_count
+            # page_cropbox reads the page dictionary only, the page is not loaded
+            info['page_sizes'] = [(rect.width, rect.height) for rect in map(doc.page_cropbox, range(doc.page_count))]
+            if not info['pages']:
+                info['error'] = "PDF tidak punya halaman"
+    except Exception as e:
+        info['error'] = f"PDF rusak atau tidak bisa dibuka: {e}"
+    return info
+
+
+def scan_pdfs(paths, workers=1):
+    """
+    Pre-scan many PDFs, in parallel processes when workers > 1
+
+    Returns:
+        list: scan_pdf results in the order of paths
+    """
+    paths = list(paths)
+    if workers <= 1 or len(paths) < 2:
+        return [scan_pdf(path) for path in paths]
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+        return list(executor.map(scan_pdf, paths))
+
+
+def page_pixels(info, dpi, pages=None):
+    """
+    Pixel cost of each page at dpi (rendering and encoding time scale with it)
+
+    Args:
+        info: scan_pdf result
+        dpi: Render resolution
+        pages: 0-based page indexes (default: all pages)
+
+    Returns:
+        list: Pixels per page, in the order of pages
+    """
+    scale = (dpi / 72.0) ** 2
+    sizes = info['page_sizes']
+    indexes = range(len(sizes)) if pages is None else pages
+    return [int(sizes[index][0] * sizes[index][1] * scale) for index in indexes]
+
+
+def describe(info):
+    """One printable line per scanned file"""
+    name = os.path.basename(info['path'])
+    if info['error']:
+        return f"❌ {name}: {info['error']}"
+    flags = [flag for flag, on in (("terenkripsi", info['encrypted']), ("diperbaiki", info['repaired'])) if on]
+    return f"✅ {name}: {info['pages']} halaman{' (' + ', '.join(flags) + ')' if flags else ''}"
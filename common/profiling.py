@@ -0,0 +1,207 @@
+"""
+Per-page, per-stage timing instrumentation for the conversion engines.
+
+Engines call ``get_profiler().stage(name, page=...)`` around interesting work
+(``get_pixmap``, PIL encode, text re-insertion, disk writes, ...). Profiling
+is off by default: the active profiler is then a ``NullProfiler`` whose
+``stage`` returns a shared no-op context manager, so the cost is one function
+call per stage.
+
+``--profile`` in the tools calls ``enable_profiling()``, prints ``summary()``
+at the end and ``--profile-trace`` writes a Chrome trace (chrome://tracing or
+https://ui.perfetto.dev). Worker processes enable their own profiler and hand
+their events back with ``drain()``; the parent adds them with ``merge()``.
+
+Only the standard library is used, so any tool can import this module.
+"""
+
+import json
+import os
+import threading
+import time
+
+
+class _Span:
+    """Handle yielded by stage(), set .bytes to record a byte count"""
+
+    __slots__ = ("bytes",)
+
+    def __init__(self):
+        self.bytes = None
+
+
+class _NullStage:
+    __slots__ = ()
+    _span = _Span()
+
+    def __enter__(self):
+        return self._span
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class NullProfiler:
+    """Profiler used when profiling is disabled, every method is a no-op"""
+
+    enabled = False
+
+    def stage(self, name, page=None, nbytes=None):
+        return _NULL_STAGE
+
+    def record(self, name, seconds, page=None, nbytes=None):
+        pass
+
+    def drain(self):
+        return []
+
+    def merge(self, events):
+        pass
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "page", "span", "start")
+
+    def __init__(self, profiler, name, page, nbytes):
+        self.profiler = profiler
+        self.name = name
+        self.page = page
+        self.span = _Span()
+        self.span.bytes = nbytes
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self.span
+
+    def __exit__(self, *exc):
+        self.profiler._add(self.name, self.start, time.perf_counter() - self.start, self.page, self.span.bytes)
+        return False
+
+
+class Profiler:
+    """
+    Collects timing events as plain dicts
+
+    Event timestamps are wall-clock microseconds, so events from worker
+    processes line up with the parent's in the trace.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+        # perf_counter is precise but per-process, anchor it to the wall clock once
+        self._epoch_offset = time.time() - time.perf_counter()
+
+    def stage(self, name, page=None, nbytes=None):
+        """Context manager timing one stage, ``with profiler.stage("encode", page=3) as span:``"""
+        return _Stage(self, name, page, nbytes)
+
+    def record(self, name, seconds, page=None, nbytes=None):
+        """Record a stage that was timed elsewhere (ending now)"""
+        self._add(name, time.perf_counter() - seconds, seconds, page, nbytes)
+
+    def _add(self, name, start, seconds, page, nbytes):
+        event = {
+            'name': name,
+            'ts': (start + self._epoch_offset) * 1e6,
+            'dur': seconds * 1e6,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+        }
+        if page is not None:
+            event['page'] = page
+        if nbytes is not None:
+            event['bytes'] = nbytes
+        with self._lock:
+            self.events.append(event)
+
+    def drain(self):
+        """Return and forget the collected events (used by worker processes)"""
+        with self._lock:
+            events, self.events = self.events, []
+        return events
+
+    def merge(self, events):
+        """Add events collected in another process"""
+        with self._lock:
+            self.events.extend(events)
+
+    def summary(self):
+        """Per-stage totals as printable lines, slowest stage first"""
+        stages = {}
+        for event in self.events:
+            totals = stages.setdefault(event['name'], {'count': 0, 'seconds': 0.0, 'bytes': 0, 'pages': set()})
+            totals['count'] += 1
+            totals['seconds'] += event['dur'] / 1e6
+            totals['bytes'] += event.get('bytes') or 0
+            if 'page' in event:
+                totals['pages'].add(event['page'])
+
+        grand_total = sum(totals['seconds'] for totals in stages.values()) or 1.0
+        lines = [f"{'Tahap':<18} {'x':>6} {'total (s)':>10} {'rata2 (ms)':>11} {'%':>6} {'bytes':>12}"]
+        for name, totals in sorted(stages.items(), key=lambda item: -item[1]['seconds']):
+            lines.append(
+                f"{name:<18} {totals['count']:>6} {totals['seconds']:>10.3f} "
+                f"{totals['seconds'] / totals['count'] * 1000:>11.2f} "
+                f"{totals['seconds'] / grand_total * 100:>5.1f}% {totals['bytes'] or '-':>12}"
+            )
+        return lines
+
+    def write_chrome_trace(self, path):
+        """Write the events in Chrome trace event format"""
+        trace = []
+        for event in self.events:
+            args = {key: event[key] for key in ('page', 'bytes') if key in event}
+            trace.append({
+                'name': event['name'], 'ph': 'X', 'ts': round(event['ts'], 1), 'dur': round(event['dur'], 1),
+                'pid': event['pid'], 'tid': event['tid'], 'args': args,
+            })
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f)
+
+
+NULL_PROFILER = NullProfiler()
+_active = NULL_PROFILER
+
+
+def get_profiler():
+    """The profiler of this process (a NullProfiler unless profiling is enabled)"""
+    return _active
+
+
+def enable_profiling(enabled=True):
+    """
+    Install a fresh profiler for this process, or the null profiler
+
+    Worker initializers call this with the parent's setting: a forked worker
+    would otherwise inherit a copy of the parent's profiler and its events.
+    """
+    global _active
+    _active = Profiler() if enabled else NULL_PROFILER
+    return _active
+
+
+def add_profile_arguments(parser):
+    """Add --profile / --profile-trace to an argparse parser"""
+    parser.add_argument('--profile', action='store_true',
+                        help='Catat waktu per halaman per tahap, tampilkan ringkasan di akhir')
+    parser.add_argument('--profile-trace', metavar='FILE',
+                        help='Tulis timeline Chrome trace (JSON) ke FILE (otomatis mengaktifkan --profile)')
+
+
+def report(args):
+    """Print the summary and write the trace requested by add_profile_arguments options"""
+    profiler = get_profiler()
+    if not profiler.enabled:
+        return
+    print("\n⏱️  Profil per tahap:")
+    for line in profiler.summary():
+        print(f"   {line}")
+    if args.profile_trace:
+        profiler.write_chrome_trace(args.profile_trace)
+        print(f"💾 Chrome trace disimpan di: {args.profile_trace}")
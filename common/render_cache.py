@@ -0,0 +1,168 @@
+"""
+Persistent on-disk cache of rendered page rasters.
+
+Entries are keyed by (PDF content hash, page index, DPI, colourspace, alpha),
+so re-running a conversion with only a different output format skips
+rendering and pays for encoding only. The cache is capped in size and
+evicts the least recently used entries first.
+
+Samples are stored zlib-compressed at level 1: raw RGB pages are ~6.5 MB
+each at 150 DPI (a 500-page document would not fit the default cap and a
+second LRU pass would miss on every page), while level 1 shrinks typical
+pages many times over and decompresses faster than the page renders.
+"""
+
+import hashlib
+import os
+import struct
+import tempfile
+import zlib
+
+import fitz  # PyMuPDF
+
+DEFAULT_MAX_MB = 2048
+
+# magic, width, height, channels, alpha
+_HEADER = struct.Struct("<4sIIBB")
+_MAGIC = b"PXC2"
+_ZLIB_LEVEL = 1
+
+_COLORSPACES = {1: fitz.csGRAY, 3: fitz.csRGB, 4: fitz.csCMYK}
+
+
+def default_cache_dir():
+    """Per-user cache folder (LOCALAPPDATA on Windows, ~/.cache elsewhere)"""
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "pdf-tools", "render-cache")
+
+
+class RenderCache:
+    """
+    LRU cache of page pixmaps stored as compressed samples on disk
+
+    The object only holds paths and counters, so it can be passed to worker
+    processes; concurrent writers are safe because entries are written to a
+    temporary file and moved into place atomically.
+    """
+
+    def __init__(self, cache_dir=None, max_mb=DEFAULT_MAX_MB):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._hashes = {}
+        self._total_bytes = None
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def file_hash(self, path):
+        """SHA-256 of the PDF content, memoised per (path, size, mtime)"""
+        stat = os.stat(path)
+        memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        if memo_key not in self._hashes:
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+            self._hashes[memo_key] = digest.hexdigest()
+        return self._hashes[memo_key]
+
+    def _entry_path(self, file_hash, page_index, dpi, colorspace, alpha):
+        name = f"{file_hash[:32]}_{page_index}_{dpi}_{colorspace}_{int(bool(alpha))}.pix"
+        # Two-level fan-out keeps directories small for big documents
+        return os.path.join(self.cache_dir, file_hash[:2], name)
+
+    def get(self, file_hash, page_index, dpi, colorspace="rgb", alpha=False):
+        """
+        Returns:
+            fitz.Pixmap or None: Cached raster, None on a miss
+        """
+        path = self._entry_path(file_hash, page_index, dpi, colorspace, alpha)
+        try:
+            with open(path, "rb") as f:
+                magic, width, height, channels, has_alpha = _HEADER.unpack(f.read(_HEADER.size))
+                data = f.read()
+        except (OSError, struct.error):
+            self.misses += 1
+            return None
+
+        # Entries of the older raw format (PXC1) count as misses and get replaced
+        samples = None
+        if magic == _MAGIC:
+            try:
+                samples = zlib.decompress(data)
+            except zlib.error:
+                pass
+        if samples is None or len(samples) != width * height * channels:
+            self.misses += 1
+            return None
+
+        # Touch the entry so eviction sees it as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return fitz.Pixmap(_COLORSPACES[channels - has_alpha], width, height, samples, has_alpha)
+
+    def put(self, file_hash, page_index, dpi, pix, colorspace="rgb", alpha=False):
+        """Store a rendered pixmap, evicting old entries when over the size cap"""
+        path = self._entry_path(file_hash, page_index, dpi, colorspace, alpha)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        header = _HEADER.pack(_MAGIC, pix.width, pix.height, pix.n, int(bool(pix.alpha)))
+        data = zlib.compress(pix.samples_mv, _ZLIB_LEVEL)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(header)
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+
+        if self._total_bytes is None:
+            self._total_bytes = self._scan_size()
+        else:
+            self._total_bytes += len(header) + len(data)
+        if self._total_bytes > self.max_bytes:
+            self.evict()
+
+    def _entries(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".pix"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, stat.st_size, stat.st_mtime
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, target_ratio=0.9):
+        """Delete least recently used entries until the cache is below target_ratio of the cap"""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        limit = self.max_bytes * target_ratio
+        for path, size, _ in entries:
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._total_bytes = total
+
+    def clear(self):
+        """Delete every cached raster"""
+        for path, _, _ in list(self._entries()):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._total_bytes = 0
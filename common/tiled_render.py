@@ -0,0 +1,277 @@
+"""
+Memory-bounded rendering of huge pages in horizontal bands.
+
+A 600 DPI A0 page is ~19800 x 28000 pixels, a 1.6 GB RGB pixmap, before PIL
+makes its own copy. ``render_page_tiled`` renders such a page band by band
+(``get_pixmap(clip=...)``) with the band height chosen from a per-worker
+memory budget, and streams every band straight into the output file:
+
+- PNG and TIFF are written strip by strip by the small writers below
+  (zlib from the standard library), so memory stays at about one band.
+- JPEG and WEBP encoders need the whole image, the bands are pasted into a
+  single PIL image, which still avoids the pixmap + PIL double copy.
+
+Bilevel pages are thresholded band by band; dithering error does not carry
+over band borders, which is invisible at the resolutions tiling kicks in.
+
+Pages whose full pixmap fits the budget are left to the normal render path,
+see ``split_huge_pages``.
+"""
+
+import math
+import struct
+import zlib
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from common.encoding import encode_image
+from common.page_raster import (DEFAULT_THRESHOLD, RENDER_COLORSPACES, apply_color_mode, pixmap_to_image,
+                                render_colorspace, resolve_color_mode)
+from common.pipeline import write_bytes
+from common.profiling import get_profiler
+
+DEFAULT_PAGE_BUDGET_MB = 256
+STREAMED_FORMATS = ("PNG", "TIFF")
+
+_CHANNELS = {"rgb": 3, "gray": 1}
+_MODES = {"rgb": "RGB", "gray": "L", "bilevel": "1"}
+_MIN_BAND_ROWS = 16
+# zlib level per encoding preset (PIL's optimize=True has no streaming equivalent)
+_ZLIB_LEVELS = {"fast": 1, "balanced": 6, "smallest": 9}
+
+
+def page_pixel_size(page, dpi):
+    """(width, height) in pixels of the page rendered at dpi"""
+    irect = (page.rect * fitz.Matrix(dpi / 72.0, dpi / 72.0)).irect
+    return irect.width, irect.height
+
+
+def page_raster_bytes(page, dpi, colorspace="rgb"):
+    """Size of the full page pixmap at dpi"""
+    width, height = page_pixel_size(page, dpi)
+    return width * height * _CHANNELS[colorspace]
+
+
+def band_rows(page, dpi, colorspace="rgb", budget_mb=DEFAULT_PAGE_BUDGET_MB):
+    """
+    Rows per band so one band uses at most half the budget (the other half
+    covers the encoder buffers and the band being converted for PIL)
+    """
+    width, _ = page_pixel_size(page, dpi)
+    row_bytes = max(width * _CHANNELS[colorspace], 1)
+    return max(_MIN_BAND_ROWS, int(budget_mb * 1024 * 1024 // 2 // row_bytes))
+
+
+def split_huge_pages(doc, pages, dpi, colorspace="rgb", budget_mb=DEFAULT_PAGE_BUDGET_MB):
+    """
+    Split page indexes into (normal, huge): huge pages do not fit the budget in one piece
+    """
+    budget = budget_mb * 1024 * 1024
+    normal, huge = [], []
+    for page_index in pages:
+        (huge if page_raster_bytes(doc[page_index], dpi, colorspace) > budget else normal).append(page_index)
+    return normal, huge
+
+
+def iter_page_bands(page, dpi, colorspace="rgb", rows=None, budget_mb=DEFAULT_PAGE_BUDGET_MB):
+    """
+    Render a page as horizontal bands
+
+    Every band is exactly ``rows`` pixels high (the last one may be lower),
+    rounding differences of the clip are cropped or padded with white.
+
+    Yields:
+        PIL.Image.Image: One band, top to bottom
+    """
+    rows = rows or band_rows(page, dpi, colorspace, budget_mb)
+    zoom = dpi / 72.0
+    matrix = fitz.Matrix(zoom, zoom)
+    width, height = page_pixel_size(page, dpi)
+    rect = page.rect
+    profiler = get_profiler()
+
+    for top in range(0, height, rows):
+        band_height = min(rows, height - top)
+        clip = fitz.Rect(rect.x0, rect.y0 + top / zoom, rect.x1, rect.y0 + (top + band_height) / zoom)
+        with profiler.stage("get_pixmap_band", page=page.number) as span:
+            pix = page.get_pixmap(matrix=matrix, clip=clip, colorspace=RENDER_COLORSPACES[colorspace], alpha=False)
+            span.bytes = len(pix.samples_mv)
+        band = pixmap_to_image(pix)
+        if band.size != (width, band_height):
+            fixed = Image.new(band.mode, (width, band_height), 255 if band.mode == "L" else (255, 255, 255))
+            fixed.paste(band.crop((0, 0, min(band.width, width), min(band.height, band_height))), (0, 0))
+            band = fixed
+        yield band
+        del pix, band
+
+
+def _png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+
+class PngStripWriter:
+    """
+    Write a 1-bit or 8-bit grayscale or an RGB PNG band by band
+
+    Rows are stored with filter type 0 and deflated with one streaming zlib
+    object, IDAT chunks are flushed as compressed data comes out.
+    """
+
+    def __init__(self, path, width, height, mode, level=6, dpi=None):
+        self.file = open(path, "wb")
+        self.width = width
+        self.rows_left = height
+        self.compressor = zlib.compressobj(level)
+        color_type = 2 if mode == "RGB" else 0
+        bit_depth = 1 if mode == "1" else 8
+        self.file.write(b"\x89PNG\r\n\x1a\n")
+        self.file.write(_png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, bit_depth, color_type, 0, 0, 0)))
+        if dpi:
+            pixels_per_meter = round(dpi / 0.0254)
+            self.file.write(_png_chunk(b"pHYs", struct.pack(">IIB", pixels_per_meter, pixels_per_meter, 1)))
+
+    def write_band(self, band):
+        data = band.tobytes()
+        stride = len(data) // band.height
+        # Filter byte 0 in front of every row
+        rows = b"".join(b"\x00" + data[offset:offset + stride] for offset in range(0, len(data), stride))
+        compressed = self.compressor.compress(rows)
+        if compressed:
+            self.file.write(_png_chunk(b"IDAT", compressed))
+        self.rows_left -= band.height
+
+    def close(self):
+        if self.rows_left:
+            self.file.close()
+            raise ValueError(f"PNG tidak lengkap, kurang {self.rows_left} baris")
+        self.file.write(_png_chunk(b"IDAT", self.compressor.flush()))
+        self.file.write(_png_chunk(b"IEND", b""))
+        self.file.close()
+
+
+class TiffStripWriter:
+    """
+    Write a baseline little-endian TIFF, one (optionally deflated) strip per band
+
+    All bands but the last must have the same height, it becomes RowsPerStrip.
+    Strips are written as they come, the IFD follows them at the end.
+    """
+
+    def __init__(self, path, width, height, mode, rows_per_strip, deflate_level=None, dpi=None):
+        self.file = open(path, "wb")
+        self.width = width
+        self.height = height
+        self.samples = 3 if mode == "RGB" else 1
+        self.bits = 1 if mode == "1" else 8
+        self.rows_per_strip = rows_per_strip
+        self.deflate_level = deflate_level
+        self.dpi = dpi or 72
+        self.offsets = []
+        self.counts = []
+        # Header, the IFD offset is patched in close()
+        self.file.write(b"II*\x00" + struct.pack("<I", 0))
+
+    def write_band(self, band):
+        data = band.tobytes()
+        if self.deflate_level is not None:
+            data = zlib.compress(data, self.deflate_level)
+        if self.file.tell() % 2:
+            self.file.write(b"\x00")  # Keep offsets word aligned
+        self.offsets.append(self.file.tell())
+        self.counts.append(len(data))
+        self.file.write(data)
+
+    def _extra(self, values, fmt):
+        """Write out-of-line tag data, returns its offset"""
+        if self.file.tell() % 2:
+            self.file.write(b"\x00")
+        offset = self.file.tell()
+        self.file.write(struct.pack("<" + fmt * len(values), *values))
+        return offset
+
+    def close(self):
+        SHORT, LONG, RATIONAL = 3, 4, 5
+        strips = len(self.offsets)
+        expected = math.ceil(self.height / self.rows_per_strip)
+        if strips != expected:
+            self.file.close()
+            raise ValueError(f"TIFF tidak lengkap, {strips} dari {expected} strip")
+
+        def long_array(values):
+            return values[0] if len(values) == 1 else self._extra(values, "I")
+
+        bits = self.bits if self.samples == 1 else self._extra([self.bits] * self.samples, "H")
+        offsets = long_array(self.offsets)
+        counts = long_array(self.counts)
+        resolution = self._extra([self.dpi, 1], "I")
+        tags = [
+            (256, LONG, 1, self.width),                                  # ImageWidth
+            (257, LONG, 1, self.height),                                 # ImageLength
+            (258, SHORT, self.samples, bits),                            # BitsPerSample
+            (259, SHORT, 1, 8 if self.deflate_level is not None else 1), # Compression
+            (262, SHORT, 1, 2 if self.samples == 3 else 1),              # Photometric: RGB / BlackIsZero
+            (273, LONG, strips, offsets),                                # StripOffsets
+            (277, SHORT, 1, self.samples),                               # SamplesPerPixel
+            (278, LONG, 1, self.rows_per_strip),                         # RowsPerStrip
+            (279, LONG, strips, counts),                                 # StripByteCounts
+            (282, RATIONAL, 1, resolution),                              # XResolution
+            (283, RATIONAL, 1, resolution),                              # YResolution
+            (284, SHORT, 1, 1),                                          # PlanarConfiguration: chunky
+            (296, SHORT, 1, 2),                                          # ResolutionUnit: inch
+        ]
+
+        if self.file.tell() % 2:
+            self.file.write(b"\x00")
+        ifd_offset = self.file.tell()
+        self.file.write(struct.pack("<H", len(tags)))
+        for tag, kind, count, value in tags:
+            # SHORT values that fit are stored left-aligned in the 4-byte field
+            packed = struct.pack("<HH", value, 0) if kind == SHORT and count == 1 else struct.pack("<I", value)
+            self.file.write(struct.pack("<HHI", tag, kind, count) + packed)
+        self.file.write(struct.pack("<I", 0))  # No next IFD
+        self.file.seek(4)
+        self.file.write(struct.pack("<I", ifd_offset))
+        self.file.close()
+
+
+def render_page_tiled(page, dpi, output_path, image_format="PNG", preset="balanced", quality=None,
+                      color_mode="rgb", budget_mb=DEFAULT_PAGE_BUDGET_MB, threshold=DEFAULT_THRESHOLD, dither=False):
+    """
+    Render a page band by band into output_path, returns the path
+
+    color_mode is one of common.page_raster.COLOR_MODES, bilevel bands are
+    thresholded (or dithered) one by one. PNG and TIFF are streamed strip by
+    strip (TIFF is deflated unless the preset is "fast"), other formats are
+    assembled into one image first.
+    """
+    image_format = image_format.upper()
+    color_mode = resolve_color_mode(page, color_mode)
+    colorspace = render_colorspace(color_mode)
+    rows = band_rows(page, dpi, colorspace, budget_mb)
+    width, height = page_pixel_size(page, dpi)
+    mode = _MODES[color_mode]
+    bands = (apply_color_mode(band, color_mode, threshold, dither)
+             for band in iter_page_bands(page, dpi, colorspace, rows))
+
+    if image_format not in STREAMED_FORMATS:
+        image = Image.new(mode, (width, height))
+        for index, band in enumerate(bands):
+            image.paste(band, (0, index * rows))
+        return write_bytes(output_path, encode_image(image, image_format, preset, quality))
+
+    if image_format == "PNG":
+        writer = PngStripWriter(output_path, width, height, mode, _ZLIB_LEVELS.get(preset, 6), dpi)
+    else:
+        deflate_level = None if preset == "fast" else _ZLIB_LEVELS.get(preset, 6)
+        writer = TiffStripWriter(output_path, width, height, mode, rows, deflate_level, dpi)
+    profiler = get_profiler()
+    try:
+        for band in bands:
+            with profiler.stage("encode_band", page=page.number):
+                writer.write_band(band)
+    except BaseException:
+        writer.file.close()
+        raise
+    writer.close()
+    return output_path
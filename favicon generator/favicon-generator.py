@@ -18,10 +18,14 @@ Date: August 2025
 
 import os
 import sys
+import io
+import json
+import time
+import hashlib
 import argparse
+import contextlib
 from pathlib import Path
-import tkinter as tk
-from tkinter import filedialog, messagebox
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 try:
     from PIL import Image
@@ -34,11 +38,71 @@ except ImportError:
     from PIL import Image
     print("✅ Pillow berhasil diinstall!")
 
+try:
+    import numpy as np
+except ImportError:
+    np = None  # Opsional, sample image pakai fallback tanpa NumPy
+
+# Profiling (--profile) dan preset encode pakai helper di folder "common"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.encoding import DEFAULT_PRESET, ENCODING_PRESETS, save_options
+from common.profiling import add_profile_arguments, enable_profiling, get_profiler, report as report_profile
+
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff', '.webp')
+BATCH_CACHE_FILE = '.favicon_cache.json'
+
+
+
+def _file_hash(path):
+    """SHA-256 isi file, dibaca per blok"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _batch_worker(input_path, output_dir, preset=DEFAULT_PRESET):
+    """
+    Worker batch: buat semua favicon web untuk satu logo di proses terpisah
+    
+    Output print dari generator ditampung supaya log antar proses tidak campur.
+    Event profiling worker ikut dikembalikan di result['profile'].
+    """
+    start = time.perf_counter()
+    generator = FaviconGenerator(preset)
+    log = io.StringIO()
+    
+    with contextlib.redirect_stdout(log):
+        os.makedirs(output_dir, exist_ok=True)
+        files = generator.create_web_favicons(input_path, output_dir)
+        if files:
+            generator.generate_html_code(output_dir)
+    
+    result = {
+        'input': input_path,
+        'output': output_dir,
+        'status': 'ok' if files else 'error',
+        'files': len(files) if files else 0,
+        'bytes': sum(os.path.getsize(f) for f in files) if files else 0,
+        'seconds': round(time.perf_counter() - start, 3),
+        'error': None,
+    }
+    if not files:
+        errors = [line for line in log.getvalue().splitlines() if line.startswith('❌')]
+        result['error'] = errors[-1] if errors else 'Gagal membuat favicon'
+    result['profile'] = get_profiler().drain()
+    return result
+
 
 class FaviconGenerator:
     """Class untuk generate favicon dari gambar"""
     
-    def __init__(self):
+    def __init__(self, preset=DEFAULT_PRESET):
+        if preset not in ENCODING_PRESETS:
+            raise ValueError(f"Preset tidak dikenal: {preset}")
+        self.preset = preset
         self.standard_sizes = [256]  # Ukuran 256px untuk scale maksimal
         self.web_formats = {
             'favicon.ico': [(256, 256)],  # Ukuran 256px maksimal untuk ICO
@@ -49,6 +113,53 @@ class FaviconGenerator:
             'android-chrome-192x192.png': [(192, 192)],
             'android-chrome-512x512.png': [(512, 512)]
         }
+        # Level pyramid minimal 2x ukuran target supaya LANCZOS tetap tajam
+        self.min_pyramid_ratio = 2
+    
+    def _prepare_source(self, img, largest):
+        """
+        Untuk JPEG, minta decoder langsung men-decode di resolusi yang lebih
+        kecil (draft), tetap minimal 2x ukuran target terbesar
+        """
+        if img.format == 'JPEG':
+            img.draft('RGB', (largest * self.min_pyramid_ratio, largest * self.min_pyramid_ratio))
+    
+    def _build_resize_pyramid(self, img, sizes):
+        """
+        Resize ke semua ukuran target, masing-masing cukup sekali
+        
+        Gambar sumber direduksi dulu dengan Image.reduce (integer box filter)
+        sampai tinggal minimal 2x ukuran terbesar, lalu di-LANCZOS ke ukuran
+        terbesar. Ukuran yang lebih kecil diturunkan dari level pyramid terkecil
+        yang masih minimal min_pyramid_ratio kali lebih besar (quality check),
+        kalau tidak ada diturunkan dari gambar sumber yang sudah direduksi.
+        
+        Args:
+            img (Image): Gambar sumber (RGBA)
+            sizes (list): List ukuran (width, height)
+        
+        Returns:
+            dict: {(width, height): Image}
+        """
+        targets = sorted(set(sizes), key=lambda size: size[0] * size[1], reverse=True)
+        largest_width, largest_height = targets[0]
+        
+        profiler = get_profiler()
+        factor = min(img.width // largest_width, img.height // largest_height) // self.min_pyramid_ratio
+        with profiler.stage("reduce"):
+            base = img.reduce(factor) if factor >= 2 else img
+        
+        pyramid = {}
+        for width, height in targets:
+            candidates = [
+                size for size in pyramid
+                if size[0] >= width * self.min_pyramid_ratio and size[1] >= height * self.min_pyramid_ratio
+            ]
+            source = pyramid[min(candidates, key=lambda size: size[0] * size[1])] if candidates else base
+            with profiler.stage(f"resize_{width}"):
+                pyramid[(width, height)] = source.resize((width, height), Image.Resampling.LANCZOS)
+        
+        return pyramid
     
     def create_favicon(self, input_path, output_path=None, sizes=None):
         """
@@ -72,28 +183,34 @@ class FaviconGenerator:
                 print(f"   - Mode: {img.mode}")
                 print(f"   - Ukuran: {img.size}")
                 
-                # Konversi ke RGBA jika perlu
-                if img.mode != 'RGBA':
-                    img = img.convert('RGBA')
-                    print("   - Dikonversi ke RGBA")
+                profiler = get_profiler()
+                self._prepare_source(img, max(sizes))
+                
+                # Konversi ke RGBA jika perlu (decode gambar terjadi di sini atau di load)
+                with profiler.stage("decode"):
+                    img.load()
+                    if img.mode != 'RGBA':
+                        img = img.convert('RGBA')
+                        print("   - Dikonversi ke RGBA")
                 
                 # Tentukan output path
                 if output_path is None:
                     input_file = Path(input_path)
                     output_path = input_file.parent / f"{input_file.stem}.ico"
                 
-                # Buat list gambar dengan berbagai ukuran
-                icon_sizes = []
-                for size in sizes:
-                    resized = img.resize((size, size), Image.Resampling.LANCZOS)
-                    icon_sizes.append(resized)
+                # Buat list gambar dengan berbagai ukuran (terbesar dulu)
+                pyramid = self._build_resize_pyramid(img, [(size, size) for size in sizes])
+                icon_sizes = [pyramid[(size, size)] for size in sorted(set(sizes), reverse=True)]
                 
-                # Simpan sebagai ICO file
-                icon_sizes[0].save(
-                    output_path,
-                    format='ICO',
-                    sizes=[(size, size) for size in sizes]
-                )
+                # Simpan sebagai ICO file, pakai hasil pyramid untuk tiap ukuran
+                with profiler.stage("save_ico") as timing:
+                    icon_sizes[0].save(
+                        output_path,
+                        format='ICO',
+                        sizes=[(size, size) for size in sizes],
+                        append_images=icon_sizes[1:]
+                    )
+                    timing.bytes = os.path.getsize(output_path)
                 
                 print(f"✅ Favicon berhasil dibuat: {output_path}")
                 print(f"📏 Ukuran: {', '.join([f'{s}x{s}' for s in sizes])}")
@@ -124,9 +241,15 @@ class FaviconGenerator:
                 print(f"📷 Memproses gambar: {input_path}")
                 print(f"   - Format: {img.format}, Mode: {img.mode}, Ukuran: {img.size}")
                 
-                if img.mode != 'RGBA':
-                    img = img.convert('RGBA')
-                    print("   - Dikonversi ke RGBA")
+                profiler = get_profiler()
+                all_sizes = [size for sizes in self.web_formats.values() for size in sizes]
+                self._prepare_source(img, max(max(size) for size in all_sizes))
+                
+                with profiler.stage("decode"):
+                    img.load()
+                    if img.mode != 'RGBA':
+                        img = img.convert('RGBA')
+                        print("   - Dikonversi ke RGBA")
                 
                 # Tentukan output directory
                 input_file = Path(input_path)
@@ -137,6 +260,9 @@ class FaviconGenerator:
                 output_dir.mkdir(exist_ok=True)
                 print(f"📁 Output directory: {output_dir}")
                 
+                # Tiap ukuran dihitung sekali, dipakai ulang untuk ICO dan PNG
+                pyramid = self._build_resize_pyramid(img, all_sizes)
+                
                 created_files = []
                 total_size = 0
                 
@@ -145,29 +271,29 @@ class FaviconGenerator:
                     
                     if filename.endswith('.ico'):
                         # Untuk ICO, buat multiple sizes dalam satu file
-                        icon_sizes = []
-                        for width, height in sizes:
-                            resized = img.resize((width, height), Image.Resampling.LANCZOS)
-                            icon_sizes.append(resized)
+                        icon_sizes = [pyramid[size] for size in sizes]
                         
                         output_path = output_dir / filename
-                        icon_sizes[0].save(
-                            output_path,
-                            format='ICO',
-                            sizes=sizes
-                        )
+                        with profiler.stage("save_ico") as timing:
+                            icon_sizes[0].save(
+                                output_path,
+                                format='ICO',
+                                sizes=sizes,
+                                append_images=icon_sizes[1:]
+                            )
+                            file_size = timing.bytes = os.path.getsize(output_path)
                         created_files.append(output_path)
-                        file_size = os.path.getsize(output_path)
                         total_size += file_size
                         print(f"   ✅ {filename} ({file_size} bytes)")
                     else:
                         # Untuk PNG, buat file individual
                         for width, height in sizes:
-                            resized = img.resize((width, height), Image.Resampling.LANCZOS)
+                            resized = pyramid[(width, height)]
                             output_path = output_dir / filename
-                            resized.save(output_path, format='PNG', optimize=True)
+                            with profiler.stage("save_png") as timing:
+                                resized.save(output_path, format='PNG', **save_options('PNG', self.preset))
+                                file_size = timing.bytes = os.path.getsize(output_path)
                             created_files.append(output_path)
-                            file_size = os.path.getsize(output_path)
                             total_size += file_size
                             print(f"   ✅ {filename} ({width}x{height}) - {file_size} bytes")
                 
@@ -182,6 +308,172 @@ class FaviconGenerator:
             print(f"❌ Error: {str(e)}")
             return None
     
+    def settings_hash(self):
+        """
+        Hash dari pengaturan yang mempengaruhi hasil favicon, untuk cache batch
+        """
+        settings = {
+            'web_formats': self.web_formats,
+            'min_pyramid_ratio': self.min_pyramid_ratio,
+            'preset': self.preset,
+        }
+        return hashlib.sha256(json.dumps(settings, sort_keys=True).encode('utf-8')).hexdigest()
+    
+    def collect_batch_inputs(self, source):
+        """
+        Kumpulkan daftar logo dari directory atau file manifest
+        
+        Manifest bisa berupa .json (list path, atau list object dengan key
+        "input" dan opsional "name") atau file teks berisi satu path per baris.
+        Path relatif di manifest dihitung dari folder manifest.
+        
+        Returns:
+            list: List (input_path, nama folder output)
+        """
+        source = Path(source)
+        if source.is_dir():
+            entries = [
+                (str(path), path.stem)
+                for path in sorted(source.iterdir())
+                if path.is_file() and path.suffix.lower() in IMAGE_EXTENSIONS
+            ]
+        elif source.suffix.lower() == '.json':
+            with open(source, 'r', encoding='utf-8') as f:
+                items = json.load(f)
+            entries = []
+            for item in items:
+                if isinstance(item, str):
+                    item = {'input': item}
+                input_path = source.parent / item['input']
+                entries.append((str(input_path), item.get('name') or input_path.stem))
+        else:
+            with open(source, 'r', encoding='utf-8') as f:
+                lines = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+            entries = [(str(source.parent / line), Path(line).stem) for line in lines]
+        
+        # Nama folder output harus unik
+        seen = {}
+        unique_entries = []
+        for input_path, name in entries:
+            count = seen.get(name, 0)
+            seen[name] = count + 1
+            unique_entries.append((input_path, name if count == 0 else f"{name}_{count + 1}"))
+        return unique_entries
+    
+    def batch_web_favicons(self, source, output_root=None, workers=1, report_path=None, force=False):
+        """
+        Generate favicon web untuk banyak logo sekaligus, satu folder per logo
+        
+        Logo yang hash isi file dan hash pengaturannya sama dengan run
+        sebelumnya (dan folder output-nya masih ada) dilewati.
+        
+        Args:
+            source (str): Directory berisi logo atau file manifest
+            output_root (str): Directory induk untuk semua folder output
+            workers (int): Jumlah proses
+            report_path (str): Path laporan JSON (default: <output_root>/favicon_report.json)
+            force (bool): Abaikan cache dan proses ulang semua logo
+        
+        Returns:
+            dict: Laporan gabungan
+        """
+        batch_start = time.perf_counter()
+        entries = self.collect_batch_inputs(source)
+        
+        if output_root is None:
+            source_path = Path(source)
+            output_root = (source_path if source_path.is_dir() else source_path.parent) / "favicon_batch"
+        output_root = Path(output_root)
+        output_root.mkdir(parents=True, exist_ok=True)
+        
+        cache_path = output_root / BATCH_CACHE_FILE
+        cache = {}
+        if cache_path.exists() and not force:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        
+        settings_hash = self.settings_hash()
+        print(f"📦 Batch favicon: {len(entries)} logo ➡ {output_root}")
+        
+        results = []
+        jobs = []
+        hashes = {}
+        for input_path, name in entries:
+            output_dir = str(output_root / name)
+            try:
+                source_hash = _file_hash(input_path)
+            except OSError as e:
+                results.append({'input': input_path, 'output': output_dir, 'status': 'error',
+                                'files': 0, 'bytes': 0, 'seconds': 0, 'error': f"❌ {e}"})
+                continue
+            
+            key = os.path.abspath(input_path)
+            hashes[key] = source_hash
+            cached = cache.get(key)
+            if (cached and cached['source_hash'] == source_hash and cached['settings_hash'] == settings_hash
+                    and cached['output'] == output_dir and os.path.isdir(output_dir)):
+                results.append({'input': input_path, 'output': output_dir, 'status': 'skipped',
+                                'files': 0, 'bytes': 0, 'seconds': 0, 'error': None})
+                continue
+            jobs.append((input_path, output_dir))
+        
+        skipped = sum(1 for r in results if r['status'] == 'skipped')
+        print(f"⏭️  {skipped} logo tidak berubah (cache), {len(jobs)} logo diproses")
+        
+        profiler = get_profiler()
+        
+        def record(result):
+            profiler.merge(result.pop('profile'))
+            results.append(result)
+            icon = '✅' if result['status'] == 'ok' else '❌'
+            print(f"   {icon} [{len(results)}/{len(entries)}] {os.path.basename(result['input'])} "
+                  f"({result['seconds']:.1f}s){' - ' + result['error'] if result['error'] else ''}")
+            if result['status'] == 'ok':
+                cache[os.path.abspath(result['input'])] = {
+                    'source_hash': hashes[os.path.abspath(result['input'])],
+                    'settings_hash': settings_hash,
+                    'output': result['output'],
+                }
+        
+        if workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=enable_profiling,
+                                     initargs=(profiler.enabled,)) as executor:
+                futures = [executor.submit(_batch_worker, input_path, output_dir, self.preset) for input_path, output_dir in jobs]
+                for future in as_completed(futures):
+                    record(future.result())
+        else:
+            for input_path, output_dir in jobs:
+                record(_batch_worker(input_path, output_dir, self.preset))
+        
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2)
+        
+        processed = [r for r in results if r['status'] == 'ok']
+        report = {
+            'source': str(source),
+            'output_root': str(output_root),
+            'workers': workers,
+            'settings_hash': settings_hash,
+            'total': len(entries),
+            'processed': len(processed),
+            'skipped': skipped,
+            'failed': sum(1 for r in results if r['status'] == 'error'),
+            'files': sum(r['files'] for r in processed),
+            'bytes': sum(r['bytes'] for r in processed),
+            'wall_seconds': round(time.perf_counter() - batch_start, 3),
+            'logos': sorted(results, key=lambda r: r['output']),
+        }
+        
+        report_path = Path(report_path) if report_path else output_root / "favicon_report.json"
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        
+        print(f"\n📊 Selesai dalam {report['wall_seconds']:.1f}s: {report['processed']} diproses, "
+              f"{report['skipped']} dilewati, {report['failed']} gagal")
+        print(f"📄 {report['files']} file favicon ({report['bytes']} bytes)")
+        print(f"💾 Laporan: {report_path}")
+        return report
+    
     def generate_html_code(self, favicon_dir):
         """
         Generate HTML code untuk menggunakan favicon
@@ -211,50 +503,121 @@ class FaviconGenerator:
                 f.write(html_code)
             print(f"💾 HTML code disimpan di: {html_file}")
     
-    def create_sample_image(self, output_path="sample_logo.png"):
+    @staticmethod
+    def _sample_pixel(distance_sq, max_radius):
+        """
+        Warna RGBA sample image untuk jarak kuadrat tertentu dari center
+        (rumus asli, dipakai fallback tanpa NumPy)
+        """
+        distance = distance_sq ** 0.5
+        if distance > max_radius:
+            return b'\x00\x00\x00\x00'
+        
+        # Gradient dari center ke edge
+        ratio = 1 - (distance / max_radius)
+        
+        # Warna gradient biru ke orange
+        red = int(255 * ratio * 0.8)
+        green = int(150 * ratio)
+        blue = int(255 * (1 - ratio * 0.3))
+        alpha = 255
+        
+        # Tambah efek lingkaran
+        if distance > max_radius * 0.8:
+            edge_ratio = (distance - max_radius * 0.8) / (max_radius * 0.2)
+            alpha = int(255 * (1 - edge_ratio))
+        
+        return bytes((red, green, blue, alpha))
+    
+    def _sample_pixels_numpy(self, size, center, max_radius, band_rows=256):
+        """
+        Bangun pixel sample image dengan operasi array NumPy, per band baris
+        supaya memori tetap kecil untuk ukuran besar
+        """
+        offsets_sq = (np.arange(size, dtype=np.int64) - center) ** 2
+        pixels = np.zeros((size, size, 4), dtype=np.uint8)
+        
+        for top in range(0, size, band_rows):
+            distance_sq = offsets_sq[top:top + band_rows, None] + offsets_sq[None, :]
+            # ** 0.5 sama persis dengan rumus asli (bukan np.sqrt) supaya hasil identik
+            distance = np.power(distance_sq.astype(np.float64), 0.5)
+            inside = distance <= max_radius
+            
+            ratio = 1 - (distance / max_radius)
+            band = pixels[top:top + band_rows]
+            band[..., 0] = np.where(inside, 255 * ratio * 0.8, 0).astype(np.uint8)
+            band[..., 1] = np.where(inside, 150 * ratio, 0).astype(np.uint8)
+            band[..., 2] = np.where(inside, 255 * (1 - ratio * 0.3), 0).astype(np.uint8)
+            
+            edge_ratio = (distance - max_radius * 0.8) / (max_radius * 0.2)
+            alpha = np.where(distance > max_radius * 0.8, 255 * (1 - edge_ratio), 255)
+            band[..., 3] = np.where(inside, alpha, 0).astype(np.uint8)
+        
+        return pixels.tobytes()
+    
+    def _sample_pixels_python(self, size, center, max_radius):
+        """
+        Fallback tanpa NumPy: warna hanya tergantung jarak ke center, jadi tiap
+        baris dihitung sekali per jarak vertikal, hanya separuh kanan sampai
+        tepi lingkaran; separuh kiri adalah cerminannya
+        """
+        transparent = b'\x00\x00\x00\x00'
+        right_width = size - center
+        rows_by_offset = {}
+        rows = []
+        
+        for y in range(size):
+            dy = abs(y - center)
+            row = rows_by_offset.get(dy)
+            if row is None:
+                # half[dx] untuk dx = 0, 1, ... selama masih di dalam lingkaran
+                half = []
+                for dx in range(max(center + 1, right_width)):
+                    pixel = self._sample_pixel(dx * dx + dy * dy, max_radius)
+                    if pixel == transparent:
+                        break
+                    half.append(pixel)
+                
+                inside_left = max(0, min(len(half) - 1, center))
+                inside_right = min(len(half), right_width)
+                row = rows_by_offset[dy] = (
+                    transparent * (center - inside_left) + b''.join(reversed(half[1:inside_left + 1]))
+                    + b''.join(half[:inside_right]) + transparent * (right_width - inside_right)
+                )
+            rows.append(row)
+        
+        return b''.join(rows)
+    
+    def create_sample_image(self, output_path="sample_logo.png", size=512):
         """
         Membuat sample image untuk testing
         
         Args:
             output_path (str): Path untuk menyimpan sample image
+            size (int): Lebar dan tinggi sample image dalam pixel
         
         Returns:
             str: Path file yang dibuat
         """
         print("🎨 Membuat sample image...")
         
-        # Buat gambar sample dengan design menarik
-        img = Image.new('RGBA', (512, 512), (0, 0, 0, 0))
-        
-        # Buat design gradient circular
-        center_x, center_y = 256, 256
-        max_radius = 200
+        # Buat design gradient circular, proporsional dengan desain asli 512px
+        center = size // 2
+        max_radius = 200 * size / 512
         
-        for x in range(512):
-            for y in range(512):
-                distance = ((x - center_x) ** 2 + (y - center_y) ** 2) ** 0.5
-                
-                if distance <= max_radius:
-                    # Gradient dari center ke edge
-                    ratio = 1 - (distance / max_radius)
-                    
-                    # Warna gradient biru ke orange
-                    red = int(255 * ratio * 0.8)
-                    green = int(150 * ratio)
-                    blue = int(255 * (1 - ratio * 0.3))
-                    alpha = 255
-                    
-                    # Tambah efek lingkaran
-                    if distance > max_radius * 0.8:
-                        edge_ratio = (distance - max_radius * 0.8) / (max_radius * 0.2)
-                        alpha = int(255 * (1 - edge_ratio))
-                    
-                    img.putpixel((x, y), (red, green, blue, alpha))
+        profiler = get_profiler()
+        with profiler.stage("sample_pixels"):
+            if np is not None:
+                pixels = self._sample_pixels_numpy(size, center, max_radius)
+            else:
+                pixels = self._sample_pixels_python(size, center, max_radius)
         
-        img.save(output_path, format='PNG')
-        file_size = os.path.getsize(output_path)
+        img = Image.frombytes('RGBA', (size, size), pixels)
+        with profiler.stage("save_png") as timing:
+            img.save(output_path, format='PNG')
+            file_size = timing.bytes = os.path.getsize(output_path)
         print(f"✅ Sample image '{output_path}' berhasil dibuat ({file_size} bytes)")
-        print(f"📏 Ukuran: 512x512 pixels")
+        print(f"📏 Ukuran: {size}x{size} pixels")
         return output_path
 
     def select_image_file(self):
@@ -264,6 +627,9 @@ class FaviconGenerator:
         Returns:
             str: Path file yang dipilih, atau None jika dibatalkan
         """
+        import tkinter as tk
+        from tkinter import filedialog
+        
         # Sembunyikan root window
         root = tk.Tk()
         root.withdraw()
@@ -308,6 +674,9 @@ class FaviconGenerator:
         Returns:
             str: Path directory yang dipilih, atau None jika dibatalkan
         """
+        import tkinter as tk
+        from tkinter import filedialog
+        
         root = tk.Tk()
         root.withdraw()
         root.attributes('-topmost', True)
@@ -393,6 +762,8 @@ class FaviconGenerator:
         """
         Mode GUI sederhana menggunakan tkinter
         """
+        import tkinter as tk
+        
         try:
             root = tk.Tk()
             root.title("🔧 Favicon Generator")
@@ -487,8 +858,8 @@ class FaviconGenerator:
     def write(self, text):
         """Redirect stdout ke text widget"""
         if hasattr(self, 'output_text'):
-            self.output_text.insert(tk.END, text)
-            self.output_text.see(tk.END)
+            self.output_text.insert('end', text)
+            self.output_text.see('end')
     
     def flush(self):
         """Required for stdout redirect"""
@@ -505,6 +876,8 @@ class FaviconGenerator:
     
     def gui_convert_simple(self):
         """Handler untuk konversi sederhana di GUI"""
+        from tkinter import messagebox
+        
         if not self.selected_file:
             messagebox.showwarning("Peringatan", "Silakan pilih file gambar terlebih dahulu!")
             return
@@ -521,6 +894,8 @@ class FaviconGenerator:
     
     def gui_convert_web(self):
         """Handler untuk konversi web di GUI"""
+        from tkinter import messagebox
+        
         if not self.selected_file:
             messagebox.showwarning("Peringatan", "Silakan pilih file gambar terlebih dahulu!")
             return
@@ -533,6 +908,8 @@ class FaviconGenerator:
     
     def gui_create_sample(self):
         """Handler untuk buat sample di GUI"""
+        from tkinter import messagebox
+        
         output_dir = self.select_output_directory()
         if output_dir:
             sample_path = os.path.join(output_dir, "sample_logo.png")
@@ -560,6 +937,7 @@ def main():
   python "favicon-generator.py" logo.png --web              # Buat semua format web
   python "favicon-generator.py" logo.png --web -o favicons/ # Custom output directory
   python "favicon-generator.py" --sample                    # Buat sample image untuk testing
+  python "favicon-generator.py" --batch logos/ -o out/ --workers 8  # Batch banyak logo
   python "favicon-generator.py" --interactive               # Mode interaktif (text-based)
   python "favicon-generator.py" --gui                       # Mode GUI (graphical interface)
 
@@ -580,17 +958,30 @@ def main():
                        help='Buat semua format favicon untuk web')
     parser.add_argument('--sample', action='store_true',
                        help='Buat sample image untuk testing')
+    parser.add_argument('--sample-size', type=int, default=512,
+                       help='Ukuran sample image dalam pixel (default: 512)')
+    parser.add_argument('--batch', metavar='SOURCE',
+                       help='Directory logo atau file manifest (.json/.txt) untuk batch favicon web')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Jumlah proses untuk mode batch (default: 1)')
+    parser.add_argument('--report', help='Path laporan JSON mode batch')
+    parser.add_argument('--preset', choices=ENCODING_PRESETS, default=DEFAULT_PRESET,
+                       help=f'Preset encode PNG: fast = cepat, smallest = file paling kecil (default: {DEFAULT_PRESET})')
+    parser.add_argument('--force', action='store_true',
+                       help='Mode batch: proses ulang semua logo, abaikan cache')
     parser.add_argument('--interactive', action='store_true',
                        help='Jalankan dalam mode interaktif')
     parser.add_argument('--gui', action='store_true',
                        help='Jalankan dalam mode GUI (graphical user interface)')
+    add_profile_arguments(parser)
     
     args = parser.parse_args()
+    enable_profiling(args.profile or bool(args.profile_trace))
     
     print("🔧 Favicon Generator Tool v1.0")
     print("=" * 40)
     
-    generator = FaviconGenerator()
+    generator = FaviconGenerator(args.preset)
     
     # Mode GUI
     if args.gui:
@@ -602,11 +993,19 @@ def main():
         generator.interactive_mode()
         return
     
+    # Mode batch banyak logo
+    if args.batch:
+        generator.batch_web_favicons(args.batch, args.output, workers=args.workers,
+                                     report_path=args.report, force=args.force)
+        report_profile(args)
+        return
+    
     # Jika diminta sample image
     if args.sample:
-        sample_path = generator.create_sample_image()
+        sample_path = generator.create_sample_image(size=args.sample_size)
         print(f"\n💡 Sekarang coba jalankan:")
         print(f'   python "favicon-generator.py" {sample_path} --web')
+        report_profile(args)
         return
     
     # Validasi input
@@ -636,6 +1035,7 @@ def main():
         if result:
             print(f"\n🎉 Selesai! Favicon ICO telah dibuat.")
             print(f"💡 Untuk membuat semua format web, gunakan flag --web")
+    report_profile(args)
 
 
 if __name__ == "__main__":
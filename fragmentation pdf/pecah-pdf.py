@@ -1,29 +1,378 @@
 import os
-from tkinter import Tk, filedialog
+import re
+import sys
+import time
+import argparse
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor
 from pypdf import PdfReader, PdfWriter
 
-# Biar gak muncul jendela Tk kosong
-root = Tk()
-root.withdraw()
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
 
-# Munculin file picker
-file_path = filedialog.askopenfilename(title="Pilih file PDF gede lu", filetypes=[("PDF files", "*.pdf")])
+# Shared helpers live in the "common" package at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.profiling import add_profile_arguments, enable_profiling, get_profiler, report as report_profile
 
-if not file_path:
-    print("Gak jadi milih file.")
-else:
-    try:
+ENGINES = ("fitz", "pypdf")
+
+def _range_filename(start, end):
+    """
+    Output name for a 0-based inclusive page range
+    """
+    if start == end:
+        return f"output_page_{start+1}.pdf"
+    return f"output_pages_{start+1}-{end+1}.pdf"
+
+def parse_ranges(spec, page_count):
+    """
+    Parse a range spec like "1-3,5,8-" into 0-based inclusive (start, end) tuples
+    """
+    ranges = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-", 1)
+            start = int(first) if first.strip() else 1
+            end = int(last) if last.strip() else page_count
+        else:
+            start = end = int(part)
+        if start < 1 or end > page_count or start > end:
+            raise ValueError(f"Range halaman tidak valid: {part} (PDF punya {page_count} halaman)")
+        ranges.append((start - 1, end - 1))
+    return ranges
+
+def _bookmark_plan(toc, page_count, level):
+    """
+    Plan one output per bookmark up to the given outline level
+    """
+    starts = []
+    for entry_level, title, page in toc:
+        # Skip deeper levels, bookmarks without a target and ones sharing a start page
+        if entry_level > level or page < 1 or (starts and page - 1 <= starts[-1][0]):
+            continue
+        starts.append((page - 1, title))
+
+    if not starts:
+        raise ValueError("PDF tidak punya bookmark yang bisa dipakai untuk split")
+
+    plan = []
+    if starts[0][0] > 0:
+        plan.append(("output_000_awal.pdf", 0, starts[0][0] - 1))
+    for index, (start, title) in enumerate(starts):
+        end = starts[index + 1][0] - 1 if index + 1 < len(starts) else page_count - 1
+        slug = re.sub(r"[^\w\-]+", "_", title).strip("_")[:60] or "bagian"
+        plan.append((f"output_{index+1:03d}_{slug}.pdf", start, end))
+    return plan
+
+def plan_split(page_count, every=1, ranges=None, toc=None, bookmark_level=1):
+    """
+    Build the list of (filename, start, end) outputs, pages 0-based inclusive
+
+    Args:
+        page_count: Number of pages in the source
+        every: Pages per output file
+        ranges: Range spec string, e.g. "1-3,5,8-" (overrides every)
+        toc: Outline as returned by fitz Document.get_toc(), split per bookmark (overrides ranges)
+        bookmark_level: Deepest outline level that starts a new file
+    """
+    if toc is not None:
+        return _bookmark_plan(toc, page_count, bookmark_level)
+    if ranges:
+        return [(_range_filename(start, end), start, end) for start, end in parse_ranges(ranges, page_count)]
+    if every < 1:
+        raise ValueError("Jumlah halaman per file minimal 1")
+    return [
+        (_range_filename(start, min(start + every, page_count) - 1), start, min(start + every, page_count) - 1)
+        for start in range(0, page_count, every)
+    ]
+
+def _build_chunk_fitz(src, start, end, strip_unused, subset_fonts):
+    """
+    Copy a page range of src into a new document
+    """
+    profiler = get_profiler()
+    chunk = fitz.open()
+    with profiler.stage("insert_pdf", page=start):
+        chunk.insert_pdf(src, from_page=start, to_page=end)
+    if strip_unused:
+        # Drop resources that the page content never uses (shared resource dictionaries)
+        with profiler.stage("clean_contents", page=start):
+            for page in chunk:
+                page.clean_contents(sanitize=True)
+    if subset_fonts:
+        with profiler.stage("subset_fonts", page=start):
+            chunk.subset_fonts()
+    return chunk
+
+def _write_chunk_fitz(src, start, end, path, strip_unused=False, subset_fonts=False):
+    chunk = _build_chunk_fitz(src, start, end, strip_unused, subset_fonts)
+    # garbage=4 also merges duplicate objects inside the output file
+    with get_profiler().stage("save", page=start) as timing:
+        chunk.save(path, garbage=4, deflate=True)
+        timing.bytes = os.path.getsize(path)
+    chunk.close()
+
+def _write_chunk_pypdf(reader, start, end, path):
+    profiler = get_profiler()
+    writer = PdfWriter()
+    with profiler.stage("add_pages", page=start):
+        for page_num in range(start, end + 1):
+            writer.add_page(reader.pages[page_num])
+    with profiler.stage("save", page=start) as timing:
+        with open(path, "wb") as f:
+            writer.write(f)
+        timing.bytes = os.path.getsize(path)
+
+def _plan_max_size(src, max_bytes, strip_unused, subset_fonts):
+    """
+    Greedy plan of page ranges that each stay below max_bytes
+
+    Grows each range exponentially and then binary searches the largest range
+    that still fits, so only O(log n) trial documents are built per output.
+    A single page that is already too big becomes its own file.
+    """
+    def fits(start, end):
+        chunk = _build_chunk_fitz(src, start, end, strip_unused, subset_fonts)
+        with get_profiler().stage("size_probe", page=start) as timing:
+            size = timing.bytes = len(chunk.tobytes(garbage=4, deflate=True))
+        chunk.close()
+        return size <= max_bytes
+
+    page_count = len(src)
+    plan = []
+    start = 0
+    while start < page_count:
+        # good always fits (or is the lone start page), bad is the first end known not to
+        good, step = start, 1
+        bad = page_count
+        while good + step < page_count:
+            if fits(start, good + step):
+                good += step
+                step *= 2
+            else:
+                bad = good + step
+                break
+        low, high = good + 1, bad - 1
+        while low <= high:
+            middle = (low + high) // 2
+            if fits(start, middle):
+                good, low = middle, middle + 1
+            else:
+                high = middle - 1
+        plan.append((_range_filename(start, good), start, good))
+        start = good + 1
+    return plan
+
+def _shard_plan(plan, workers):
+    """
+    Cut the plan into at most `workers` contiguous shards with similar page counts
+    """
+    total_pages = sum(end - start + 1 for _, start, end in plan)
+    target = total_pages / workers
+    shards, current, current_pages = [], [], 0
+    for entry in plan:
+        current.append(entry)
+        current_pages += entry[2] - entry[1] + 1
+        if current_pages >= target * (len(shards) + 1) and len(shards) < workers - 1:
+            shards.append(current)
+            current = []
+    if current:
+        shards.append(current)
+    return shards
+
+def _split_shard(file_path, output_dir, shard, engine, strip_unused, subset_fonts):
+    """
+    Write one shard of the plan, opening the source in this process
+
+    Returns:
+        tuple: (files written, pages written, seconds)
+    """
+    start_time = time.perf_counter()
+    if engine == "pypdf":
         reader = PdfReader(file_path)
+        for filename, start, end in shard:
+            _write_chunk_pypdf(reader, start, end, os.path.join(output_dir, filename))
+    else:
+        src = fitz.open(file_path)
+        try:
+            for filename, start, end in shard:
+                _write_chunk_fitz(src, start, end, os.path.join(output_dir, filename), strip_unused, subset_fonts)
+        finally:
+            src.close()
+    pages = sum(end - start + 1 for _, start, end in shard)
+    return len(shard), pages, time.perf_counter() - start_time
+
+def _split_shard_worker(*args):
+    """
+    _split_shard in a worker process, also returns the worker's profiling events
+    """
+    return _split_shard(*args) + (get_profiler().drain(),)
+
+def split_pdf(file_path, output_dir=None, every=1, ranges=None, bookmarks=False, bookmark_level=1,
+              max_size_mb=None, engine="fitz", strip_unused=False, subset_fonts=False, workers=1):
+    """
+    Split a PDF into smaller files
+
+    The default splits into one file per page (output_page_N.pdf). The fitz
+    engine opens the source once and copies each range with insert_pdf;
+    the pypdf engine is the original per-page writer loop. With workers > 1
+    the output files are cut into contiguous shards and every worker process
+    opens the source itself and writes its own shard.
+
+    Args:
+        file_path: Path to input PDF file
+        output_dir: Folder for the split files (default: <name>_split next to the input)
+        every: Pages per output file
+        ranges: Range spec such as "1-3,5,8-"
+        bookmarks: Split at bookmarks (fitz engine only)
+        bookmark_level: Deepest bookmark level that starts a new file
+        max_size_mb: Pack pages into files below this size (fitz engine only)
+        engine: "fitz" (PyMuPDF) or "pypdf"
+        strip_unused: Remove resources not used by a page before saving (fitz engine only)
+        subset_fonts: Subset embedded fonts in every output (fitz engine only)
+        workers: Number of worker processes
+
+    Returns:
+        str: Folder the split files were written to
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Engine tidak dikenal: {engine}")
+    if engine == "fitz" and fitz is None:
+        raise ImportError("PyMuPDF belum terinstall, install dengan: pip install PyMuPDF (atau pakai --engine pypdf)")
+    if subset_fonts and importlib.util.find_spec("fontTools") is None:
+        # Document.subset_fonts() imports fontTools only when it runs
+        raise ImportError("fontTools belum terinstall, install dengan: pip install fonttools (dibutuhkan --subset-fonts)")
+    if engine == "pypdf" and (bookmarks or max_size_mb or strip_unused or subset_fonts):
+        raise ValueError("Split per bookmark, ukuran maksimal dan optimasi resource butuh engine fitz")
+
+    if output_dir is None:
         output_dir = os.path.splitext(file_path)[0] + "_split"
-        os.makedirs(output_dir, exist_ok=True)
-
-        for i, page in enumerate(reader.pages):
-            writer = PdfWriter()
-            writer.add_page(page)
-            output_file = os.path.join(output_dir, f"output_page_{i+1}.pdf")
-            with open(output_file, "wb") as f:
-                writer.write(f)
-
-        print(f"File berhasil di-split ke folder: {output_dir}")
-    except Exception as e:
-        print(f"Error saat mecah PDF: {e}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    if engine == "pypdf":
+        plan = plan_split(len(PdfReader(file_path).pages), every=every, ranges=ranges)
+    else:
+        src = fitz.open(file_path)
+        try:
+            if max_size_mb:
+                plan = _plan_max_size(src, max_size_mb * 1024 * 1024, strip_unused, subset_fonts)
+            else:
+                toc = src.get_toc(simple=True) if bookmarks else None
+                plan = plan_split(len(src), every=every, ranges=ranges, toc=toc, bookmark_level=bookmark_level)
+        finally:
+            src.close()
+
+    if workers <= 1 or len(plan) < 2:
+        _split_shard(file_path, output_dir, plan, engine, strip_unused, subset_fonts)
+        return output_dir
+
+    shards = _shard_plan(plan, min(workers, len(plan)))
+    wall_start = time.perf_counter()
+    profiler = get_profiler()
+    with ProcessPoolExecutor(max_workers=len(shards), initializer=enable_profiling,
+                             initargs=(profiler.enabled,)) as executor:
+        futures = [
+            executor.submit(_split_shard_worker, file_path, output_dir, shard, engine, strip_unused, subset_fonts)
+            for shard in shards
+        ]
+        stats = []
+        for future in futures:
+            *shard_stats, events = future.result()
+            profiler.merge(events)
+            stats.append(tuple(shard_stats))
+    wall = time.perf_counter() - wall_start
+
+    total_files = sum(files for files, _, _ in stats)
+    total_pages = sum(pages for _, pages, _ in stats)
+    print(f"⚙️  {total_files} file ({total_pages} halaman) ditulis {len(shards)} worker dalam {wall:.1f}s")
+    for index, (shard, (files, pages, seconds)) in enumerate(zip(shards, stats)):
+        print(f"   Worker {index + 1}: {files} file, halaman {shard[0][1] + 1}-{shard[-1][2] + 1} "
+              f"dalam {seconds:.1f}s ({pages / seconds if seconds else 0:.0f} halaman/s)")
+
+    return output_dir
+
+def select_pdf_gui():
+    """
+    Open a file picker, returns the chosen path or None
+    """
+    from tkinter import Tk, filedialog
+
+    # Biar gak muncul jendela Tk kosong
+    root = Tk()
+    root.withdraw()
+
+    # Munculin file picker
+    file_path = filedialog.askopenfilename(title="Pilih file PDF gede lu", filetypes=[("PDF files", "*.pdf")])
+    root.destroy()
+    return file_path or None
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Pecah PDF jadi file per halaman',
+        epilog='Tanpa input, file picker (GUI) akan dibuka.'
+    )
+    parser.add_argument('inputs', nargs='*', help='File PDF yang mau dipecah')
+    parser.add_argument('-o', '--output-dir',
+                        help='Folder output (default: [nama_file]_split di sebelah file asli)')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--every', type=int, default=1,
+                      help='Jumlah halaman per file (default: 1)')
+    mode.add_argument('--ranges',
+                      help='Range halaman, contoh: "1-3,5,8-"')
+    mode.add_argument('--bookmarks', action='store_true',
+                      help='Pecah per bookmark/daftar isi')
+    mode.add_argument('--max-size-mb', type=float,
+                      help='Gabung halaman jadi file dengan ukuran maksimal N MB')
+    parser.add_argument('--bookmark-level', type=int, default=1,
+                        help='Level bookmark terdalam yang jadi file baru (default: 1)')
+    parser.add_argument('--engine', choices=ENGINES, default='fitz' if fitz else 'pypdf',
+                        help='Engine split (default: fitz kalau PyMuPDF terinstall)')
+    parser.add_argument('--strip-unused', action='store_true',
+                        help='Buang resource (font/gambar) yang tidak dipakai halaman')
+    parser.add_argument('--subset-fonts', action='store_true',
+                        help='Subset font yang di-embed supaya file lebih kecil')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Jumlah proses, tiap proses menulis potongan halaman sendiri (default: 1)')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    enable_profiling(args.profile or bool(args.profile_trace))
+
+    input_pdfs = args.inputs
+    if not input_pdfs:
+        file_path = select_pdf_gui()
+        if not file_path:
+            print("Gak jadi milih file.")
+            return
+        input_pdfs = [file_path]
+
+    for file_path in input_pdfs:
+        output_dir = args.output_dir
+        if output_dir and len(input_pdfs) > 1:
+            # Satu subfolder per file biar halaman gak saling timpa
+            output_dir = os.path.join(output_dir, os.path.splitext(os.path.basename(file_path))[0] + "_split")
+        try:
+            output_dir = split_pdf(
+                file_path,
+                output_dir,
+                every=args.every,
+                ranges=args.ranges,
+                bookmarks=args.bookmarks,
+                bookmark_level=args.bookmark_level,
+                max_size_mb=args.max_size_mb,
+                engine=args.engine,
+                strip_unused=args.strip_unused,
+                subset_fonts=args.subset_fonts,
+                workers=args.workers,
+            )
+            print(f"File berhasil di-split ke folder: {output_dir}")
+        except Exception as e:
+            print(f"Error saat mecah PDF: {e}")
+    report_profile(args)
+
+if __name__ == "__main__":
+    main()
@@ -24,6 +24,18 @@ if %ERRORLEVEL% NEQ 0 (
     python -m pip install pypdf
 )
 
+python -c "import fitz" >nul 2>&1
+if %ERRORLEVEL% NEQ 0 (
+    echo Installing PyMuPDF...
+    python -m pip install PyMuPDF
+)
+
+python -c "import fontTools" >nul 2>&1
+if %ERRORLEVEL% NEQ 0 (
+    echo Installing fonttools...
+    python -m pip install fonttools
+)
+
 python -c "import tkinter" >nul 2>&1
 if %ERRORLEVEL% NEQ 0 (
     echo Installing tkinter...
@@ -1,86 +1,923 @@
 import fitz  # PyMuPDF
 import os
-from tkinter import Tk, filedialog
+import sys
 from PIL import Image
-import io
+import argparse
+import shutil
+import tempfile
+import time
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-def compress_pdf(input_path, output_path, quality=60):
+# Shared helpers live in the "common" package at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.encoding import DEFAULT_PRESET, ENCODING_PRESETS, encode_ccitt_g4, encode_image, pdf_save_options
+from common.page_raster import (COLOR_MODES, DEFAULT_THRESHOLD, GRAY_MAX_CHROMA, image_chroma, pixmap_to_image,
+                                render_page, resolve_color_mode, to_bilevel)
+from common.profiling import add_profile_arguments, enable_profiling, get_profiler, report as report_profile
+from common.render_cache import DEFAULT_MAX_MB, RenderCache
+
+TEXT_LAYERS = ("invisible", "none")
+ENGINES = ("raster", "images", "adaptive")
+
+# Raster modes of _compress_page: JPEG in colour or grayscale, or 1-bit CCITT G4
+RASTER_MODES = ("jpeg", "gray", "bilevel")
+# Raster mode per concrete colour mode (common.page_raster.COLOR_MODES)
+_COLOR_RASTER_MODES = {"rgb": "jpeg", "gray": "gray", "bilevel": "bilevel"}
+BILEVEL_DPI = 200  # 1-bit pages stay small, render them sharp enough to read
+
+# Adaptive engine thresholds, see _pick_strategy
+ANALYSIS_DPI = 24
+MIN_IMAGE_COVERAGE = 0.05   # below this the page is text/vector only
+SCAN_IMAGE_COVERAGE = 0.85  # above this (with few drawings) the page is treated as a scan
+MAX_SCAN_DRAWINGS = 50
+BILEVEL_MIN_RATIO = 0.97    # share of near-black/near-white pixels of a bilevel page
+
+# Target size mode, see _compress_pdf_to_target
+RASTER_DPI = 72                # the raster engine renders at 100% zoom
+TARGET_DPIS = (72, 54, 36)     # render zooms tried, best first
+TARGET_QUALITY_RANGE = (10, 95)
+TARGET_SAMPLE_PAGES = 8
+TARGET_MAX_PASSES = 4
+TARGET_FILL = 0.9              # a pass using 90% of the target is close enough
+_FALLBACK_FONT = "helv"
+
+def _span_font(page, span, font_cache):
     """
-    Compress PDF by reducing image quality and file size
+    The font a text span was drawn with, loaded from the font embedded in the
+    input PDF, or Helvetica when it is not embedded (or lacks glyphs of the span)
+    
+    font_cache maps base font names to fitz.Font objects and is shared across
+    pages, so every embedded font is extracted only once per document.
     """
-    input_doc = fitz.open(input_path)
-    output_doc = fitz.open()  # Create new document
+    name = span["font"]
+    if name not in font_cache:
+        font = None
+        for xref, ext, _, basefont, *_ in page.get_fonts():
+            # Subset fonts are named "ABCDEF+Name", get_text reports "Name"
+            if basefont.split("+", 1)[-1] == name and ext not in ("n/a", ""):
+                try:
+                    buffer = page.parent.extract_font(xref)[3]
+                    font = fitz.Font(fontbuffer=buffer) if buffer else None
+                except Exception:
+                    font = None  # Type3 and broken fonts cannot be loaded
+                break
+        font_cache[name] = font
     
-    for page_num in range(len(input_doc)):
-        page = input_doc[page_num]
+    font = font_cache[name]
+    if font is None or any(not font.has_glyph(ord(char)) for char in span["text"]):
+        if _FALLBACK_FONT not in font_cache:
+            font_cache[_FALLBACK_FONT] = fitz.Font(_FALLBACK_FONT)
+        font = font_cache[_FALLBACK_FONT]
+    return font
+
+def _insert_text_layer(page, new_page, font_cache):
+    """
+    Copy the text of page onto new_page as one invisible (render mode 3) text layer
+    
+    All horizontal spans go into a single TextWriter that is written once, so
+    the content stream grows by one block per page instead of one per span.
+    Rotated spans need their own transform and get one write each.
+    Returns the number of spans copied.
+    """
+    writer = fitz.TextWriter(new_page.rect)
+    rotated = []
+    spans = 0
+    
+    # TEXTFLAGS_TEXT skips image blocks, their pixel data is not needed here
+    for block in page.get_text("dict", flags=fitz.TEXTFLAGS_TEXT)["blocks"]:
+        for line in block.get("lines", ()):
+            cos, sin = line["dir"]
+            for span in line["spans"]:
+                if not span["text"].strip():
+                    continue
+                span_writer = writer
+                if (cos, sin) != (1, 0):
+                    span_writer = fitz.TextWriter(new_page.rect)
+                    rotated.append((span_writer, span["origin"], cos, sin))
+                font = _span_font(page, span, font_cache)
+                span_writer.append(span["origin"], span["text"], font=font, fontsize=span["size"])
+                spans += 1
+    
+    if spans:
+        writer.write_text(new_page, render_mode=3)
+        for span_writer, origin, cos, sin in rotated:
+            # Text was appended unrotated at its origin, turn it into the line direction.
+            # write_text applies the morph in PDF space (y up), where line["dir"] (y down)
+            # is the opposite rotation
+            morph = (fitz.Point(origin), fitz.Matrix(cos, -sin, sin, cos, 0, 0))
+            span_writer.write_text(new_page, render_mode=3, morph=morph)
+    return spans
+
+def _insert_bilevel_image(page, image, preset=DEFAULT_PRESET):
+    """
+    Place a 1-bit image over the whole page, returns the image stream size in bytes
+    
+    The image is stored as a CCITT Group 4 stream (the fax codec every PDF
+    reader decodes, typically a few times smaller than Flate for scanned
+    text), or as a 1-bit PNG when PIL cannot produce a single G4 strip.
+    """
+    g4 = encode_ccitt_g4(image)
+    if g4 is None:
+        data = encode_image(image, 'PNG', preset)
+        page.insert_image(page.rect, stream=data)
+        return len(data)
+    
+    data, black_is_1 = g4
+    doc = page.parent
+    width, height = image.size
+    xref = doc.get_new_xref()
+    doc.update_object(xref, f"<</Type/XObject/Subtype/Image/Width {width}/Height {height}"
+                            f"/ColorSpace/DeviceGray/BitsPerComponent 1>>")
+    # Store the G4 data as is, the filter keys are set afterwards because
+    # an uncompressed update_stream drops them
+    doc.update_stream(xref, data, new=True, compress=False)
+    doc.xref_set_key(xref, "Filter", "/CCITTFaxDecode")
+    doc.xref_set_key(xref, "DecodeParms", f"<</K -1/Columns {width}/Rows {height}"
+                                          f"/BlackIs1 {'true' if black_is_1 else 'false'}>>")
+    page.insert_image(page.rect, xref=xref)
+    return len(data)
+
+def _raster_mode(page, color_mode):
+    """
+    The RASTER_MODES entry a page gets with color_mode ("auto" is decided per page)
+    """
+    return _COLOR_RASTER_MODES[resolve_color_mode(page, color_mode)]
+
+def _compress_page(page, output_doc, quality, preset=DEFAULT_PRESET, text_layer="invisible", font_cache=None,
+                   mode="jpeg", dpi=RASTER_DPI, cache=None, file_hash=None, threshold=DEFAULT_THRESHOLD,
+                   dither=False):
+    """
+    Rasterise one page into output_doc, returns the compressed image size in bytes
+    
+    mode is one of RASTER_MODES: a colour JPEG (the default), a grayscale JPEG
+    or a 1-bit CCITT G4 image (threshold or dithering, see
+    common.page_raster.to_bilevel) rendered at BILEVEL_DPI. JPEG pages are
+    rendered at dpi, through the render cache when cache and file_hash are given.
+    
+    With text_layer="invisible" the page text is laid over the image as an
+    invisible text layer, so the output stays searchable and selectable.
+    """
+    profiler = get_profiler()
+    
+    # Get page as pixmap (image)
+    if mode == "bilevel":
+        dpi = BILEVEL_DPI
+    pix = render_page(page, dpi, "rgb" if mode == "jpeg" else "gray", cache=cache, file_hash=file_hash)
+    
+    # Convert to PIL Image for compression
+    pil_image = pixmap_to_image(pix)
+    
+    # Create new page in output document
+    new_page = output_doc.new_page(width=page.rect.width, height=page.rect.height)
+    
+    # Compress the image and insert it as background
+    if mode == "bilevel":
+        bilevel = to_bilevel(pil_image, threshold, dither)
+        with profiler.stage("g4_encode", page=page.number) as timing:
+            image_bytes = _insert_bilevel_image(new_page, bilevel, preset)
+            timing.bytes = image_bytes
+    else:
+        with profiler.stage("jpeg_encode", page=page.number) as timing:
+            compressed_data = encode_image(pil_image, 'JPEG', preset, quality)
+            timing.bytes = image_bytes = len(compressed_data)
+        with profiler.stage("insert_image", page=page.number):
+            new_page.insert_image(page.rect, stream=compressed_data)
+    
+    # Copy text content (if any)
+    if text_layer == "invisible":
+        with profiler.stage("text_layer", page=page.number):
+            try:
+                _insert_text_layer(page, new_page, {} if font_cache is None else font_cache)
+            except Exception:
+                pass  # Skip if text extraction fails, the image is still there
+    
+    return image_bytes
+
+def _widest_placements(doc):
+    """
+    Widest display width (points) of every image xref over all pages of doc
+    
+    get_image_info parses each page's content once for all its images.
+    """
+    widths = {}
+    with get_profiler().stage("image_placements"):
+        for page in doc:
+            for info in page.get_image_info(xrefs=True):
+                if info['xref']:
+                    widths[info['xref']] = max(widths.get(info['xref'], 0), fitz.Rect(info['bbox']).width)
+    return widths
+
+def _recompress_page_images(doc, page, seen_xrefs, quality, max_dpi, min_image_bytes, preset=DEFAULT_PRESET,
+                            display_widths=None):
+    """
+    Downsample and re-encode the embedded images of one page in place,
+    returns the number of images replaced
+    
+    Images already handled on an earlier page (seen_xrefs) are skipped, so
+    images shared across pages are processed only once. display_widths (see
+    _widest_placements) makes the DPI check use the widest placement in the
+    whole document, so a shared image is never downsampled for a thumbnail
+    while another page shows it large; without it only this page counts.
+    """
+    profiler = get_profiler()
+    replaced = 0
+    
+    for xref, smask, width, height, bpc, colorspace, *_ in page.get_images(full=True):
+        if xref in seen_xrefs:
+            continue
+        seen_xrefs.add(xref)
+        
+        # Leave transparency, stencil masks and bilevel images untouched
+        if smask or bpc == 1 or not colorspace:
+            continue
         
-        # Get page as pixmap (image)
-        mat = fitz.Matrix(1.0, 1.0)  # No scaling
-        pix = page.get_pixmap(matrix=mat)
+        original_size = len(doc.xref_stream_raw(xref))
         
-        # Convert to PIL Image for compression
-        img_data = pix.tobytes("ppm")
-        pil_image = Image.open(io.BytesIO(img_data))
+        # Effective DPI from the largest placement of the image
+        display_width = (display_widths or {}).get(xref)
+        if not display_width:
+            display_width = max((rect.width for rect in page.get_image_rects(xref)), default=0)
+        dpi = width / (display_width / 72.0) if display_width else 0
         
-        # Convert to RGB if needed
-        if pil_image.mode != 'RGB':
-            pil_image = pil_image.convert('RGB')
+        if dpi <= max_dpi and original_size < min_image_bytes:
+            continue
         
-        # Compress the image
-        compressed_buffer = io.BytesIO()
-        pil_image.save(compressed_buffer, format='JPEG', quality=quality, optimize=True)
-        compressed_data = compressed_buffer.getvalue()
+        with profiler.stage("image_extract", page=page.number, nbytes=original_size):
+            pix = fitz.Pixmap(doc, xref)
+            if pix.alpha or pix.n not in (1, 3):
+                pix = fitz.Pixmap(fitz.csRGB, pix, 0)  # CMYK, alpha etc -> RGB
+        pil_image = pixmap_to_image(pix)
         
-        # Create new page in output document
-        new_page = output_doc.new_page(width=page.rect.width, height=page.rect.height)
+        if dpi > max_dpi:
+            scale = max_dpi / dpi
+            new_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+            with profiler.stage("downsample", page=page.number):
+                pil_image = pil_image.resize(new_size, Image.Resampling.LANCZOS)
+        
+        with profiler.stage("jpeg_encode", page=page.number) as timing:
+            compressed_data = encode_image(pil_image, 'JPEG', preset, quality)
+            timing.bytes = len(compressed_data)
+        
+        # Only keep the new image if it actually got smaller
+        if len(compressed_data) >= original_size:
+            continue
+        
+        with profiler.stage("replace_image", page=page.number):
+            page.replace_image(xref, stream=compressed_data)
+        replaced += 1
+    
+    return replaced
+
+def _analyse_page(page):
+    """
+    Cheap content analysis of one page for the adaptive engine
+    
+    Returns image coverage (share of the page area covered by images), the
+    number of text characters and vector drawings, and whether a small
+    thumbnail of the page is grayscale or even bilevel.
+    """
+    page_area = abs(page.rect) or 1.0
+    image_area = sum(abs(fitz.Rect(info["bbox"]) & page.rect) for info in page.get_image_info())
+    text_chars = len(page.get_text("text", flags=fitz.TEXTFLAGS_TEXT).strip())
+    drawings = len(page.get_cdrawings())
+    
+    zoom = ANALYSIS_DPI / 72.0
+    thumbnail = pixmap_to_image(page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csRGB))
+    chroma = image_chroma(thumbnail)
+    histogram = thumbnail.convert("L").histogram()
+    extreme_ratio = (sum(histogram[:64]) + sum(histogram[192:])) / (sum(histogram) or 1)
+    
+    return {
+        'image_coverage': round(min(image_area / page_area, 1.0), 3),
+        'text_chars': text_chars,
+        'drawings': drawings,
+        'grayscale': chroma <= GRAY_MAX_CHROMA,
+        'bilevel': chroma <= GRAY_MAX_CHROMA and extreme_ratio >= BILEVEL_MIN_RATIO,
+    }
+
+def _pick_strategy(analysis):
+    """
+    Strategy for one analysed page: "keep", "images" or one of RASTER_MODES
+    
+    Text/vector pages are kept as they are (rasterising only makes them
+    bigger), scan-like pages are rasterised in the cheapest mode their colours
+    allow and mixed pages only get their embedded images recompressed.
+    """
+    if analysis['image_coverage'] < MIN_IMAGE_COVERAGE:
+        return "keep"
+    if analysis['image_coverage'] >= SCAN_IMAGE_COVERAGE and analysis['drawings'] <= MAX_SCAN_DRAWINGS:
+        if analysis['bilevel']:
+            return "bilevel"
+        return "gray" if analysis['grayscale'] else "jpeg"
+    return "images"
+
+def _page_size(doc, page_num, preset):
+    """
+    Size in bytes of one page of doc saved on its own
+    """
+    single = fitz.open()
+    single.insert_pdf(doc, from_page=page_num, to_page=page_num)
+    size = len(single.tobytes(**pdf_save_options(preset)))
+    single.close()
+    return size
+
+def _compress_pdf_adaptive(input_path, output_path, quality, max_dpi, min_image_bytes, preset=DEFAULT_PRESET,
+                           text_layer="invisible", threshold=DEFAULT_THRESHOLD, dither=False):
+    """
+    Adaptive engine: analyse every page and compress it with the strategy that fits it
+    
+    The output starts as a copy of the input. Rasterised pages only replace
+    the original page when they are smaller on their own, recompressed images
+    only replace images they beat (see _recompress_page_images), and if the
+    saved file still ends up bigger than the input the input is copied instead.
+    
+    Returns:
+        dict: {'pages': one decision dict per page (analysis, strategy, sizes)}
+    """
+    profiler = get_profiler()
+    input_doc = fitz.open(input_path)
+    output_doc = fitz.open(input_path)
+    seen_xrefs = set()
+    display_widths = _widest_placements(output_doc)
+    font_cache = {}
+    decisions = []
+    
+    try:
+        for page_num in range(len(input_doc)):
+            page = input_doc[page_num]
+            with profiler.stage("analyse", page=page_num):
+                analysis = _analyse_page(page)
+            strategy = _pick_strategy(analysis)
+            decision = {'page': page_num + 1, 'strategy': strategy, **analysis}
+            
+            if strategy == "images":
+                decision['images_replaced'] = _recompress_page_images(
+                    output_doc, output_doc[page_num], seen_xrefs, quality, max_dpi, min_image_bytes, preset,
+                    display_widths)
+            elif strategy in RASTER_MODES:
+                candidate = fitz.open()
+                _compress_page(page, candidate, quality, preset, text_layer, font_cache, strategy,
+                               threshold=threshold, dither=dither)
+                decision['original_bytes'] = _page_size(input_doc, page_num, preset)
+                decision['raster_bytes'] = len(candidate.tobytes(**pdf_save_options(preset)))
+                if decision['raster_bytes'] < decision['original_bytes']:
+                    output_doc.insert_pdf(candidate, start_at=page_num)
+                    output_doc.delete_page(page_num + 1)
+                else:
+                    # Rasterising would make this page bigger, keep the original
+                    decision['strategy'] = "keep"
+                    decision['rejected'] = strategy
+                candidate.close()
+            decisions.append(decision)
         
-        # Insert compressed image as background
-        new_page.insert_image(page.rect, stream=compressed_data)
+        _save_doc(output_doc, output_path, preset)
+    finally:
+        output_doc.close()
+        input_doc.close()
+    
+    if os.path.getsize(output_path) >= os.path.getsize(input_path):
+        shutil.copyfile(input_path, output_path)
+        for decision in decisions:
+            decision['strategy'] = "keep"
+    return {'pages': decisions}
+
+def _sample_indexes(page_count, samples):
+    """
+    Up to samples page indexes spread evenly over the document
+    """
+    if page_count <= samples:
+        return list(range(page_count))
+    step = page_count / samples
+    return [int(index * step + step / 2) for index in range(samples)]
+
+def _search_quality(fits, low, high):
+    """
+    Binary search for the highest quality in [low, high] where fits(quality)
+    holds (size grows with quality), None when even low does not fit
+    """
+    best = None
+    while low <= high:
+        middle = (low + high) // 2
+        if fits(middle):
+            best, low = middle, middle + 1
+        else:
+            high = middle - 1
+    return best
+
+def _compress_pdf_to_target(input_path, output_path, target_bytes, preset=DEFAULT_PRESET, text_layer="invisible"):
+    """
+    Raster engine with the JPEG quality and render DPI chosen to stay under target_bytes
+    
+    Quality is first picked by binary search on an estimate from a sample of
+    pages, then refined with full passes: each pass corrects the estimate by
+    the ratio between the real and the estimated size (text layer and PDF
+    structure are not in the sample) and narrows the quality range. Only when
+    no quality fits at a DPI the next lower DPI in TARGET_DPIS is tried.
+    
+    Once a pass fits, the search never leaves its DPI: when no higher quality
+    fits there it stops instead of running a lower-DPI pass that would be
+    discarded anyway.
+    
+    Pages are rendered once per DPI into a temporary render cache (capped at
+    the render cache default), so later passes only pay for encoding.
+    
+    Returns:
+        dict: {'target': report with the chosen dpi/quality, size and every pass}
+    """
+    profiler = get_profiler()
+    doc = fitz.open(input_path)
+    page_count = len(doc)
+    if page_count == 0:
+        doc.close()
+        raise ValueError("PDF tidak punya halaman, target ukuran tidak bisa dihitung")
+    temp_dir = tempfile.mkdtemp(prefix="kompres_target_", dir=os.path.dirname(os.path.abspath(output_path)))
+    cache = RenderCache(os.path.join(temp_dir, "render"), max_mb=DEFAULT_MAX_MB)
+    file_hash = cache.file_hash(input_path)
+    sample = _sample_indexes(page_count, TARGET_SAMPLE_PAGES)
+    sample_images = {}
+    estimates = {}
+    
+    def estimate(dpi, quality):
+        """Estimated JPEG bytes of the whole document from the sample pages"""
+        if dpi not in sample_images:
+            sample_images[dpi] = [
+                pixmap_to_image(render_page(doc[index], dpi, cache=cache, file_hash=file_hash)) for index in sample
+            ]
+        if (dpi, quality) not in estimates:
+            with profiler.stage("target_estimate"):
+                sample_bytes = sum(len(encode_image(image, 'JPEG', preset, quality)) for image in sample_images[dpi])
+            estimates[(dpi, quality)] = sample_bytes * page_count / len(sample)
+        return estimates[(dpi, quality)]
+    
+    font_cache = {}
+    passes = []
+    tried = set()
+    best = None  # index of the biggest pass that fits
+    dpi_index = 0
+    low, high = TARGET_QUALITY_RANGE
+    ratio = 1.0
+    
+    try:
+        while len(passes) < TARGET_MAX_PASSES:
+            quality = None
+            while quality is None and dpi_index < len(TARGET_DPIS):
+                dpi = TARGET_DPIS[dpi_index]
+                quality = _search_quality(lambda q: estimate(dpi, q) * ratio <= target_bytes, low, high)
+                if quality is None:
+                    if best is not None:
+                        break  # Nothing above the best pass fits, a lower DPI would only be discarded
+                    dpi_index += 1
+                    low, high = TARGET_QUALITY_RANGE
+            if quality is None and best is not None:
+                break
+            if quality is None:
+                # Not even the smallest setting fits by the estimate, try it for real once
+                dpi, quality = TARGET_DPIS[-1], TARGET_QUALITY_RANGE[0]
+            if (dpi, quality) in tried:
+                break
+            tried.add((dpi, quality))
+            
+            pass_path = os.path.join(temp_dir, f"pass_{len(passes)}.pdf")
+            output_doc = fitz.open()
+            for page_num in range(page_count):
+                _compress_page(doc[page_num], output_doc, quality, preset, text_layer, font_cache,
+                               dpi=dpi, cache=cache, file_hash=file_hash)
+            _save_doc(output_doc, pass_path, preset)
+            output_doc.close()
+            
+            size = os.path.getsize(pass_path)
+            passes.append({'dpi': dpi, 'quality': quality, 'bytes': size,
+                           'estimate': round(estimate(dpi, quality) * ratio)})
+            ratio = size / estimate(dpi, quality)
+            
+            if size <= target_bytes:
+                if best is None or size > passes[best]['bytes']:
+                    best = len(passes) - 1
+                if size >= target_bytes * TARGET_FILL:
+                    break
+                low = quality + 1  # Room left, look for a better quality at this DPI
+                if low > high:
+                    break
+            else:
+                high = quality - 1
+                if high < low:
+                    if best is not None:
+                        break  # The best pass is the highest quality that fits
+                    dpi_index += 1
+                    low, high = TARGET_QUALITY_RANGE
         
-        # Copy text content (if any)
-        try:
-            text_dict = page.get_text("dict")
-            for block in text_dict["blocks"]:
-                if "lines" in block:  # Text block
-                    for line in block["lines"]:
-                        for span in line["spans"]:
-                            new_page.insert_text(
-                                (span["bbox"][0], span["bbox"][1]), 
-                                span["text"], 
-                                fontsize=span["size"],
-                                color=(0, 0, 0)
-                            )
-        except:
-            pass  # Skip if text extraction fails
+        reached = best is not None
+        if not reached:
+            best = min(range(len(passes)), key=lambda index: passes[index]['bytes'])
+        chosen = passes[best]
+        shutil.move(os.path.join(temp_dir, f"pass_{best}.pdf"), output_path)
+    finally:
+        doc.close()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    return {'target': {
+        'target_bytes': target_bytes,
+        'reached': reached,
+        'dpi': chosen['dpi'],
+        'quality': chosen['quality'],
+        'bytes': chosen['bytes'],
+        'passes': passes,
+    }}
+
+def _save_doc(doc, output_path, preset):
+    """
+    Save with the preset's PDF options, timed as the "save" stage
+    """
+    with get_profiler().stage("save") as timing:
+        doc.save(output_path, **pdf_save_options(preset))
+        timing.bytes = os.path.getsize(output_path)
+
+def _compress_pdf_images(input_path, output_path, quality, max_dpi, min_image_bytes, preset=DEFAULT_PRESET):
+    """
+    Image-only engine: recompress embedded images, keep text and vector content as is
+    """
+    doc = fitz.open(input_path)
+    seen_xrefs = set()
+    display_widths = _widest_placements(doc)
+    
+    for page in doc:
+        _recompress_page_images(doc, page, seen_xrefs, quality, max_dpi, min_image_bytes, preset, display_widths)
+    
+    _save_doc(doc, output_path, preset)
+    doc.close()
+
+def compress_pdf(input_path, output_path, quality=60, chunk_pages=None, max_buffer_mb=None,
+                 engine="raster", max_dpi=150, min_image_kb=64, preset=DEFAULT_PRESET, text_layer="invisible",
+                 target_size_mb=None, color_mode="rgb", threshold=DEFAULT_THRESHOLD, dither=False):
+    """
+    Compress PDF by reducing image quality and file size
+    
+    The "raster" engine renders every page to a JPEG. The "images" engine only
+    downsamples/re-encodes embedded images above max_dpi or min_image_kb and
+    leaves text and vector content untouched, which is much faster for mixed
+    documents. The "adaptive" engine picks per page between keeping it,
+    recompressing its images and a colour, grayscale or bilevel raster, and
+    never makes the file bigger.
+    
+    With target_size_mb the raster engine picks quality and render DPI itself
+    to get the output under that size (quality is then ignored).
+    
+    color_mode makes the raster engine render pages as grayscale JPEGs or
+    1-bit CCITT G4 images instead of colour JPEGs; "auto" uses grayscale for
+    pages without colour content.
+    
+    Setting chunk_pages or max_buffer_mb switches the raster engine to
+    streaming mode: the output is flushed to partial files and merged at the
+    end, so memory stays flat no matter how many pages the input has.
+    
+    Args:
+        input_path: Path to input PDF file
+        output_path: Path for the compressed PDF
+        quality: JPEG quality (1-100)
+        chunk_pages: Flush the output every N pages (streaming mode)
+        max_buffer_mb: Flush once buffered page images exceed this many MB (streaming mode)
+        engine: "raster", "images" or "adaptive"
+        max_dpi: Images engine, downsample images above this effective DPI
+        min_image_kb: Images engine, re-encode images larger than this even below max_dpi
+        preset: Encoding preset for JPEGs and the PDF save, see common.encoding
+        text_layer: Raster/adaptive engine, "invisible" keeps the text searchable, "none" drops it
+        target_size_mb: Raster engine, maximum output size in MB
+        color_mode: Raster engine, "rgb", "gray", "bilevel" or "auto"
+        threshold: Bilevel pages, gray value (0-255) from which a pixel becomes white
+        dither: Bilevel pages, Floyd-Steinberg dithering instead of the threshold
+    
+    Returns:
+        dict: Extra report fields, 'pages' (adaptive engine) or 'target' (target size)
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Engine tidak dikenal: {engine}")
+    if text_layer not in TEXT_LAYERS:
+        raise ValueError(f"Text layer tidak dikenal: {text_layer}")
+    if color_mode not in COLOR_MODES:
+        raise ValueError(f"Mode warna tidak dikenal: {color_mode}")
+    if color_mode != "rgb" and engine != "raster":
+        raise ValueError("Mode warna hanya untuk engine raster (adaptive memilih sendiri)")
+    if engine != "raster" and (chunk_pages or max_buffer_mb):
+        raise ValueError("Mode streaming hanya untuk engine raster")
+    if target_size_mb:
+        if engine != "raster" or chunk_pages or max_buffer_mb or color_mode != "rgb":
+            raise ValueError("Target ukuran hanya untuk engine raster berwarna tanpa mode streaming")
+        return _compress_pdf_to_target(input_path, output_path, int(target_size_mb * 1024 * 1024), preset, text_layer)
+    
+    if engine == "images":
+        _compress_pdf_images(input_path, output_path, quality, max_dpi, min_image_kb * 1024, preset)
+        return {}
+    if engine == "adaptive":
+        return _compress_pdf_adaptive(input_path, output_path, quality, max_dpi, min_image_kb * 1024, preset,
+                                      text_layer, threshold, dither)
+    
+    if chunk_pages or max_buffer_mb:
+        _compress_pdf_streaming(input_path, output_path, quality, chunk_pages, max_buffer_mb, preset, text_layer,
+                                color_mode, threshold, dither)
+        return {}
+    
+    input_doc = fitz.open(input_path)
+    output_doc = fitz.open()  # Create new document
+    font_cache = {}
+    
+    for page_num in range(len(input_doc)):
+        page = input_doc[page_num]
+        _compress_page(page, output_doc, quality, preset, text_layer, font_cache, _raster_mode(page, color_mode),
+                       threshold=threshold, dither=dither)
     
     # Save compressed document
-    output_doc.save(output_path, garbage=4, deflate=True)
+    _save_doc(output_doc, output_path, preset)
     output_doc.close()
     input_doc.close()
+    return {}
 
-# GUI file picker (multi-file)
-root = Tk()
-root.withdraw()
-input_pdfs = filedialog.askopenfilenames(title="Pilih PDF yang mau dikompres (multi)", filetypes=[("PDF files", "*.pdf")])
+def _compress_pdf_streaming(input_path, output_path, quality, chunk_pages, max_buffer_mb, preset=DEFAULT_PRESET,
+                            text_layer="invisible", color_mode="rgb", threshold=DEFAULT_THRESHOLD, dither=False):
+    """
+    Streaming variant of compress_pdf, see compress_pdf for the arguments
+    """
+    max_buffer = max_buffer_mb * 1024 * 1024 if max_buffer_mb else None
+    temp_dir = tempfile.mkdtemp(prefix="kompres_", dir=os.path.dirname(os.path.abspath(output_path)))
+    part_paths = []
+    
+    input_doc = fitz.open(input_path)
+    output_doc = fitz.open()
+    # Fonts are standalone copies, the cache survives reopening the input
+    font_cache = {}
+    try:
+        total_pages = len(input_doc)
+        buffered = 0
+        
+        for page_num in range(total_pages):
+            page = input_doc[page_num]
+            buffered += _compress_page(page, output_doc, quality, preset, text_layer, font_cache,
+                                       _raster_mode(page, color_mode), threshold=threshold, dither=dither)
+            
+            chunk_full = (chunk_pages and len(output_doc) >= chunk_pages) or (max_buffer and buffered >= max_buffer)
+            if chunk_full or page_num == total_pages - 1:
+                part_path = os.path.join(temp_dir, f"part_{len(part_paths):05d}.pdf")
+                _save_doc(output_doc, part_path, preset)
+                output_doc.close()
+                part_paths.append(part_path)
+                
+                output_doc = fitz.open()
+                buffered = 0
+                # Reopen the input so MuPDF drops the page objects it has cached
+                input_doc.close()
+                input_doc = fitz.open(input_path)
+        
+        with get_profiler().stage("merge_parts"):
+            _merge_parts(part_paths, output_path, preset)
+    finally:
+        output_doc.close()
+        input_doc.close()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def _merge_parts(part_paths, output_path, preset=DEFAULT_PRESET):
+    """
+    Append partial PDFs one at a time with incremental saves, so only a
+    single part is ever loaded in memory
+    
+    Every part embeds its own copy of the text-layer fonts. Presets that
+    deduplicate objects (garbage 3 and up, "balanced" and "smallest") finish
+    with one full save of the merged file, which collapses those copies but
+    loads the whole merged document, so peak memory at that step grows with
+    the output size. The "fast" preset keeps the incremental file as the
+    result: memory stays at about one part, the font copies stay too.
+    """
+    merged_path = os.path.join(os.path.dirname(part_paths[0]), "merged.pdf")
+    shutil.copyfile(part_paths[0], merged_path)
+    
+    for part_path in part_paths[1:]:
+        merged_doc = fitz.open(merged_path)
+        part_doc = fitz.open(part_path)
+        merged_doc.insert_pdf(part_doc)
+        merged_doc.saveIncr()
+        part_doc.close()
+        merged_doc.close()
+    
+    save_options = pdf_save_options(preset)
+    if save_options["garbage"] < 3:
+        # No duplicate merging asked for, the parts were already saved with the preset
+        shutil.move(merged_path, output_path)
+        return
+    merged_doc = fitz.open(merged_path)
+    try:
+        merged_doc.save(output_path, **save_options)
+    finally:
+        merged_doc.close()
+
+def _compress_one(input_pdf, output_pdf, options):
+    """
+    Compress a single file for compress_batch, errors are returned instead of raised
+    """
+    result = {
+        'input': input_pdf,
+        'output': output_pdf,
+        'original_size': os.path.getsize(input_pdf) if os.path.exists(input_pdf) else None,
+        'compressed_size': None,
+        'reduction': None,
+        'seconds': None,
+        'error': None,
+    }
+    start = time.perf_counter()
+    try:
+        result.update(compress_pdf(input_pdf, output_pdf, **options))
+        result['compressed_size'] = os.path.getsize(output_pdf)
+        result['reduction'] = round((1 - result['compressed_size'] / result['original_size']) * 100, 1)
+    except Exception as e:
+        result['error'] = str(e)
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    return result
+
+def _compress_one_worker(input_pdf, output_pdf, options):
+    """
+    _compress_one in a worker process, also returns the worker's profiling events
+    """
+    return _compress_one(input_pdf, output_pdf, options), get_profiler().drain()
+
+def _print_result(result):
+    if result['error']:
+        print(f"❌ Error pada {os.path.basename(result['input'])}: {result['error']}")
+        return
+    print(f"✅ Berhasil: {os.path.basename(result['output'])}")
+    print(f"   📉 Ukuran: {result['original_size']/1024:.1f}KB ➡ {result['compressed_size']/1024:.1f}KB "
+          f"(hemat {result['reduction']:.1f}%) dalam {result['seconds']:.1f}s")
+    if 'pages' in result:
+        counts = {}
+        for decision in result['pages']:
+            counts[decision['strategy']] = counts.get(decision['strategy'], 0) + 1
+        print(f"   🧭 Strategi: {', '.join(f'{name} {count}' for name, count in sorted(counts.items()))} halaman")
+    if 'target' in result:
+        target = result['target']
+        status = "tercapai" if target['reached'] else "TIDAK tercapai (hasil terkecil dipakai)"
+        print(f"   🎯 Target {target['target_bytes']/1024/1024:.1f}MB {status}: {target['dpi']} DPI, "
+              f"quality {target['quality']}, {len(target['passes'])} pass")
+
+def print_summary(results):
+    """
+    Print a per-file result table for compress_batch
+    """
+    print(f"\n{'File':<40} {'Asli (KB)':>10} {'Hasil (KB)':>11} {'Hemat':>7} {'Waktu':>8}  Status")
+    print("-" * 90)
+    for result in results:
+        name = os.path.basename(result['input'])
+        if len(name) > 40:
+            name = name[:37] + "..."
+        original = f"{result['original_size']/1024:.1f}" if result['original_size'] is not None else "-"
+        if result['error']:
+            print(f"{name:<40} {original:>10} {'-':>11} {'-':>7} {result['seconds']:>7.1f}s  ❌ {result['error']}")
+        else:
+            print(f"{name:<40} {original:>10} {result['compressed_size']/1024:>11.1f} "
+                  f"{result['reduction']:>6.1f}% {result['seconds']:>7.1f}s  ✅")
+    
+    succeeded = [r for r in results if not r['error']]
+    total_original = sum(r['original_size'] for r in succeeded)
+    total_compressed = sum(r['compressed_size'] for r in succeeded)
+    print("-" * 90)
+    print(f"Total: {len(succeeded)}/{len(results)} berhasil, "
+          f"{total_original/1024/1024:.1f}MB ➡ {total_compressed/1024/1024:.1f}MB")
 
-if input_pdfs:
+def compress_batch(input_pdfs, workers=1, json_path=None, output_dir=None, **options):
+    """
+    Compress many PDFs, optionally across a process pool
+    
+    Every input is written as <name>_compressed.pdf, next to itself or in output_dir.
+    
+    Args:
+        input_pdfs: List of input PDF paths
+        workers: Number of worker processes (1 = sequential)
+        json_path: Optional path to write the results as JSON
+        output_dir: Optional folder for the compressed files
+        **options: Passed through to compress_pdf (quality, engine, ...)
+    
+    Returns:
+        list: One result dict per input, in input order
+    """
+    jobs = []
     for input_pdf in input_pdfs:
         base = os.path.splitext(input_pdf)[0]
-        output_pdf = base + "_compressed.pdf"
-        print(f"Proses: {os.path.basename(input_pdf)} ➡ {os.path.basename(output_pdf)}")
-        try:
-            compress_pdf(input_pdf, output_pdf, quality=60)
-            
-            # Check file size reduction
-            original_size = os.path.getsize(input_pdf)
-            compressed_size = os.path.getsize(output_pdf)
-            reduction = (1 - compressed_size/original_size) * 100
-            
-            print(f"✅ Berhasil: {os.path.basename(output_pdf)}")
-            print(f"   📉 Ukuran: {original_size/1024:.1f}KB ➡ {compressed_size/1024:.1f}KB (hemat {reduction:.1f}%)")
-            
-        except Exception as e:
-            print(f"❌ Error pada {os.path.basename(input_pdf)}: {e}")
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+            base = os.path.join(output_dir, os.path.basename(base))
+        jobs.append((input_pdf, base + "_compressed.pdf"))
+    results = [None] * len(jobs)
+    batch_start = time.perf_counter()
+    
+    if workers <= 1 or len(jobs) < 2:
+        for index, (input_pdf, output_pdf) in enumerate(jobs):
+            print(f"Proses: {os.path.basename(input_pdf)} ➡ {os.path.basename(output_pdf)}")
+            results[index] = _compress_one(input_pdf, output_pdf, options)
+            _print_result(results[index])
+    else:
+        print(f"⚙️  Kompres {len(jobs)} file pakai {workers} proses...")
+        profiler = get_profiler()
+        with ProcessPoolExecutor(max_workers=workers, initializer=enable_profiling,
+                                 initargs=(profiler.enabled,)) as executor:
+            futures = {
+                executor.submit(_compress_one_worker, input_pdf, output_pdf, options): index
+                for index, (input_pdf, output_pdf) in enumerate(jobs)
+            }
+            for future in as_completed(futures):
+                results[futures[future]], events = future.result()
+                profiler.merge(events)
+                _print_result(results[futures[future]])
+    
+    print_summary(results)
+    
+    if json_path:
+        report = {
+            'workers': workers,
+            'options': options,
+            'wall_seconds': round(time.perf_counter() - batch_start, 3),
+            'files': results,
+        }
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Laporan JSON disimpan di: {json_path}")
+    
+    return results
+
+def select_pdfs_gui():
+    """
+    Open a multi-file picker, returns the chosen paths
+    """
+    from tkinter import Tk, filedialog
+    
+    root = Tk()
+    root.withdraw()
+    input_pdfs = filedialog.askopenfilenames(title="Pilih PDF yang mau dikompres (multi)", filetypes=[("PDF files", "*.pdf")])
+    root.destroy()
+    return list(input_pdfs)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Kompres PDF dengan mengurangi kualitas gambar',
+        epilog='Tanpa input, file picker (GUI) akan dibuka.'
+    )
+    parser.add_argument('inputs', nargs='*', help='File PDF yang mau dikompres')
+    parser.add_argument('-o', '--output-dir',
+                        help='Folder output (default: di sebelah file asli)')
+    parser.add_argument('-q', '--quality', type=int, default=60,
+                        help='Kualitas JPEG 1-100 (default: 60)')
+    parser.add_argument('--target-size', type=float, metavar='MB', dest='target_size_mb',
+                        help='Engine raster: cari quality dan DPI sendiri supaya hasil di bawah N MB')
+    parser.add_argument('--chunk-pages', type=int,
+                        help='Mode streaming: tulis output tiap N halaman (hemat RAM untuk PDF besar)')
+    parser.add_argument('--max-buffer-mb', type=float,
+                        help='Mode streaming: tulis output tiap kali buffer gambar melewati N MB')
+    parser.add_argument('--engine', choices=ENGINES, default='raster',
+                        help='raster = render ulang tiap halaman, images = kompres gambar saja, '
+                             'adaptive = pilih strategi per halaman (default: raster)')
+    parser.add_argument('--text-layer', choices=TEXT_LAYERS, default='invisible',
+                        help='Engine raster/adaptive: invisible = teks tetap bisa dicari/dicopy, none = buang teks (default: invisible)')
+    parser.add_argument('--color', choices=COLOR_MODES, default='rgb', dest='color_mode',
+                        help='Engine raster: gray = JPEG abu-abu, bilevel = hitam putih 1-bit (CCITT G4), '
+                             'auto = abu-abu untuk halaman tanpa warna (default: rgb)')
+    parser.add_argument('--threshold', type=int, default=DEFAULT_THRESHOLD,
+                        help=f'Bilevel: nilai abu-abu 0-255 yang jadi putih (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--dither', action='store_true',
+                        help='Bilevel: pakai dithering Floyd-Steinberg, bukan threshold')
+    parser.add_argument('--max-dpi', type=int, default=150,
+                        help='Engine images: turunkan resolusi gambar di atas DPI ini (default: 150)')
+    parser.add_argument('--min-image-kb', type=int, default=64,
+                        help='Engine images: kompres ulang gambar di atas ukuran ini (default: 64 KB)')
+    parser.add_argument('--preset', choices=ENCODING_PRESETS, default=DEFAULT_PRESET,
+                        help=f'Preset encode: fast = cepat, smallest = file paling kecil (default: {DEFAULT_PRESET})')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Jumlah proses untuk kompres banyak file sekaligus (default: 1)')
+    parser.add_argument('--json', dest='json_path',
+                        help='Simpan hasil per file ke file JSON')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    enable_profiling(args.profile or bool(args.profile_trace))
+    
+    input_pdfs = args.inputs or select_pdfs_gui()
+    if not input_pdfs:
+        print("Lu gak milih file apapun, ngapain nanya wkwk.")
+        return
+    
+    compress_batch(
+        input_pdfs,
+        workers=args.workers,
+        json_path=args.json_path,
+        output_dir=args.output_dir,
+        quality=args.quality,
+        chunk_pages=args.chunk_pages,
+        max_buffer_mb=args.max_buffer_mb,
+        engine=args.engine,
+        max_dpi=args.max_dpi,
+        min_image_kb=args.min_image_kb,
+        preset=args.preset,
+        text_layer=args.text_layer,
+        target_size_mb=args.target_size_mb,
+        color_mode=args.color_mode,
+        threshold=args.threshold,
+        dither=args.dither,
+    )
     print("🎉 Proses kompresi selesai!")
-else:
-    print("Lu gak milih file apapun, ngapain nanya wkwk.")
+    report_profile(args)
+
+if __name__ == "__main__":
+    main()
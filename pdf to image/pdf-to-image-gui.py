@@ -1,16 +1,30 @@
-import fitz  # PyMuPDF
 import os
+import sys
 from tkinter import Tk, filedialog, messagebox, simpledialog, ttk, W, E, N, S, StringVar, BooleanVar, DoubleVar
-from PIL import Image
-import io
+import queue
 import threading
+import time
 from datetime import datetime
 
+# Shared helpers live in the "common" package at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.encoding import DEFAULT_PRESET, ENCODING_PRESETS
+from common.page_raster import COLOR_MODES
+from common.page_scheduler import convert_page_jobs, default_workers
+from common.pipeline import JobCancelled, JobControl
+from common.prescan import page_pixels, scan_pdfs
+from common.render_cache import RenderCache
+
+# The Tk loop drains the job's event queue at this rate, never per page
+UI_POLL_MS = 100
+# Pages/sec is averaged over this many seconds, so the readout does not jump
+RATE_WINDOW_SECONDS = 5.0
+
 class PDFToImageConverter:
     def __init__(self):
         self.root = Tk()
         self.root.title("PDF to Image Converter Pro")
-        self.root.geometry("600x500")
+        self.root.geometry("700x760")
         
         # Configure root grid
         self.root.columnconfigure(0, weight=1)
@@ -61,10 +75,26 @@ class PDFToImageConverter:
         quality_spin = ttk.Spinbox(settings_frame, from_=1, to=100, textvariable=self.quality_var, width=10)
         quality_spin.grid(row=2, column=1, padx=(10, 0), pady=5, sticky=W)
         
+        # Encoding preset
+        ttk.Label(settings_frame, text="Preset Encode:").grid(row=3, column=0, sticky=W, pady=5)
+        self.preset_var = StringVar(value=DEFAULT_PRESET)
+        preset_combo = ttk.Combobox(settings_frame, textvariable=self.preset_var, values=list(ENCODING_PRESETS), state="readonly")
+        preset_combo.grid(row=3, column=1, padx=(10, 0), pady=5, sticky=W)
+        
+        # Colour mode, auto = grayscale for pages without colour
+        ttk.Label(settings_frame, text="Mode Warna:").grid(row=4, column=0, sticky=W, pady=5)
+        color_frame = ttk.Frame(settings_frame)
+        color_frame.grid(row=4, column=1, padx=(10, 0), pady=5, sticky=W)
+        self.color_var = StringVar(value="rgb")
+        ttk.Combobox(color_frame, textvariable=self.color_var, values=list(COLOR_MODES), state="readonly",
+                     width=10).pack(side="left")
+        self.dither_var = BooleanVar(value=False)
+        ttk.Checkbutton(color_frame, text="Dithering (bilevel)", variable=self.dither_var).pack(side="left", padx=(10, 0))
+        
         # Page range
-        ttk.Label(settings_frame, text="Range Halaman:").grid(row=3, column=0, sticky=W, pady=5)
+        ttk.Label(settings_frame, text="Range Halaman:").grid(row=5, column=0, sticky=W, pady=5)
         page_frame = ttk.Frame(settings_frame)
-        page_frame.grid(row=3, column=1, padx=(10, 0), pady=5, sticky=W)
+        page_frame.grid(row=5, column=1, padx=(10, 0), pady=5, sticky=W)
         
         self.page_all_var = BooleanVar(value=True)
         ttk.Radiobutton(page_frame, text="Semua", variable=self.page_all_var, value=True).pack(side="left")
@@ -76,28 +106,63 @@ class PDFToImageConverter:
         ttk.Label(page_frame, text="to").pack(side="left", padx=5)
         ttk.Entry(page_frame, textvariable=self.page_end_var, width=5).pack(side="left")
         
+        # Worker processes, shared by all files
+        ttk.Label(settings_frame, text="Proses:").grid(row=6, column=0, sticky=W, pady=5)
+        self.workers_var = StringVar(value=str(default_workers()))
+        workers_spin = ttk.Spinbox(settings_frame, from_=1, to=os.cpu_count() or 1, textvariable=self.workers_var, width=10)
+        workers_spin.grid(row=6, column=1, padx=(10, 0), pady=5, sticky=W)
+        
+        # Render cache
+        self.cache_var = BooleanVar(value=False)
+        ttk.Checkbutton(settings_frame, text="Pakai render cache (ganti format tanpa render ulang)",
+                        variable=self.cache_var).grid(row=7, column=0, columnspan=2, sticky=W, pady=5)
+        
         # Progress bar
         self.progress_var = DoubleVar()
         self.progress_bar = ttk.Progressbar(main_frame, variable=self.progress_var, maximum=100)
-        self.progress_bar.grid(row=6, column=0, columnspan=2, sticky=(W, E), pady=20)
+        self.progress_bar.grid(row=6, column=0, columnspan=2, sticky=(W, E), pady=(20, 5))
         
         # Status label
         self.status_var = StringVar(value="Siap untuk konversi...")
         status_label = ttk.Label(main_frame, textvariable=self.status_var)
         status_label.grid(row=7, column=0, columnspan=2, pady=5)
         
+        # One progress row per file
+        self.file_table = ttk.Treeview(main_frame, columns=("pages", "percent", "rate", "status"), height=6)
+        self.file_table.heading("#0", text="File")
+        self.file_table.heading("pages", text="Halaman")
+        self.file_table.heading("percent", text="%")
+        self.file_table.heading("rate", text="Hal/detik")
+        self.file_table.heading("status", text="Status")
+        self.file_table.column("#0", width=240)
+        for column, width in (("pages", 90), ("percent", 50), ("rate", 80), ("status", 140)):
+            self.file_table.column(column, width=width, anchor="center")
+        self.file_table.grid(row=8, column=0, columnspan=2, sticky=(W, E), pady=5)
+        
         # Buttons
         button_frame = ttk.Frame(main_frame)
-        button_frame.grid(row=8, column=0, columnspan=2, pady=20)
+        button_frame.grid(row=9, column=0, columnspan=2, pady=20)
         
         self.convert_btn = ttk.Button(button_frame, text="Mulai Konversi", command=self.start_conversion)
         self.convert_btn.pack(side="left", padx=(0, 10))
         
-        ttk.Button(button_frame, text="Keluar", command=self.root.quit).pack(side="left")
+        self.pause_btn = ttk.Button(button_frame, text="Jeda", command=self.toggle_pause, state="disabled")
+        self.pause_btn.pack(side="left", padx=(0, 10))
+        
+        self.cancel_btn = ttk.Button(button_frame, text="Batal", command=self.cancel_conversion, state="disabled")
+        self.cancel_btn.pack(side="left", padx=(0, 10))
+        
+        ttk.Button(button_frame, text="Keluar", command=self.quit_app).pack(side="left")
+        self.root.protocol("WM_DELETE_WINDOW", self.quit_app)
         
         # File list
         self.selected_files = []
         
+        # Running job: control switch and the event queue the Tk loop polls
+        self.control = None
+        self.events = None
+        self.quit_requested = False
+        
     def browse_files(self):
         files = filedialog.askopenfilenames(
             title="Pilih file PDF",
@@ -115,17 +180,17 @@ class PDFToImageConverter:
         if folder:
             self.output_var.set(folder)
     
-    def convert_pdf_to_images(self, pdf_path, output_folder, settings, progress_callback=None):
-        """Convert PDF to images with progress callback"""
-        doc = fitz.open(pdf_path)
+    def plan_pages(self, pdf_path, output_folder, settings, total_pages):
+        """
+        Output folder and (page_index, output_path) list of one PDF
+        
+        Runs on the job thread, total_pages comes from the pre-scan.
+        """
         base_filename = os.path.splitext(os.path.basename(pdf_path))[0]
         
-        # Create output subfolder
         pdf_output_folder = os.path.join(output_folder, f"{base_filename}_images")
-        os.makedirs(pdf_output_folder, exist_ok=True)
         
         # Determine page range
-        total_pages = len(doc)
         if settings['page_all']:
             start_page = 0
             end_page = total_pages
@@ -133,48 +198,19 @@ class PDFToImageConverter:
             start_page = max(0, settings['page_start'] - 1)
             end_page = min(total_pages, settings['page_end'])
         
-        converted_files = []
-        pages_to_convert = end_page - start_page
-        
-        for i, page_num in enumerate(range(start_page, end_page)):
-            page = doc[page_num]
-            
-            # Calculate matrix for DPI
-            zoom = settings['dpi'] / 72.0
-            mat = fitz.Matrix(zoom, zoom)
-            
-            # Get page as pixmap
-            pix = page.get_pixmap(matrix=mat)
-            
+        pages = []
+        for page_num in range(start_page, end_page):
             # Create filename
-            if pages_to_convert == 1:
+            if end_page - start_page == 1:
                 filename = f"{base_filename}.{settings['format'].lower()}"
             else:
                 filename = f"{base_filename}_page_{page_num + 1:03d}.{settings['format'].lower()}"
-            
-            output_path = os.path.join(pdf_output_folder, filename)
-            
-            # Save image
-            if settings['format'].upper() in ['JPEG', 'WEBP']:
-                # Use PIL for better quality control
-                img_data = pix.tobytes("ppm")
-                pil_image = Image.open(io.BytesIO(img_data))
-                if pil_image.mode != 'RGB' and settings['format'].upper() == 'JPEG':
-                    pil_image = pil_image.convert('RGB')
-                pil_image.save(output_path, format=settings['format'], quality=settings['quality'], optimize=True)
-            else:
-                # Use PyMuPDF directly
-                pix.save(output_path)
-            
-            converted_files.append(output_path)
-            
-            # Update progress
-            if progress_callback:
-                progress = ((i + 1) / pages_to_convert) * 100
-                progress_callback(progress, f"Converting page {page_num + 1} of {base_filename}")
+            pages.append((page_num, os.path.join(pdf_output_folder, filename)))
         
-        doc.close()
-        return converted_files, pdf_output_folder
+        # Create output subfolder, not for files without pages in range
+        if pages:
+            os.makedirs(pdf_output_folder, exist_ok=True)
+        return pdf_output_folder, pages
     
     def start_conversion(self):
         if not self.selected_files:
@@ -185,64 +221,241 @@ class PDFToImageConverter:
             messagebox.showerror("Error", "Pilih folder output terlebih dahulu!")
             return
         
-        # Disable convert button
-        self.convert_btn.config(state="disabled")
-        
         # Get settings
         settings = {
             'format': self.format_var.get(),
             'dpi': int(self.dpi_var.get()),
             'quality': int(self.quality_var.get()),
+            'preset': self.preset_var.get(),
+            'color_mode': self.color_var.get(),
+            'dither': self.dither_var.get(),
             'page_all': self.page_all_var.get(),
             'page_start': int(self.page_start_var.get()) if self.page_start_var.get().isdigit() else 1,
-            'page_end': int(self.page_end_var.get()) if self.page_end_var.get().isdigit() else 1
+            'page_end': int(self.page_end_var.get()) if self.page_end_var.get().isdigit() else 1,
+            'workers': int(self.workers_var.get()) if self.workers_var.get().isdigit() else default_workers(),
+            'cache': RenderCache() if self.cache_var.get() else None
         }
         
-        # Start conversion in separate thread
-        thread = threading.Thread(target=self.convert_files, args=(settings,))
+        self.control = JobControl()
+        self.events = queue.Queue()
+        self.job_rows = {}
+        self.job_errors = []
+        self.job_warnings = []
+        self.job_started = time.perf_counter()
+        self.file_table.delete(*self.file_table.get_children())
+        self.progress_var.set(0)
+        self.status_var.set("Memulai konversi...")
+        self.set_running(True)
+        
+        # Start conversion in separate thread, it only talks to the UI through self.events
+        thread = threading.Thread(
+            target=self.convert_files,
+            args=(list(self.selected_files), self.output_var.get(), settings, self.control, self.events),
+        )
         thread.daemon = True
         thread.start()
+        self.root.after(UI_POLL_MS, self.poll_events)
     
-    def convert_files(self, settings):
-        total_files = len(self.selected_files)
-        total_converted = 0
-        total_size = 0
-        
-        for i, pdf_path in enumerate(self.selected_files):
+    def set_running(self, running):
+        self.convert_btn.config(state="disabled" if running else "normal")
+        self.pause_btn.config(state="normal" if running else "disabled", text="Jeda")
+        self.cancel_btn.config(state="normal" if running else "disabled")
+    
+    def toggle_pause(self):
+        if self.control.paused:
+            self.control.resume()
+            self.pause_btn.config(text="Jeda")
+        else:
+            self.control.pause()
+            self.pause_btn.config(text="Lanjut")
+            self.status_var.set("Dijeda (halaman yang sudah dirender tetap disimpan)...")
+    
+    def cancel_conversion(self):
+        if self.control:
+            self.control.cancel()
+            self.pause_btn.config(state="disabled")
+            self.cancel_btn.config(state="disabled")
+            self.status_var.set("Membatalkan...")
+    
+    def quit_app(self):
+        if self.control and self.events is not None:
+            # Let the job stop its workers first, poll_events quits when it is done
+            self.quit_requested = True
+            self.cancel_conversion()
+        else:
+            self.root.quit()
+    
+    def convert_files(self, pdf_paths, output_dir, settings, control, events):
+        """
+        Job thread: convert all files at once on one worker pool
+        
+        Never touches Tk, everything the UI shows is sent as events:
+        ('plan', [(name, pages, pixels), ...]), ('page', file_index, pixels),
+        ('file', file_index, error), ('error', name, message),
+        ('warning', name, message) for skipped files and finally
+        ('done' | 'cancelled' | 'error', images, bytes).
+        
+        All files are pre-scanned first: broken and password-protected PDFs
+        are reported before any page is rendered, and the page sizes give
+        every page its pixel cost for scheduling, progress and ETA.
+        """
+        totals = {'images': 0, 'bytes': 0}
+        final = 'done'
+        # Whatever fails (pre-scan pool, planning, conversion), the UI always gets a final event
+        try:
+            events.put(('status', f"Memeriksa {len(pdf_paths)} file..."))
+            jobs = []
+            job_files = []
+            costs = []
+            plan = []
+            for scan in scan_pdfs(pdf_paths, workers=settings['workers']):
+                pdf_path = scan['path']
+                if scan['error']:
+                    events.put(('error', os.path.basename(pdf_path), scan['error']))
+                    continue
+                try:
+                    _, pages = self.plan_pages(pdf_path, output_dir, settings, scan['pages'])
+                except Exception as e:
+                    events.put(('error', os.path.basename(pdf_path), str(e)))
+                    continue
+                if not pages:
+                    events.put(('warning', os.path.basename(pdf_path),
+                                f"tidak ada halaman di range {settings['page_start']}-{settings['page_end']} "
+                                f"(PDF punya {scan['pages']} halaman)"))
+                    continue
+                jobs.append((pdf_path, pages))
+                job_files.append(pdf_path)
+                costs.append(page_pixels(scan, settings['dpi'], [page_index for page_index, _ in pages]))
+                plan.append((os.path.basename(pdf_path), len(pages), sum(costs[-1])))
+            events.put(('plan', plan))
+            
+            positions = [{page_index: position for position, (page_index, _) in enumerate(pages)}
+                         for _, pages in jobs]
+            remaining = [len(pages) for _, pages in jobs]
+            
+            def on_page(job_index, page_index, output_path, nbytes):
+                totals['images'] += 1
+                totals['bytes'] += nbytes
+                remaining[job_index] -= 1
+                events.put(('page', job_index, costs[job_index][positions[job_index][page_index]]))
+                if remaining[job_index] == 0:
+                    events.put(('file', job_index, None))
+            
+            results = convert_page_jobs(jobs, settings, workers=settings['workers'], control=control,
+                                        on_page=on_page, costs=costs)
+            
+            for job_index, result in enumerate(results):
+                if result['error']:
+                    events.put(('file', job_index, result['error']))
+                    events.put(('error', os.path.basename(job_files[job_index]), result['error']))
+        except JobCancelled:
+            final = 'cancelled'
+        except Exception as e:
+            final = 'error'
+            events.put(('error', "-", str(e)))
+        finally:
+            events.put((final, totals['images'], totals['bytes']))
+    
+    def poll_events(self):
+        """
+        Tk loop side of the job: apply everything queued since the last tick
+        
+        Page events are only counted here, rows and labels are redrawn once
+        per tick, so the UI costs the same at ten or ten thousand pages per minute.
+        """
+        finished = None
+        changed = set()
+        now = time.perf_counter()
+        while True:
             try:
-                # Update status
-                self.status_var.set(f"Processing {os.path.basename(pdf_path)}...")
-                
-                def progress_callback(page_progress, message):
-                    file_progress = (i / total_files) * 100
-                    overall_progress = file_progress + (page_progress / total_files)
-                    self.progress_var.set(overall_progress)
-                    self.status_var.set(message)
-                
-                converted_files, output_folder = self.convert_pdf_to_images(
-                    pdf_path, 
-                    self.output_var.get(), 
-                    settings, 
-                    progress_callback
-                )
-                
-                # Calculate size
-                folder_size = sum(os.path.getsize(f) for f in converted_files)
-                total_size += folder_size
-                total_converted += len(converted_files)
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Error processing {os.path.basename(pdf_path)}: {str(e)}")
-        
-        # Conversion complete
-        self.progress_var.set(100)
-        self.status_var.set(f"Selesai! {total_converted} gambar dibuat ({total_size/1024/1024:.1f} MB)")
-        self.convert_btn.config(state="normal")
-        
-        messagebox.showinfo("Selesai", f"Konversi selesai!\n\n"
-                           f"Total gambar: {total_converted}\n"
-                           f"Total ukuran: {total_size/1024/1024:.1f} MB\n"
-                           f"Lokasi: {self.output_var.get()}")
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+            kind = event[0]
+            if kind == 'status':
+                self.status_var.set(event[1])
+            elif kind == 'plan':
+                # ETA is measured from here, the pre-scan is not conversion work
+                self.job_started = now
+                for index, (name, pages, pixels) in enumerate(event[1]):
+                    item = self.file_table.insert("", "end", text=name, values=(f"0/{pages}", "0", "-", "Menunggu"))
+                    self.job_rows[index] = {'item': item, 'total': pages, 'done': 0, 'status': "Menunggu",
+                                            'pixels': pixels, 'pixels_done': 0, 'samples': [(now, 0)]}
+            elif kind == 'page':
+                row = self.job_rows[event[1]]
+                row['done'] += 1
+                row['pixels_done'] += event[2]
+                row['status'] = "Proses"
+                changed.add(event[1])
+            elif kind == 'file':
+                row = self.job_rows[event[1]]
+                row['status'] = "❌ Gagal" if event[2] else "✅ Selesai"
+                changed.add(event[1])
+            elif kind == 'error':
+                self.job_errors.append(f"{event[1]}: {event[2]}")
+            elif kind == 'warning':
+                self.job_warnings.append(f"{event[1]}: {event[2]}")
+            else:
+                finished = event
+        
+        for index in changed:
+            row = self.job_rows[index]
+            # Rate over the last RATE_WINDOW_SECONDS of this file
+            row['samples'].append((now, row['done']))
+            while len(row['samples']) > 2 and now - row['samples'][1][0] > RATE_WINDOW_SECONDS:
+                row['samples'].pop(0)
+            first_time, first_done = row['samples'][0]
+            rate = (row['done'] - first_done) / max(now - first_time, 1e-6)
+            percent = row['pixels_done'] * 100 // max(row['pixels'], 1)
+            self.file_table.item(row['item'], values=(f"{row['done']}/{row['total']}", percent,
+                                                      f"{rate:.1f}" if row['status'] == "Proses" else "-",
+                                                      row['status']))
+        
+        total = sum(row['total'] for row in self.job_rows.values())
+        done = sum(row['done'] for row in self.job_rows.values())
+        if total and changed and not self.control.paused:
+            # Progress and ETA are weighted by pixels, a big page counts more than a small one
+            pixels = sum(row['pixels'] for row in self.job_rows.values())
+            pixels_done = sum(row['pixels_done'] for row in self.job_rows.values())
+            elapsed = now - self.job_started
+            rate = done / max(elapsed, 1e-6)
+            pixel_rate = pixels_done / max(elapsed, 1e-6)
+            eta = (pixels - pixels_done) / pixel_rate if pixel_rate else 0
+            self.progress_var.set(pixels_done * 100 / max(pixels, 1))
+            self.status_var.set(f"{done}/{total} halaman, {rate:.1f} hal/detik, "
+                                f"sisa ±{int(eta // 60)}m {int(eta % 60):02d}s")
+        
+        if finished:
+            self.finish_conversion(*finished)
+        else:
+            self.root.after(UI_POLL_MS, self.poll_events)
+    
+    def finish_conversion(self, kind, total_converted, total_size):
+        self.set_running(False)
+        self.control = None
+        self.events = None
+        if self.quit_requested:
+            self.root.quit()
+            return
+        
+        if kind == 'cancelled':
+            self.status_var.set(f"Dibatalkan. {total_converted} gambar sempat dibuat ({total_size/1024/1024:.1f} MB)")
+        elif kind == 'error':
+            self.status_var.set(f"Gagal! {total_converted} gambar sempat dibuat ({total_size/1024/1024:.1f} MB)")
+        else:
+            # Conversion complete
+            self.progress_var.set(100)
+            self.status_var.set(f"Selesai! {total_converted} gambar dibuat ({total_size/1024/1024:.1f} MB)")
+        
+        if self.job_errors:
+            messagebox.showerror("Error", "Error processing:\n\n" + "\n".join(self.job_errors))
+        if self.job_warnings:
+            messagebox.showwarning("Peringatan", "File dilewati:\n\n" + "\n".join(self.job_warnings))
+        if kind == 'done':
+            messagebox.showinfo("Selesai", f"Konversi selesai!\n\n"
+                               f"Total gambar: {total_converted}\n"
+                               f"Total ukuran: {total_size/1024/1024:.1f} MB\n"
+                               f"Lokasi: {self.output_var.get()}")
     
     def run(self):
         self.root.mainloop()
@@ -1,102 +1,169 @@
 import fitz  # PyMuPDF
 import os
-from tkinter import Tk, filedialog
-from PIL import Image
-import io
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 
-def pdf_to_images_batch(input_path, output_folder, image_format="PNG", dpi=150):
+# Shared helpers live in the "common" package at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.encoding import DEFAULT_PRESET, ENCODING_PRESETS, encode_image
+from common.page_raster import (COLOR_MODES, DEFAULT_THRESHOLD, apply_color_mode, group_pages_by_color,
+                                render_colorspace)
+from common.pipeline import PagePipeline, write_bytes
+from common.profiling import add_profile_arguments, enable_profiling, get_profiler, report as report_profile
+
+def pdf_to_images_batch(input_path, output_folder, image_format="PNG", dpi=150, quality=85,
+                        encode_workers=2, write_workers=2, preset=DEFAULT_PRESET, color_mode="rgb",
+                        threshold=DEFAULT_THRESHOLD, dither=False):
     """
     Simple batch converter for PDF to images
+    
+    color_mode is one of common.page_raster.COLOR_MODES, with "auto" the
+    pages are converted per colour mode.
     """
-    doc = fitz.open(input_path)
     base_filename = os.path.splitext(os.path.basename(input_path))[0]
     
     # Create output folder if it doesn't exist
     os.makedirs(output_folder, exist_ok=True)
     
-    converted_files = []
+    def encoder(page_color_mode):
+        def encode(page_num, pil_image, info):
+            # Encode threads only see PIL images (PyMuPDF is not thread-safe)
+            pil_image = apply_color_mode(pil_image, page_color_mode, threshold, dither)
+            return encode_image(pil_image, image_format, preset, quality)
+        return encode
     
-    for page_num in range(len(doc)):
-        page = doc[page_num]
-        
-        # Calculate matrix for DPI
-        zoom = dpi / 72.0
-        mat = fitz.Matrix(zoom, zoom)
-        
-        # Get page as pixmap
-        pix = page.get_pixmap(matrix=mat)
-        
+    def write(page_num, data, info):
         # Create output filename
-        if len(doc) == 1:
+        if info['page_count'] == 1:
             # Single page PDF
             page_filename = f"{base_filename}.{image_format.lower()}"
         else:
             # Multi-page PDF
             page_filename = f"{base_filename}_page_{page_num + 1:03d}.{image_format.lower()}"
         
-        output_path = os.path.join(output_folder, page_filename)
-        
-        # Save directly using PyMuPDF
-        if image_format.upper() == "PNG":
-            pix.save(output_path)
-        elif image_format.upper() == "JPEG":
-            # For JPEG, convert via PIL for better quality control
-            img_data = pix.tobytes("ppm")
-            pil_image = Image.open(io.BytesIO(img_data))
-            if pil_image.mode != 'RGB':
-                pil_image = pil_image.convert('RGB')
-            pil_image.save(output_path, format="JPEG", quality=85, optimize=True)
-        else:
-            pix.save(output_path)
-        
-        converted_files.append(output_path)
+        return write_bytes(os.path.join(output_folder, page_filename), data)
+    
+    with fitz.open(input_path) as doc:
+        page_count = doc.page_count
+        groups = group_pages_by_color(doc, range(page_count), color_mode)
     
-    doc.close()
-    return converted_files
+    converted = {}
+    for page_color_mode, pages in groups.items():
+        # Render, encode and write overlap instead of running one after another
+        pipeline = PagePipeline(encoder(page_color_mode), write, encode_workers=encode_workers,
+                                write_workers=write_workers)
+        results = pipeline.run(input_path, dpi=dpi, pages=pages if len(pages) < page_count else None,
+                               colorspace=render_colorspace(page_color_mode))
+        converted.update(zip(pages, results))
+    return [converted[page_num] for page_num in sorted(converted)]
 
-# GUI file picker (multi-file)
-root = Tk()
-root.withdraw()
-input_pdfs = filedialog.askopenfilenames(title="Pilih PDF untuk dikonversi ke gambar", filetypes=[("PDF files", "*.pdf")])
+def _convert_one(input_pdf, output_dir, image_format, dpi, quality, preset, color_mode, threshold, dither):
+    """
+    Convert one PDF into its own <name>_images folder, errors are returned instead of raised
+    
+    Profiling events are returned too, so runs in a worker process end up in the parent's profile.
+    """
+    pdf_name = os.path.splitext(os.path.basename(input_pdf))[0]
+    pdf_output_folder = os.path.join(output_dir, f"{pdf_name}_images")
+    try:
+        converted_files = pdf_to_images_batch(input_pdf, pdf_output_folder, image_format=image_format, dpi=dpi, quality=quality,
+                                              preset=preset, color_mode=color_mode, threshold=threshold,
+                                              dither=dither)
+        return input_pdf, pdf_output_folder, converted_files, None, get_profiler().drain()
+    except Exception as e:
+        return input_pdf, pdf_output_folder, [], str(e), get_profiler().drain()
 
-if input_pdfs:
-    # Ask for output directory
-    output_dir = filedialog.askdirectory(title="Pilih folder untuk menyimpan gambar")
+def select_inputs_gui():
+    """
+    Open the file and folder pickers, returns (input_pdfs, output_dir)
+    """
+    from tkinter import Tk, filedialog
     
-    if output_dir:
-        print("🖼️  PDF to Image Converter (Simple)")
-        print("=" * 40)
+    root = Tk()
+    root.withdraw()
+    input_pdfs = filedialog.askopenfilenames(title="Pilih PDF untuk dikonversi ke gambar", filetypes=[("PDF files", "*.pdf")])
+    output_dir = None
+    if input_pdfs:
+        # Ask for output directory
+        output_dir = filedialog.askdirectory(title="Pilih folder untuk menyimpan gambar")
+    root.destroy()
+    return list(input_pdfs), output_dir
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='🖼️  PDF to Image Converter (Simple)',
+        epilog='Tanpa input, file picker (GUI) akan dibuka.'
+    )
+    parser.add_argument('inputs', nargs='*', help='File PDF yang mau dikonversi')
+    parser.add_argument('-o', '--output-dir', help='Folder output (wajib kalau input diberikan)')
+    parser.add_argument('-f', '--format', default='PNG', choices=['PNG', 'JPEG', 'WEBP', 'TIFF'],
+                        type=str.upper, help='Format gambar (default: PNG)')
+    parser.add_argument('--dpi', type=int, default=150, help='Resolusi DPI (default: 150)')
+    parser.add_argument('-q', '--quality', type=int, default=85, help='Kualitas JPEG 1-100 (default: 85)')
+    parser.add_argument('--preset', choices=ENCODING_PRESETS, default=DEFAULT_PRESET,
+                        help=f'Preset encode: fast = cepat, smallest = file paling kecil (default: {DEFAULT_PRESET})')
+    parser.add_argument('--color', choices=COLOR_MODES, default='rgb', dest='color_mode',
+                        help='Mode warna: gray, bilevel (hitam putih 1-bit) atau auto (default: rgb)')
+    parser.add_argument('--threshold', type=int, default=DEFAULT_THRESHOLD,
+                        help=f'Bilevel: nilai abu-abu 0-255 yang jadi putih (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--dither', action='store_true', help='Bilevel: pakai dithering, bukan threshold')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Jumlah proses untuk konversi banyak file sekaligus (default: 1)')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    
+    if args.inputs:
+        if not args.output_dir:
+            parser.error("--output-dir wajib diisi kalau input diberikan lewat command line")
+        input_pdfs, output_dir = args.inputs, args.output_dir
+    else:
+        input_pdfs, output_dir = select_inputs_gui()
+        if not input_pdfs:
+            print("Lu gak milih file apapun, ngapain nanya wkwk.")
+            return
+        if not output_dir:
+            print("❌ Folder output tidak dipilih!")
+            return
+    
+    print("🖼️  PDF to Image Converter (Simple)")
+    print("=" * 40)
+    profile = args.profile or bool(args.profile_trace)
+    profiler = enable_profiling(profile)
+    
+    total_converted = 0
+    jobs = [(input_pdf, output_dir, args.format, args.dpi, args.quality, args.preset, args.color_mode,
+             args.threshold, args.dither) for input_pdf in input_pdfs]
+    
+    if args.workers > 1 and len(jobs) > 1:
+        executor = ProcessPoolExecutor(max_workers=args.workers, initializer=enable_profiling, initargs=(profile,))
+        results = executor.map(_convert_one, *zip(*jobs))
+    else:
+        executor = None
+        results = (_convert_one(*job) for job in jobs)
+    
+    for input_pdf, pdf_output_folder, converted_files, error, events in results:
+        profiler.merge(events)
+        print(f"Proses: {os.path.basename(input_pdf)}")
         
-        total_converted = 0
+        if error:
+            print(f"❌ Error pada {os.path.basename(input_pdf)}: {error}")
+            continue
         
-        for input_pdf in input_pdfs:
-            pdf_name = os.path.splitext(os.path.basename(input_pdf))[0]
-            pdf_output_folder = os.path.join(output_dir, f"{pdf_name}_images")
-            
-            print(f"Proses: {os.path.basename(input_pdf)}")
-            
-            try:
-                converted_files = pdf_to_images_batch(
-                    input_pdf, 
-                    pdf_output_folder, 
-                    image_format="PNG",  # Change to "JPEG" if you prefer
-                    dpi=150  # Change DPI as needed
-                )
-                
-                total_converted += len(converted_files)
-                
-                # Calculate folder size
-                folder_size = sum(os.path.getsize(f) for f in converted_files)
-                
-                print(f"✅ Berhasil: {len(converted_files)} halaman ➡ {pdf_output_folder}")
-                print(f"   📊 Ukuran: {folder_size/1024/1024:.1f} MB")
-                
-            except Exception as e:
-                print(f"❌ Error pada {os.path.basename(input_pdf)}: {e}")
+        total_converted += len(converted_files)
         
-        print(f"\n🎉 Total {total_converted} gambar berhasil dibuat!")
-        print(f"📂 Lokasi: {output_dir}")
-    else:
-        print("❌ Folder output tidak dipilih!")
-else:
-    print("Lu gak milih file apapun, ngapain nanya wkwk.")
+        # Calculate folder size
+        folder_size = sum(os.path.getsize(f) for f in converted_files)
+        
+        print(f"✅ Berhasil: {len(converted_files)} halaman ➡ {pdf_output_folder}")
+        print(f"   📊 Ukuran: {folder_size/1024/1024:.1f} MB")
+    
+    if executor:
+        executor.shutdown()
+    
+    print(f"\n🎉 Total {total_converted} gambar berhasil dibuat!")
+    print(f"📂 Lokasi: {output_dir}")
+    report_profile(args)
+
+if __name__ == "__main__":
+    main()
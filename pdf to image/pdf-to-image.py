@@ -1,66 +1,128 @@
 import fitz  # PyMuPDF
 import os
-from tkinter import Tk, filedialog, messagebox, simpledialog
-from PIL import Image
-import io
+import sys
+import argparse
+import time
 
-def convert_pdf_to_images(input_path, output_folder, image_format="PNG", dpi=150, quality=95):
+# Shared helpers live in the "common" package at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.encoding import DEFAULT_PRESET, ENCODING_PRESETS, encode_image
+from common.page_raster import (COLOR_MODES, DEFAULT_THRESHOLD, apply_color_mode, group_pages_by_color,
+                                render_colorspace)
+from common.pipeline import PagePipeline, write_bytes
+from common.prescan import describe, page_pixels, scan_pdfs
+from common.profiling import add_profile_arguments, enable_profiling, report as report_profile
+from common.render_cache import RenderCache, DEFAULT_MAX_MB
+from common.tiled_render import DEFAULT_PAGE_BUDGET_MB, render_page_tiled, split_huge_pages
+
+def convert_pdf_to_images(input_path, output_folder, image_format="PNG", dpi=150, quality=95, workers=1, cache=None,
+                          encode_workers=2, write_workers=2, show_timings=False, preset=DEFAULT_PRESET, on_page=None,
+                          max_page_mb=DEFAULT_PAGE_BUDGET_MB, color_mode="rgb", threshold=DEFAULT_THRESHOLD,
+                          dither=False):
     """
     Convert PDF pages to images
     
+    Pages go through a render -> encode -> write pipeline (common.pipeline),
+    so rendering, PIL encoding and disk writes overlap. Use
+    common.page_stream.iter_page_rasters directly to process pages without
+    touching disk.
+    
+    Gray and bilevel pages are rendered by MuPDF in gray (one channel instead
+    of three), bilevel pages are thresholded to 1-bit in the encode stage.
+    With color_mode="auto" every page is checked on a thumbnail first and the
+    pages are run through the pipeline per colour mode.
+    
+    Pages whose full-resolution pixmap would exceed max_page_mb (large
+    formats at high DPI) skip the pipeline and are rendered in bands one at
+    a time by common.tiled_render, so memory stays bounded.
+    
     Args:
         input_path: Path to input PDF file
         output_folder: Folder to save converted images
         image_format: Output format (PNG, JPEG, WEBP, etc.)
         dpi: Resolution for conversion (higher = better quality, larger file)
         quality: JPEG quality (1-100, only for JPEG format)
+        workers: Number of background render processes (1 = render in this process)
+        cache: Optional RenderCache, rendered pages are reused across runs
+        encode_workers: Encode threads
+        write_workers: Write threads
+        show_timings: Print per-stage timings when done
+        preset: Encoding preset, see common.encoding (fast, balanced, smallest)
+        on_page: Optional callable(page_num, output_path) after each written page, in
+            page order within each colour group (color_mode="auto") and huge pages last
+        max_page_mb: Memory budget per page in MB, bigger pages are rendered in bands
+        color_mode: "rgb", "gray", "bilevel" or "auto" (gray for pages without colour)
+        threshold: Bilevel, gray value (0-255) from which a pixel becomes white
+        dither: Bilevel, Floyd-Steinberg dithering instead of the threshold
     """
-    doc = fitz.open(input_path)
     base_filename = os.path.splitext(os.path.basename(input_path))[0]
     
-    converted_files = []
+    def encoder(page_color_mode):
+        def encode(page_num, pil_image, info):
+            pil_image = apply_color_mode(pil_image, page_color_mode, threshold, dither)
+            return encode_image(pil_image, image_format, preset, quality)
+        return encode
     
-    for page_num in range(len(doc)):
-        page = doc[page_num]
-        
-        # Calculate matrix for DPI
-        zoom = dpi / 72.0  # 72 is default DPI
-        mat = fitz.Matrix(zoom, zoom)
-        
-        # Get page as pixmap (image)
-        pix = page.get_pixmap(matrix=mat)
-        
-        # Convert to PIL Image
-        img_data = pix.tobytes("ppm")
-        pil_image = Image.open(io.BytesIO(img_data))
-        
+    def output_path_for(page_num):
         # Create output filename
         page_filename = f"{base_filename}_page_{page_num + 1:03d}.{image_format.lower()}"
-        output_path = os.path.join(output_folder, page_filename)
-        
-        # Save image with appropriate settings
-        if image_format.upper() == "JPEG":
-            # Convert to RGB for JPEG
-            if pil_image.mode != 'RGB':
-                pil_image = pil_image.convert('RGB')
-            pil_image.save(output_path, format=image_format, quality=quality, optimize=True)
-        elif image_format.upper() == "PNG":
-            pil_image.save(output_path, format=image_format, optimize=True)
-        elif image_format.upper() == "WEBP":
-            pil_image.save(output_path, format=image_format, quality=quality, optimize=True)
-        else:
-            pil_image.save(output_path, format=image_format)
+        return os.path.join(output_folder, page_filename)
+    
+    def write(page_num, data, info):
+        return write_bytes(output_path_for(page_num), data)
+    
+    def report(page_num, output_path, info):
+        print(f"   📄 Halaman {page_num + 1} ➡ {os.path.basename(output_path)}")
+        if on_page:
+            on_page(page_num, output_path)
+    
+    with fitz.open(input_path) as doc:
+        page_count = doc.page_count
+        groups = {}
+        huge_pages = {}
+        for page_color_mode, pages in group_pages_by_color(doc, range(page_count), color_mode).items():
+            normal_pages, huge = split_huge_pages(doc, pages, dpi, render_colorspace(page_color_mode), max_page_mb)
+            groups[page_color_mode] = normal_pages
+            huge_pages.update((page_num, page_color_mode) for page_num in huge)
+    
+    if color_mode == "auto":
+        counts = ", ".join(f"{name} {len(pages)}" for name, pages in groups.items() if pages)
+        if counts:
+            # Each colour group is its own pipeline run, pages are reported group by group
+            print(f"   🎨 Mode warna: {counts} halaman (diproses per mode warna, urutan halaman bisa lompat)")
+    
+    converted = {}
+    for page_color_mode, pages in groups.items():
+        if not pages:
+            continue
+        pipeline = PagePipeline(encoder(page_color_mode), write, render_workers=workers if workers > 1 else 0,
+                                encode_workers=encode_workers, write_workers=write_workers)
+        # A group with every page walks the whole document as usual
+        results = pipeline.run(input_path, dpi=dpi, pages=pages if len(pages) < page_count else None,
+                               colorspace=render_colorspace(page_color_mode), cache=cache, on_page=report)
+        converted.update(zip(pages, results))
         
-        converted_files.append(output_path)
-        print(f"   📄 Halaman {page_num + 1} ➡ {page_filename}")
+        if show_timings:
+            for line in pipeline.summary():
+                print(f"   {line}")
+    
+    if huge_pages:
+        print(f"   🧩 {len(huge_pages)} halaman besar dirender per bagian (batas {max_page_mb} MB)")
+        with fitz.open(input_path) as doc:
+            for page_num, page_color_mode in sorted(huge_pages.items()):
+                output_path = render_page_tiled(doc[page_num], dpi, output_path_for(page_num), image_format,
+                                                preset, quality, page_color_mode, max_page_mb, threshold, dither)
+                converted[page_num] = output_path
+                report(page_num, output_path, None)
     
-    doc.close()
-    return converted_files
+    return [converted[page_num] for page_num in sorted(converted)]
 
 def get_user_preferences():
     """
     Get user preferences for conversion settings
     """
+    from tkinter import Tk, messagebox, simpledialog
+    
     root = Tk()
     root.withdraw()
     
@@ -115,17 +177,11 @@ def get_user_preferences():
     root.destroy()
     return image_format, quality, dpi
 
-def main():
-    print("🖼️  PDF to Image Converter")
-    print("=" * 40)
-    
-    # Get user preferences
-    try:
-        image_format, quality, dpi = get_user_preferences()
-        print(f"⚙️  Pengaturan: Format={image_format}, Quality={quality}, DPI={dpi}")
-    except:
-        print("❌ Proses dibatalkan oleh user")
-        return
+def select_inputs_gui():
+    """
+    Open the file and folder pickers, returns (input_pdfs, output_folder)
+    """
+    from tkinter import Tk, filedialog
     
     # GUI file picker (multi-file)
     root = Tk()
@@ -135,20 +191,112 @@ def main():
         filetypes=[("PDF files", "*.pdf")]
     )
     
-    if not input_pdfs:
-        print("Lu gak milih file apapun, ngapain nanya wkwk.")
-        return
+    output_base_folder = None
+    if input_pdfs:
+        # Ask for output folder
+        output_base_folder = filedialog.askdirectory(title="Pilih folder untuk menyimpan gambar")
+    root.destroy()
+    return list(input_pdfs), output_base_folder
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='🖼️  PDF to Image Converter',
+        epilog='Tanpa input, pengaturan dan file dipilih lewat dialog (GUI).'
+    )
+    parser.add_argument('inputs', nargs='*', help='File PDF yang mau dikonversi')
+    parser.add_argument('-o', '--output-dir', help='Folder output (wajib kalau input diberikan)')
+    parser.add_argument('-f', '--format', default='PNG', choices=['PNG', 'JPEG', 'WEBP', 'TIFF'],
+                        type=str.upper, help='Format gambar (default: PNG)')
+    parser.add_argument('--dpi', type=int, default=150, help='Resolusi DPI (default: 150)')
+    parser.add_argument('-q', '--quality', type=int, default=85,
+                        help='Kualitas JPEG/WEBP 1-100 (default: 85)')
+    parser.add_argument('--preset', choices=ENCODING_PRESETS, default=DEFAULT_PRESET,
+                        help=f'Preset encode: fast = cepat, smallest = file paling kecil (default: {DEFAULT_PRESET})')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Jumlah proses untuk render halaman (default: 1)')
+    parser.add_argument('--encode-workers', type=int, default=2,
+                        help='Jumlah thread untuk encode gambar (default: 2)')
+    parser.add_argument('--write-workers', type=int, default=2,
+                        help='Jumlah thread untuk tulis file ke disk (default: 2)')
+    parser.add_argument('--stage-timings', action='store_true',
+                        help='Tampilkan waktu tiap tahap render/encode/write')
+    add_profile_arguments(parser)
+    parser.add_argument('--color', choices=COLOR_MODES, default='rgb', dest='color_mode',
+                        help='Mode warna: gray = abu-abu, bilevel = hitam putih 1-bit, '
+                             'auto = abu-abu untuk halaman tanpa warna (default: rgb)')
+    parser.add_argument('--threshold', type=int, default=DEFAULT_THRESHOLD,
+                        help=f'Bilevel: nilai abu-abu 0-255 yang jadi putih (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--dither', action='store_true',
+                        help='Bilevel: pakai dithering Floyd-Steinberg, bukan threshold (cocok untuk foto)')
+    parser.add_argument('--max-page-mb', type=float, default=DEFAULT_PAGE_BUDGET_MB,
+                        help=f'Batas memori per halaman; halaman yang lebih besar (mis. A0 di DPI tinggi) '
+                             f'dirender per bagian (default: {DEFAULT_PAGE_BUDGET_MB} MB)')
+    parser.add_argument('--cache', action='store_true',
+                        help='Simpan hasil render di cache, konversi ulang cukup encode saja')
+    parser.add_argument('--cache-dir', help='Folder render cache (otomatis mengaktifkan --cache)')
+    parser.add_argument('--cache-size-mb', type=float, default=DEFAULT_MAX_MB,
+                        help=f'Batas ukuran render cache (default: {DEFAULT_MAX_MB} MB)')
+    args = parser.parse_args()
     
-    # Ask for output folder
-    output_base_folder = filedialog.askdirectory(title="Pilih folder untuk menyimpan gambar")
-    if not output_base_folder:
-        print("❌ Folder output tidak dipilih!")
+    if args.inputs and not args.output_dir:
+        parser.error("--output-dir wajib diisi kalau input diberikan lewat command line")
+    
+    print("🖼️  PDF to Image Converter")
+    print("=" * 40)
+    enable_profiling(args.profile or bool(args.profile_trace))
+    
+    cache = None
+    if args.cache or args.cache_dir:
+        cache = RenderCache(args.cache_dir, args.cache_size_mb)
+        print(f"🗃️  Render cache: {cache.cache_dir}")
+    
+    if args.inputs:
+        image_format, quality, dpi = args.format, args.quality, args.dpi
+        input_pdfs, output_base_folder = args.inputs, args.output_dir
+        print(f"⚙️  Pengaturan: Format={image_format}, Quality={quality}, DPI={dpi}, Preset={args.preset}, Warna={args.color_mode}")
+    else:
+        # Get user preferences
+        try:
+            image_format, quality, dpi = get_user_preferences()
+            print(f"⚙️  Pengaturan: Format={image_format}, Quality={quality}, DPI={dpi}")
+        except:
+            print("❌ Proses dibatalkan oleh user")
+            return
+        
+        input_pdfs, output_base_folder = select_inputs_gui()
+        if not input_pdfs:
+            print("Lu gak milih file apapun, ngapain nanya wkwk.")
+            return
+        if not output_base_folder:
+            print("❌ Folder output tidak dipilih!")
+            return
+    
+    # Pre-scan: page counts for the plan and ETA, broken/encrypted files are dropped before rendering
+    scans = scan_pdfs(input_pdfs, workers=max(args.workers, 1))
+    print(f"\n🔍 Pre-scan {len(scans)} file:")
+    for scan in scans:
+        print(f"   {describe(scan)}")
+    scans = [scan for scan in scans if not scan['error']]
+    if not scans:
+        print("❌ Tidak ada PDF yang bisa dikonversi")
         return
+    pixels = {scan['path']: page_pixels(scan, dpi) for scan in scans}
+    total_pixels = sum(sum(page_costs) for page_costs in pixels.values())
+    print(f"📋 Rencana: {sum(scan['pages'] for scan in scans)} halaman, {total_pixels / 1e6:.0f} megapixel")
     
     total_converted = 0
     total_size = 0
+    # Progress is weighted by pixels, the pixel rate so far gives the ETA
+    progress = {'done': 0, 'total': total_pixels, 'start': time.perf_counter()}
     
-    for input_pdf in input_pdfs:
+    def report_eta():
+        elapsed = time.perf_counter() - progress['start']
+        eta = (progress['total'] - progress['done']) * elapsed / max(progress['done'], 1)
+        print(f"   ⏳ {progress['done'] * 100 / max(progress['total'], 1):.0f}% selesai, "
+              f"sisa ±{int(eta // 60)}m {int(eta % 60):02d}s")
+    
+    for scan in scans:
+        input_pdf = scan['path']
         pdf_name = os.path.splitext(os.path.basename(input_pdf))[0]
         
         # Create subfolder for each PDF
@@ -157,6 +305,12 @@ def main():
         
         print(f"\n📁 Proses: {os.path.basename(input_pdf)}")
         print(f"   💾 Output: {pdf_output_folder}")
+        file_done = 0
+        
+        def count_page(page_num, output_path):
+            nonlocal file_done
+            file_done += pixels[input_pdf][page_num]
+            progress['done'] += pixels[input_pdf][page_num]
         
         try:
             converted_files = convert_pdf_to_images(
@@ -164,7 +318,18 @@ def main():
                 pdf_output_folder, 
                 image_format=image_format,
                 dpi=dpi,
-                quality=quality
+                quality=quality,
+                workers=args.workers,
+                cache=cache,
+                encode_workers=args.encode_workers,
+                write_workers=args.write_workers,
+                show_timings=args.stage_timings,
+                preset=args.preset,
+                on_page=count_page,
+                max_page_mb=args.max_page_mb,
+                color_mode=args.color_mode,
+                threshold=args.threshold,
+                dither=args.dither,
             )
             
             # Calculate total size of converted images
@@ -177,11 +342,15 @@ def main():
             
         except Exception as e:
             print(f"   ❌ Error pada {os.path.basename(input_pdf)}: {e}")
+            # Pages this file will not convert no longer count towards the ETA
+            progress['total'] -= sum(pixels[input_pdf]) - file_done
+        report_eta()
     
     print(f"\n🎉 Konversi selesai!")
     print(f"📈 Total: {total_converted} gambar dibuat")
     print(f"💾 Total ukuran: {total_size/1024/1024:.1f} MB")
     print(f"📂 Lokasi: {output_base_folder}")
+    report_profile(args)
 
 if __name__ == "__main__":
     main()
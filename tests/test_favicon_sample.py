@@ -0,0 +1,40 @@
+"""
+Sample image: the mirrored-row fallback and the NumPy path match the per-pixel formula.
+"""
+
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("PIL")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks._util import load_tool
+
+favicon = load_tool(os.path.join("favicon generator", "favicon-generator.py"), "favicon_generator")
+
+SIZES = [1, 2, 3, 16, 17, 255, 512]
+
+
+def _per_pixel(size, center, max_radius):
+    sample = favicon.FaviconGenerator._sample_pixel
+    return b"".join(
+        sample((x - center) ** 2 + (y - center) ** 2, max_radius) for y in range(size) for x in range(size)
+    )
+
+
+def _arguments(size):
+    return size, size // 2, 200 * size / 512
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_python_fallback_matches_formula(size):
+    assert favicon.FaviconGenerator()._sample_pixels_python(*_arguments(size)) == _per_pixel(*_arguments(size))
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_numpy_matches_formula(size):
+    if favicon.np is None:
+        pytest.skip("NumPy tidak terinstall")
+    assert favicon.FaviconGenerator()._sample_pixels_numpy(*_arguments(size)) == _per_pixel(*_arguments(size))
@@ -0,0 +1,62 @@
+"""
+GUI job thread: skipped files are reported and a failing job does not end as done.
+
+convert_files never touches Tk, so it runs here without a window.
+"""
+
+import os
+import queue
+import sys
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+pytest.importorskip("PIL")
+pytest.importorskip("tkinter")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks._util import load_tool
+from common.pipeline import JobControl
+
+gui = load_tool(os.path.join("pdf to image", "pdf-to-image-gui.py"), "pdf_to_image_gui")
+
+
+def _make_pdf(path, pages):
+    with fitz.open() as doc:
+        for page_num in range(pages):
+            doc.new_page(width=100, height=100).insert_text((10, 50), f"Halaman {page_num + 1}")
+        doc.save(path)
+    return path
+
+
+def _run(tmp_path, pdf_paths, page_start, page_end):
+    settings = {'format': "PNG", 'dpi': 36, 'quality': 80, 'preset': "fast", 'color_mode': "rgb", 'dither': False,
+                'page_all': False, 'page_start': page_start, 'page_end': page_end, 'workers': 1, 'cache': None}
+    events = queue.Queue()
+    # __init__ builds the Tk window, the job thread does not need it
+    converter = object.__new__(gui.PDFToImageConverter)
+    converter.convert_files(pdf_paths, str(tmp_path / "output"), settings, JobControl(), events)
+    return [events.get_nowait() for _ in range(events.qsize())]
+
+
+def test_file_without_pages_in_range_is_reported(tmp_path):
+    long_pdf = _make_pdf(str(tmp_path / "panjang.pdf"), 5)
+    short_pdf = _make_pdf(str(tmp_path / "pendek.pdf"), 1)
+
+    events = _run(tmp_path, [long_pdf, short_pdf], 3, 4)
+
+    assert [event[1] for event in events if event[0] == 'warning'] == ["pendek.pdf"]
+    assert [name for name, _, _ in next(event[1] for event in events if event[0] == 'plan')] == ["panjang.pdf"]
+    assert events[-1][:2] == ('done', 2)
+    assert os.listdir(tmp_path / "output") == ["panjang_images"]
+
+
+def test_unexpected_failure_ends_as_error(tmp_path, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("pool rusak")
+    monkeypatch.setattr(gui, "convert_page_jobs", broken)
+
+    events = _run(tmp_path, [_make_pdf(str(tmp_path / "dokumen.pdf"), 2)], 1, 2)
+
+    assert ('error', "-", "pool rusak") in events
+    assert events[-1] == ('error', 0, 0)
@@ -0,0 +1,54 @@
+"""
+Image engine: a shared image is downsampled for its widest placement, whatever page comes first.
+"""
+
+import io
+import os
+import random
+import sys
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+Image = pytest.importorskip("PIL.Image")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks._util import load_tool
+
+kompres = load_tool(os.path.join("pdf compression", "kompres-pdf-gambar.py"), "kompres_pdf_gambar")
+
+PIXELS = 300
+MAX_DPI = 150
+
+
+def _noise_png():
+    rng = random.Random(0)
+    image = Image.frombytes("RGB", (PIXELS, PIXELS), bytes(rng.getrandbits(8) for _ in range(PIXELS * PIXELS * 3)))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _image_widths(path):
+    with fitz.open(path) as doc:
+        return {xref: doc.extract_image(xref)["width"] for page in doc for xref, *_ in page.get_images(full=True)}
+
+
+@pytest.mark.parametrize("placements", [(30, 300), (300, 30), (30, 30)])
+def test_shared_image_uses_widest_placement(tmp_path, placements):
+    input_path = str(tmp_path / "input.pdf")
+    output_path = str(tmp_path / "output.pdf")
+    png = _noise_png()
+    with fitz.open() as doc:
+        xref = 0
+        for size in placements:
+            page = doc.new_page()
+            xref = page.insert_image(fitz.Rect(50, 50, 50 + size, 50 + size), stream=png, xref=xref)
+        doc.save(input_path)
+
+    kompres.compress_pdf(input_path, output_path, engine="images", max_dpi=MAX_DPI, min_image_kb=0)
+
+    widths = _image_widths(output_path)
+    assert len(widths) == 1
+    dpi = PIXELS / (max(placements) / 72.0)
+    assert list(widths.values()) == [PIXELS if dpi <= MAX_DPI else round(PIXELS * MAX_DPI / dpi)]
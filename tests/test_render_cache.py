@@ -0,0 +1,66 @@
+"""
+Render cache: a re-run over more raw page data than the cap still hits.
+"""
+
+import os
+import sys
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+pytest.importorskip("PIL")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.page_raster import render_page
+from common.render_cache import RenderCache
+
+PAGES = 20
+DPI = 72
+CAP_MB = 8
+
+
+def _make_pdf(path):
+    with fitz.open() as doc:
+        for page_num in range(PAGES):
+            page = doc.new_page()
+            for line in range(40):
+                page.insert_text((50, 60 + line * 18), f"Halaman {page_num + 1}, baris {line + 1}: isi dokumen")
+        doc.save(path)
+
+
+def _run(path, cache):
+    with fitz.open(path) as doc:
+        file_hash = cache.file_hash(path)
+        return [render_page(doc[page_num], DPI, cache=cache, file_hash=file_hash) for page_num in range(PAGES)]
+
+
+def test_second_run_over_cap_hits(tmp_path):
+    pdf_path = str(tmp_path / "dokumen.pdf")
+    _make_pdf(pdf_path)
+    cache = RenderCache(str(tmp_path / "cache"), max_mb=CAP_MB)
+
+    first = _run(pdf_path, cache)
+    raw_bytes = sum(len(pix.samples) for pix in first)
+    assert raw_bytes > CAP_MB * 1024 * 1024  # would not fit stored raw
+
+    cache.hits = cache.misses = 0
+    second = _run(pdf_path, cache)
+    assert cache.hits == PAGES
+    assert [pix.samples for pix in second] == [pix.samples for pix in first]
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    pdf_path = str(tmp_path / "dokumen.pdf")
+    _make_pdf(pdf_path)
+    cache = RenderCache(str(tmp_path / "cache"))
+    _run(pdf_path, cache)
+
+    entry = next(path for path, _, _ in cache._entries())
+    with open(entry, "r+b") as f:
+        f.seek(-16, os.SEEK_END)
+        f.write(b"\0" * 16)
+
+    cache.hits = cache.misses = 0
+    _run(pdf_path, cache)
+    assert cache.misses == 1
+    assert cache.hits == PAGES - 1
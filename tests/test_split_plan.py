@@ -0,0 +1,85 @@
+"""
+Split planning: page ranges, max-size chunks and worker shards at their boundaries.
+"""
+
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("pypdf")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks._util import load_tool
+
+pecah = load_tool(os.path.join("fragmentation pdf", "pecah-pdf.py"), "pecah_pdf")
+
+PAGE_BYTES = 100
+
+
+class _FakeChunk:
+    """Stands in for a fitz document whose saved size grows by PAGE_BYTES per page"""
+
+    def __init__(self, pages):
+        self.pages = pages
+
+    def tobytes(self, **kwargs):
+        return b"x" * (self.pages * PAGE_BYTES)
+
+    def close(self):
+        pass
+
+
+class _FakeSource:
+    def __init__(self, pages):
+        self.pages = pages
+
+    def __len__(self):
+        return self.pages
+
+
+def _plan_sizes(monkeypatch, pages, max_bytes):
+    monkeypatch.setattr(pecah, "_build_chunk_fitz", lambda src, start, end, *args: _FakeChunk(end - start + 1))
+    return [(start, end) for _, start, end in pecah._plan_max_size(_FakeSource(pages), max_bytes, False, False)]
+
+
+def test_parse_ranges():
+    assert pecah.parse_ranges("1-3,5,8-", 10) == [(0, 2), (4, 4), (7, 9)]
+    assert pecah.parse_ranges("-2", 10) == [(0, 1)]
+    assert pecah.parse_ranges("1,,10", 10) == [(0, 0), (9, 9)]
+
+
+@pytest.mark.parametrize("spec", ["0", "11", "3-2", "9-11"])
+def test_parse_ranges_rejects_out_of_bounds(spec):
+    with pytest.raises(ValueError):
+        pecah.parse_ranges(spec, 10)
+
+
+def test_plan_split_every():
+    plan = pecah.plan_split(10, every=4)
+    assert [(start, end) for _, start, end in plan] == [(0, 3), (4, 7), (8, 9)]
+    assert [(start, end) for _, start, end in pecah.plan_split(1, every=4)] == [(0, 0)]
+    with pytest.raises(ValueError):
+        pecah.plan_split(10, every=0)
+
+
+def test_plan_max_size(monkeypatch):
+    assert _plan_sizes(monkeypatch, 10, 350) == [(0, 2), (3, 5), (6, 8), (9, 9)]
+
+
+def test_plan_max_size_exact_fit(monkeypatch):
+    assert _plan_sizes(monkeypatch, 9, 300) == [(0, 2), (3, 5), (6, 8)]
+    assert _plan_sizes(monkeypatch, 10, 1000) == [(0, 9)]
+
+
+def test_plan_max_size_oversized_page(monkeypatch):
+    assert _plan_sizes(monkeypatch, 3, 50) == [(0, 0), (1, 1), (2, 2)]
+
+
+@pytest.mark.parametrize("entries,workers", [(1, 4), (5, 2), (10, 3), (10, 10), (7, 16)])
+def test_shard_plan(entries, workers):
+    plan = pecah.plan_split(entries, every=1)
+    shards = pecah._shard_plan(plan, workers)
+    assert 1 <= len(shards) <= workers
+    assert all(shards)
+    assert [entry for shard in shards for entry in shard] == plan
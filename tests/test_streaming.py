@@ -0,0 +1,35 @@
+"""
+Streaming mode: the merged output has every page and its text layer, whatever the preset.
+"""
+
+import os
+import sys
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+pytest.importorskip("PIL")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks._util import load_tool
+
+kompres = load_tool(os.path.join("pdf compression", "kompres-pdf-gambar.py"), "kompres_pdf_gambar")
+
+PAGES = 7
+
+
+@pytest.mark.parametrize("preset", ["fast", "balanced", "smallest"])
+def test_streamed_parts_are_merged(tmp_path, preset):
+    input_path = str(tmp_path / "input.pdf")
+    output_path = str(tmp_path / "output.pdf")
+    with fitz.open() as doc:
+        for page_num in range(PAGES):
+            doc.new_page().insert_text((72, 72), f"Halaman {page_num + 1}", fontsize=14)
+        doc.save(input_path)
+
+    kompres.compress_pdf(input_path, output_path, chunk_pages=3, preset=preset)
+
+    with fitz.open(output_path) as doc:
+        assert [page.get_text().strip() for page in doc] == [f"Halaman {n + 1}" for n in range(PAGES)]
+    # The temporary parts folder is gone
+    assert sorted(os.listdir(tmp_path)) == ["input.pdf", "output.pdf"]
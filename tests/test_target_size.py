@@ -0,0 +1,29 @@
+"""
+Target size search: inputs it cannot estimate are rejected up front.
+"""
+
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("fitz")
+pytest.importorskip("PIL")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks._util import load_tool
+
+kompres = load_tool(os.path.join("pdf compression", "kompres-pdf-gambar.py"), "kompres_pdf_gambar")
+
+# MuPDF refuses to save a document without pages, so it is written by hand
+EMPTY_PDF = (b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n"
+             b"2 0 obj<</Type/Pages/Kids[]/Count 0>>endobj\ntrailer<</Root 1 0 R>>\n%%EOF\n")
+
+
+def test_empty_pdf_is_rejected(tmp_path):
+    input_path = tmp_path / "kosong.pdf"
+    input_path.write_bytes(EMPTY_PDF)
+
+    with pytest.raises(ValueError, match="tidak punya halaman"):
+        kompres.compress_pdf(str(input_path), str(tmp_path / "output.pdf"), target_size_mb=1)
+    assert os.listdir(tmp_path) == ["kosong.pdf"]
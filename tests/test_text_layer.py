@@ -0,0 +1,47 @@
+"""
+The invisible text layer of the raster engine must keep spans where they were.
+"""
+
+import os
+import sys
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+pytest.importorskip("PIL")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks._util import load_tool
+
+kompres = load_tool(os.path.join("pdf compression", "kompres-pdf-gambar.py"), "kompres_pdf_gambar")
+
+TOLERANCE = 2.0  # points
+
+
+def _span_boxes(path):
+    """{text: bbox} of every span on the first page"""
+    with fitz.open(path) as doc:
+        blocks = doc[0].get_text("dict", flags=fitz.TEXTFLAGS_TEXT)["blocks"]
+    return {
+        span["text"]: fitz.Rect(span["bbox"])
+        for block in blocks for line in block.get("lines", ()) for span in line["spans"] if span["text"].strip()
+    }
+
+
+@pytest.mark.parametrize("rotate", [0, 90, 180, 270])
+def test_rotated_spans_keep_their_bbox(tmp_path, rotate):
+    input_path = str(tmp_path / "input.pdf")
+    output_path = str(tmp_path / "output.pdf")
+    with fitz.open() as doc:
+        page = doc.new_page()
+        page.insert_text((300, 400), f"Teks diputar {rotate} derajat", fontsize=14, rotate=rotate)
+        page.insert_text((72, 72), "Teks mendatar", fontsize=14)
+        doc.save(input_path)
+
+    kompres.compress_pdf(input_path, output_path, engine="raster", text_layer="invisible")
+
+    before, after = _span_boxes(input_path), _span_boxes(output_path)
+    assert before.keys() == after.keys()
+    for text, bbox in before.items():
+        moved = max(abs(a - b) for a, b in zip(bbox, after[text]))
+        assert moved <= TOLERANCE, f"{text!r}: {bbox} -> {after[text]}"
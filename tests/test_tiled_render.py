@@ -0,0 +1,89 @@
+"""
+Streamed PNG/TIFF writers: files written band by band decode to the same pixels as one band.
+"""
+
+import os
+import random
+import sys
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+Image = pytest.importorskip("PIL.Image")
+ImageChops = pytest.importorskip("PIL.ImageChops")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.tiled_render import PngStripWriter, TiffStripWriter, render_page_tiled
+
+WIDTH, HEIGHT = 37, 50  # odd width: 1-bit rows end in a partial byte
+MODES = ("RGB", "L", "1")
+# MuPDF anti-aliases edges that cross a clip border a few levels differently
+BAND_EDGE_TOLERANCE = 8
+
+
+def _noise_image(mode):
+    rng = random.Random(mode)
+    image = Image.new(mode, (WIDTH, HEIGHT))
+    row_bytes = {"RGB": WIDTH * 3, "L": WIDTH, "1": (WIDTH + 7) // 8}[mode]
+    image.frombytes(bytes(rng.getrandbits(8) for _ in range(row_bytes * HEIGHT)))
+    return image
+
+
+def _write(writer, image, rows):
+    for top in range(0, image.height, rows):
+        writer.write_band(image.crop((0, top, image.width, min(top + rows, image.height))))
+    writer.close()
+
+
+def _pixels(path, mode):
+    with Image.open(path) as image:
+        assert image.size == (WIDTH, HEIGHT)
+        return image.convert(mode).tobytes()
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("rows", [HEIGHT, 16, 7])
+def test_png_strip_writer(tmp_path, mode, rows):
+    image = _noise_image(mode)
+    path = str(tmp_path / "band.png")
+    _write(PngStripWriter(path, WIDTH, HEIGHT, mode, dpi=150), image, rows)
+    assert _pixels(path, mode) == image.tobytes()
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("rows", [HEIGHT, 16, 7])
+@pytest.mark.parametrize("deflate_level", [None, 6])
+def test_tiff_strip_writer(tmp_path, mode, rows, deflate_level):
+    image = _noise_image(mode)
+    path = str(tmp_path / "band.tif")
+    _write(TiffStripWriter(path, WIDTH, HEIGHT, mode, rows, deflate_level, dpi=150), image, rows)
+    assert _pixels(path, mode) == image.tobytes()
+
+
+def test_incomplete_png_is_rejected(tmp_path):
+    writer = PngStripWriter(str(tmp_path / "band.png"), WIDTH, HEIGHT, "L")
+    writer.write_band(_noise_image("L").crop((0, 0, WIDTH, 10)))
+    with pytest.raises(ValueError):
+        writer.close()
+
+
+@pytest.mark.parametrize("color_mode", ["rgb", "gray", "bilevel"])
+@pytest.mark.parametrize("image_format", ["PNG", "TIFF"])
+def test_banded_page_matches_single_band(tmp_path, color_mode, image_format):
+    with fitz.open() as doc:
+        page = doc.new_page(width=200, height=300)
+        page.draw_rect(fitz.Rect(20, 30, 180, 120), color=(1, 0, 0), fill=(0.2, 0.4, 0.9))
+        page.draw_circle((100, 200), 60, color=(0, 0.5, 0), fill=(0.9, 0.9, 0.2))
+        page.insert_text((30, 280), "Halaman raksasa", fontsize=16)
+
+        extension = image_format.lower()
+        banded = render_page_tiled(page, 72, str(tmp_path / f"banded.{extension}"), image_format,
+                                   color_mode=color_mode, budget_mb=0)
+        single = render_page_tiled(page, 72, str(tmp_path / f"single.{extension}"), image_format,
+                                   color_mode=color_mode, budget_mb=1024)
+
+    with Image.open(banded) as banded_image, Image.open(single) as single_image:
+        assert banded_image.mode == single_image.mode
+        assert banded_image.size == single_image.size == (200, 300)
+        difference = ImageChops.difference(banded_image.convert("RGB"), single_image.convert("RGB"))
+        assert max(high for _, high in difference.getextrema()) <= BAND_EDGE_TOLERANCE